@@ -41,7 +41,6 @@ Requires:       python3dist(tqdm)
 Requires:       python3dist(vdf)
 Requires:       python3dist(pefile)
 Requires:       python3dist(pillow)
-Requires:       perl-Image-ExifTool
 
 %description -n python3-%{pypi_name}-git
 PortProtonQt is a modern graphical user interface for the PortProton project,
@@ -38,7 +38,6 @@ Requires:       python3dist(tqdm)
 Requires:       python3dist(vdf)
 Requires:       python3dist(pefile)
 Requires:       python3dist(pillow)
-Requires:       perl-Image-ExifTool
 
 %description -n python3-%{pypi_name}
 PortProtonQt is a modern graphical user interface for the PortProton project,
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+import argparse
+import io
+import lzma
+import sys
+import tarfile
+import time
+from pathlib import Path
+
+import orjson
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from portprotonqt.steam_app_index import pack_app_list, unpack_app_list  # noqa: E402
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE = BASE_DIR / "data" / "games_appid.tar.xz"
+
+
+def load_apps(archive: Path) -> list[dict]:
+    with tarfile.open(archive, mode="r:xz") as tar:
+        member = next(m for m in tar.getmembers() if m.name.endswith(".json"))
+        fobj = tar.extractfile(member)
+        if fobj is None:
+            raise RuntimeError(f"Не удалось извлечь {member.name}")
+        return orjson.loads(fobj.read())
+
+
+def tar_xz(name: str, payload: bytes) -> bytes:
+    """Упаковывает payload так же, как get_id.py: tar с единственным файлом, xz preset=9."""
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:xz", preset=9) as tar:
+        info = tarfile.TarInfo(name)
+        info.size = len(payload)
+        tar.addfile(info, io.BytesIO(payload))
+    return buf.getvalue()
+
+
+def untar_xz(blob: bytes) -> bytes:
+    with tarfile.open(fileobj=io.BytesIO(blob), mode="r:xz") as tar:
+        member = tar.getmembers()[0]
+        fobj = tar.extractfile(member)
+        if fobj is None:
+            raise RuntimeError(f"Не удалось извлечь {member.name}")
+        return fobj.read()
+
+
+def load_json(raw: bytes) -> dict[bytes, int]:
+    """JSON -> словарь имя -> appid, который нужен для построения индекса."""
+    return {app["normalized_name"].encode("utf-8"): app["appid"] for app in orjson.loads(raw) if app["normalized_name"]}
+
+
+def load_columnar(raw: bytes) -> dict[bytes, int]:
+    """Колоночный формат -> словарь имя -> appid, который нужен для построения индекса."""
+    appids, names = unpack_app_list(raw)
+    return {name: appid for appid, name in zip(appids, names, strict=True) if name}
+
+
+def best_of(repeat: int, fn):
+    """Возвращает (результат, лучшее время в секундах) из repeat запусков."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение форматов каталога приложений Steam: размер, распаковка, загрузка")
+    parser.add_argument("--archive", type=Path, default=ARCHIVE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--zstd-level", type=int, default=19)
+    args = parser.parse_args()
+
+    apps = load_apps(args.archive)
+    json_raw = orjson.dumps(apps)
+    columnar_raw = pack_app_list(apps)
+    expected = {app["normalized_name"].encode("utf-8"): app["appid"] for app in apps if app["normalized_name"]}
+    print(f"Приложений: {len(apps)}")
+    print(f"Без сжатия: JSON {len(json_raw) / 1024:.0f} KiB, колоночный {len(columnar_raw) / 1024:.0f} KiB\n")
+
+    # (название, сжатые данные, распаковка, загрузка распакованного до словаря имя -> appid)
+    formats = [
+        ("json tar.xz (текущий)", tar_xz("games_appid_min.json", json_raw), untar_xz, load_json),
+        ("json xz", lzma.compress(json_raw, preset=9), lzma.decompress, load_json),
+        ("columnar xz", lzma.compress(columnar_raw, preset=9), lzma.decompress, load_columnar),
+    ]
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=args.zstd_level)
+        decompressor = zstandard.ZstdDecompressor()
+        formats += [
+            ("json zst", compressor.compress(json_raw), decompressor.decompress, load_json),
+            ("columnar zst", compressor.compress(columnar_raw), decompressor.decompress, load_columnar),
+        ]
+    else:
+        print("zstandard не установлен, варианты zstd пропущены (pip install zstandard)\n")
+
+    print(f"{'формат':<24} {'размер, KiB':>12} {'распаковка, ms':>15} {'загрузка, ms':>13} {'всего, ms':>10}")
+    for label, blob, decompress, load in formats:
+        raw, decompress_time = best_of(args.repeat, lambda blob=blob, decompress=decompress: decompress(blob))
+        loaded, load_time = best_of(args.repeat, lambda raw=raw, load=load: load(raw))
+        if loaded != expected:
+            print(f"{label}: данные после распаковки не совпадают с исходными")
+            sys.exit(1)
+        print(f"{label:<24} {len(blob) / 1024:12.0f} {decompress_time * 1000:15.1f} "
+              f"{load_time * 1000:13.1f} {(decompress_time + load_time) * 1000:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
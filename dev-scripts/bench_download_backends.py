@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import random
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+import orjson
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+# Отрицательный кэш и метаданные бенчмарка не должны попадать в кэш пользователя
+os.environ["XDG_CACHE_HOME"] = tempfile.mkdtemp(prefix="ppqt-bench-cache-")
+
+from PySide6.QtCore import QCoreApplication  # noqa: E402
+
+from portprotonqt.downloader import DOWNLOAD_SOURCE, Downloader  # noqa: E402
+from portprotonqt.metadata_store import get_negative_cache  # noqa: E402
+
+ARCHIVE = BASE_DIR / "data" / "games_appid.tar.xz"
+COVER_URL = "https://steamcdn-a.akamaihd.net/steam/apps/{appid}/library_600x900_2x.jpg"
+
+
+def load_appids(archive: Path) -> list[int]:
+    with tarfile.open(archive, mode="r:xz") as tar:
+        member = next(m for m in tar.getmembers() if m.name.endswith(".json"))
+        fobj = tar.extractfile(member)
+        if fobj is None:
+            raise RuntimeError(f"Не удалось извлечь {member.name}")
+        return [app["appid"] for app in orjson.loads(fobj.read())]
+
+
+def make_urls(args) -> list[str]:
+    if args.urls:
+        return [line.strip() for line in args.urls.read_text(encoding="utf-8").splitlines() if line.strip()]
+    appids = load_appids(args.archive)
+    return [COVER_URL.format(appid=appid) for appid in random.Random(args.seed).sample(appids, args.count)]
+
+
+def run(app: QCoreApplication, backend: str, urls: list[str], workers: int) -> tuple[float, int, int]:
+    """Скачивает все urls асинхронно через выбранный backend. Возвращает (секунды, успешно, байт)."""
+    downloader = Downloader(max_workers=workers, backend=backend)
+    target = tempfile.mkdtemp(prefix=f"ppqt-bench-{backend}-")
+    pending = len(urls)
+    done = []
+
+    def on_done(result):
+        nonlocal pending
+        pending -= 1
+        if result:
+            done.append(os.path.getsize(result))
+        if pending == 0:
+            app.quit()
+
+    start = time.perf_counter()
+    for i, url in enumerate(urls):
+        downloader.download_async(url, os.path.join(target, f"{i}{Path(url).suffix}"), callback=on_done)
+    if pending:
+        app.exec()
+    elapsed = time.perf_counter() - start
+    # Ошибки этого прогона не должны пропускаться следующим backend через отрицательный кэш
+    negative_cache = get_negative_cache()
+    for url in urls:
+        negative_cache.record_success(DOWNLOAD_SOURCE, url)
+    return elapsed, len(done), sum(done)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение backend загрузок Downloader: requests и QNetworkAccessManager")
+    parser.add_argument("--archive", type=Path, default=ARCHIVE)
+    parser.add_argument("--urls", type=Path, help="файл со списком URL (по одному в строке) вместо обложек Steam")
+    parser.add_argument("--count", type=int, default=200, help="сколько случайных обложек Steam скачать")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=4, help="потоков для backend requests")
+    parser.add_argument("--backends", nargs="+", default=["requests", "qt"], choices=["requests", "qt"])
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv[:1])
+    urls = make_urls(args)
+    print(f"Файлов: {len(urls)}\n")
+    print(f"{'backend':<10} {'время, s':>9} {'успешно':>8} {'MiB':>8} {'файлов/s':>9}")
+    # Каждый backend качает в свой пустой каталог, поэтому кэш на диске не влияет на результат
+    for backend in args.backends:
+        elapsed, ok, size = run(app, backend, urls, args.workers)
+        print(f"{backend:<10} {elapsed:9.2f} {ok:8d} {size / 2 ** 20:8.1f} {len(urls) / elapsed:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
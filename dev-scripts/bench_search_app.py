@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+import argparse
+import random
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+import orjson
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from portprotonqt.steam_app_index import open_index, write_index  # noqa: E402
+from portprotonqt.steam_matcher import rank_apps  # noqa: E402
+
+ARCHIVE = BASE_DIR / "data" / "games_appid.tar.xz"
+MIN_RATIO = 0.8
+
+# Имена исполняемых файлов и папок, которые не должны находить похожие чужие игры
+FALSE_MATCHES = [
+    ("launcher", "launched"),
+    ("battlenet", "battlebit"),
+    ("shipping", "shippin"),
+    ("witcher3", "switcher"),
+    ("minecraft", "bonecraft"),
+]
+
+
+def load_apps(archive: Path) -> list[dict]:
+    with tarfile.open(archive, mode="r:xz") as tar:
+        member = next(m for m in tar.getmembers() if m.name.endswith(".json"))
+        fobj = tar.extractfile(member)
+        if fobj is None:
+            raise RuntimeError(f"Не удалось извлечь {member.name}")
+        return orjson.loads(fobj.read())
+
+
+def linear_scan(candidate, items):
+    """Прежний алгоритм search_app из steam_api: перебор всех имён с проверкой подстроки."""
+    for name_norm, app in items:
+        if candidate in name_norm and len(candidate) / len(name_norm) > MIN_RATIO:
+            return app
+    return None
+
+
+def make_candidates(names: list[str], count: int, seed: int) -> list[str]:
+    """
+    Кандидаты похожи на реальные: имя без последнего слова/символа,
+    имя без первого слова, а также заведомо отсутствующие строки.
+    """
+    rnd = random.Random(seed)
+    candidates = []
+    for name in rnd.sample(names, count):
+        words = name.split()
+        kind = rnd.randrange(4)
+        if kind == 0 and len(words) > 1:
+            candidates.append(" ".join(words[:-1]))
+        elif kind == 1 and len(words) > 1:
+            candidates.append(" ".join(words[1:]))
+        elif kind == 2:
+            candidates.append(name[:-1])
+        else:
+            candidates.append(f"{name} launcher x{rnd.randrange(1000)}")
+    return [c for c in candidates if c]
+
+
+def check_false_matches(index) -> int:
+    """Возвращает число кандидатов FALSE_MATCHES, для которых rank_apps нашёл чужую игру."""
+    failures = 0
+    for candidate, wrong in FALSE_MATCHES:
+        names = [m["normalized_name"] for m in rank_apps(index, [candidate])]
+        if any(name.startswith(wrong) for name in names):
+            print(f"Ложное совпадение: '{candidate}' -> {names}")
+            failures += 1
+    return failures
+
+
+def bench(label, fn, candidates):
+    start = time.perf_counter()
+    results = [fn(c) for c in candidates]
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:10.1f} ms  {elapsed / len(candidates) * 1e6:10.1f} us/кандидат")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение прежнего линейного поиска по подстроке с триграммным индексом")
+    parser.add_argument("--archive", type=Path, default=ARCHIVE)
+    parser.add_argument("--candidates", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=138)
+    args = parser.parse_args()
+
+    apps = load_apps(args.archive)
+    dict_index = {app["normalized_name"]: app for app in apps}
+    print(f"Приложений в каталоге: {len(apps)}, уникальных имён: {len(dict_index)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_path = str(Path(tmp) / "steam_apps.idx")
+        start = time.perf_counter()
+        write_index(index_path, apps)
+        print(f"Построение индекса: {(time.perf_counter() - start) * 1000:.0f} ms, "
+              f"размер {Path(index_path).stat().st_size / 1024 / 1024:.1f} MiB")
+        index = open_index(index_path)
+        if index is None:
+            sys.exit(1)
+
+        candidates = [c for c in make_candidates(list(dict_index), args.candidates, args.seed)
+                      if c not in dict_index]
+        print(f"Кандидатов без точного совпадения: {len(candidates)}\n")
+
+        dict_results = bench("dict, линейный проход", lambda c: linear_scan(c, dict_index.items()), candidates)
+        scan_results = bench("mmap, линейный проход", lambda c: linear_scan(c, index.items()), candidates)
+        trigram_results = bench("mmap, триграммы", lambda c: index.find_partial(c, MIN_RATIO), candidates)
+
+        def names(results):
+            return [r["normalized_name"] if r else None for r in results]
+
+        mismatches = sum(a != b for a, b in zip(names(scan_results), names(trigram_results), strict=True))
+        order_diffs = sum(a != b for a, b in zip(names(dict_results), names(trigram_results), strict=True))
+        found = sum(r is not None for r in trigram_results)
+        print(f"\nНайдено совпадений: {found}/{len(candidates)}")
+        print(f"Расхождений с линейным проходом по индексу: {mismatches}")
+        print(f"Отличий от порядка словаря (другое, но тоже подходящее имя): {order_diffs}")
+        false_matches = check_false_matches(index)
+        print(f"Ложных совпадений ранжирования: {false_matches}/{len(FALSE_MATCHES)}")
+        index.close()
+        if mismatches or false_matches:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,27 @@ import os
 import json
 import asyncio
 import aiohttp
+import hashlib
+import lzma
+import sys
 import tarfile
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from portprotonqt.steam_app_index import pack_app_list  # noqa: E402
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 
 # Получаем ключ Steam из переменной окружения.
 key = os.environ.get('STEAM_KEY')
 base_url = "https://api.steampowered.com/IStoreService/GetAppList/v1/?"
 category = "games"
+# Сколько последних дельт хранить: клиенты со старой ревизией скачивают полный архив
+max_deltas = 12
 
 def normalize_name(s):
     """
@@ -56,6 +70,125 @@ def process_steam_apps(steam_apps):
     return steam_apps
 
 
+def read_archive_apps(archive_path):
+    """Читает список приложений из ранее сгенерированного tar.xz архива."""
+    if not os.path.exists(archive_path):
+        return None
+    with tarfile.open(archive_path, "r:xz") as tar:
+        member = next((m for m in tar.getmembers() if m.name.endswith(".json")), None)
+        if member is None:
+            return None
+        fobj = tar.extractfile(member)
+        if fobj is None:
+            return None
+        return json.loads(fobj.read())
+
+
+def write_columnar(data_dir, apps):
+    """
+    Записывает каталог в колоночном формате (столбец appid uint32 + имена с префиксом длины)
+    в вариантах xz (его скачивает клиент) и zstd (если установлен zstandard).
+    Сравнение форматов: dev-scripts/bench_app_list_formats.py.
+    """
+    raw = pack_app_list(apps)
+    xz_path = os.path.join(data_dir, f"{category}_appid.bin.xz")
+    with open(xz_path, "wb") as f:
+        f.write(lzma.compress(raw, preset=9))
+    print(f"Записан колоночный каталог: {xz_path}")
+    if zstandard is None:
+        print("zstandard не установлен, вариант zstd пропущен")
+        return
+    zst_path = os.path.join(data_dir, f"{category}_appid.bin.zst")
+    with open(zst_path, "wb") as f:
+        f.write(zstandard.ZstdCompressor(level=19).compress(raw))
+    print(f"Записан колоночный каталог: {zst_path}")
+
+
+def name_mapping(apps):
+    """
+    Сводит список к словарю normalized_name -> appid так же, как клиентский индекс:
+    пустые имена пропускаются, при совпадении имён остаётся последнее приложение.
+    """
+    mapping = {}
+    for app in apps:
+        name = app.get("normalized_name")
+        if name and app.get("appid") is not None:
+            mapping[name] = app["appid"]
+    return mapping
+
+
+def write_delta(data_dir, previous_apps, current_apps):
+    """
+    Сравнивает прошлый и новый каталог и, если есть изменения, записывает дельту
+    games_appid_deltas/<ревизия>.json.xz и обновляет манифест games_appid_manifest.json.
+    Дельта содержит "remove" (удалённые имена) и "set" (новые или изменённые записи).
+    Без прошлого архива или манифеста начинается новая цепочка ревизий без дельт.
+    """
+    manifest_path = os.path.join(data_dir, f"{category}_appid_manifest.json")
+    deltas_dir = os.path.join(data_dir, f"{category}_appid_deltas")
+    manifest = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    current = name_mapping(current_apps)
+    last_appid = max((app["appid"] for app in current_apps), default=0)
+    if manifest is None or previous_apps is None:
+        manifest = {"revision": 1, "deltas": []}
+    else:
+        previous = name_mapping(previous_apps)
+        removed = sorted(name for name in previous if name not in current)
+        changed = [{"appid": appid, "normalized_name": name}
+                   for name, appid in sorted(current.items()) if previous.get(name) != appid]
+        if not removed and not changed:
+            print("Каталог не изменился, дельта не нужна.")
+            return
+        revision = manifest["revision"] + 1
+        delta = {
+            "from_revision": manifest["revision"],
+            "revision": revision,
+            "last_appid": last_appid,
+            "remove": removed,
+            "set": changed,
+        }
+        os.makedirs(deltas_dir, exist_ok=True)
+        delta_name = f"{category}_appid_deltas/{revision}.json.xz"
+        payload = lzma.compress(json.dumps(delta, ensure_ascii=False, separators=(',', ':')).encode("utf-8"),
+                                preset=9)
+        with open(os.path.join(data_dir, delta_name), "wb") as f:
+            f.write(payload)
+        manifest["deltas"].append({
+            "from_revision": delta["from_revision"],
+            "revision": revision,
+            "file": delta_name,
+            "sha256": hashlib.sha256(payload).hexdigest(),
+            "size": len(payload),
+            "remove": len(removed),
+            "set": len(changed),
+        })
+        manifest["revision"] = revision
+        print(f"Дельта ревизии {revision}: удалено {len(removed)}, изменено {len(changed)}, {len(payload)} байт")
+
+    # Удаляем самые старые дельты сверх лимита
+    for entry in manifest["deltas"][:-max_deltas]:
+        stale = os.path.join(data_dir, entry["file"])
+        if os.path.exists(stale):
+            os.remove(stale)
+    manifest["deltas"] = manifest["deltas"][-max_deltas:]
+    manifest["last_appid"] = last_appid
+    manifest["count"] = len(current)
+    manifest["full"] = f"{category}_appid.bin.xz"
+    # Хэш и размер полного архива: клиент проверяет по ним скачанный файл
+    full_path = os.path.join(data_dir, manifest["full"])
+    if os.path.exists(full_path):
+        with open(full_path, "rb") as f:
+            full = f.read()
+        manifest["full_sha256"] = hashlib.sha256(full).hexdigest()
+        manifest["full_size"] = len(full)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
 async def get_app_list(session, last_appid, endpoint):
     """
     Получает часть списка приложений из API.
@@ -114,6 +247,14 @@ async def request_data():
     data_dir = os.path.join(repo_root, "data")
     os.makedirs(data_dir, exist_ok=True)
 
+    # Прошлый каталог нужен для вычисления дельты до перезаписи архива
+    archive_path = os.path.join(data_dir, f"{category}_appid.tar.xz")
+    try:
+        previous_apps = read_archive_apps(archive_path)
+    except Exception as e:
+        print(f"Не удалось прочитать прошлый архив, дельта не будет создана: {e}")
+        previous_apps = None
+
     # Путь к JSON-файлам
     output_json_full = os.path.join(data_dir, f"{category}_appid.json")
     output_json_min = os.path.join(data_dir, f"{category}_appid_min.json")
@@ -127,7 +268,6 @@ async def request_data():
         json.dump(output_json, f, ensure_ascii=False, separators=(',',':'))
 
     # Упаковка только минифицированного JSON в tar.xz архив с максимальным сжатием
-    archive_path = os.path.join(data_dir, f"{category}_appid.tar.xz")
     try:
         with tarfile.open(archive_path, "w:xz", preset=9) as tar:
             tar.add(output_json_min, arcname=os.path.basename(output_json_min))
@@ -138,6 +278,10 @@ async def request_data():
         print(f"Ошибка при упаковке архива: {e}")
         return False
 
+    write_columnar(data_dir, output_json)
+
+    # Манифест обновляется после архива, чтобы он никогда не ссылался на ревизию новее архива
+    write_delta(data_dir, previous_apps, output_json)
     return True
 
 async def run():
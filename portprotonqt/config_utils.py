@@ -15,6 +15,13 @@ PORTPROTON_CONFIG_FILE = os.path.join(
     "PortProton.conf"
 )
 
+def get_cache_dir():
+    """Возвращает путь к каталогу кэша ($XDG_CACHE_HOME/PortProtonQT), создаёт его при необходимости."""
+    xdg_cache_home = os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    cache_dir = os.path.join(xdg_cache_home, "PortProtonQT")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
 # Пути к папкам с темами
 xdg_data_home = os.getenv("XDG_DATA_HOME", os.path.join(os.path.expanduser("~"), ".local", "share"))
 THEMES_DIRS = [
@@ -308,6 +315,159 @@ def save_favorites(favorites):
     with open(CONFIG_FILE, "w", encoding="utf-8") as configfile:
         cp.write(configfile)
 
+def read_download_backend():
+    """
+    Читает backend асинхронных загрузок из секции [Network]:
+    "requests" (пул потоков, по умолчанию) или "qt" (QNetworkAccessManager).
+    """
+    cp = configparser.ConfigParser()
+    if os.path.exists(CONFIG_FILE):
+        try:
+            cp.read(CONFIG_FILE, encoding="utf-8")
+        except (configparser.DuplicateSectionError, configparser.DuplicateOptionError) as e:
+            logger.error("Ошибка в конфигурационном файле: %s", e)
+            return "requests"
+        if not cp.has_section("Network") or not cp.has_option("Network", "download_backend"):
+            save_download_backend("requests")
+            return "requests"
+        return cp.get("Network", "download_backend", fallback="requests").strip().lower()
+    return "requests"
+
+def save_download_backend(backend):
+    """
+    Сохраняет backend асинхронных загрузок в секцию [Network].
+    """
+    cp = configparser.ConfigParser()
+    if os.path.exists(CONFIG_FILE):
+        try:
+            cp.read(CONFIG_FILE, encoding="utf-8")
+        except (configparser.DuplicateSectionError, configparser.DuplicateOptionError) as e:
+            logger.error("Ошибка в конфигурационном файле: %s", e)
+    if "Network" not in cp:
+        cp["Network"] = {}
+    cp["Network"]["download_backend"] = backend
+    with open(CONFIG_FILE, "w", encoding="utf-8") as configfile:
+        cp.write(configfile)
+
+def read_bandwidth_limit():
+    """
+    Читает ограничение общей скорости загрузок из секции [Network] (KiB/s, 0 — без ограничения).
+    """
+    cp = configparser.ConfigParser()
+    if os.path.exists(CONFIG_FILE):
+        try:
+            cp.read(CONFIG_FILE, encoding="utf-8")
+        except (configparser.DuplicateSectionError, configparser.DuplicateOptionError) as e:
+            logger.error("Ошибка в конфигурационном файле: %s", e)
+            return 0
+        if not cp.has_section("Network") or not cp.has_option("Network", "bandwidth_limit"):
+            save_bandwidth_limit(0)
+            return 0
+        try:
+            return max(0, cp.getint("Network", "bandwidth_limit"))
+        except ValueError:
+            logger.error("Некорректное значение bandwidth_limit в конфигурационном файле")
+            return 0
+    return 0
+
+def save_bandwidth_limit(limit):
+    """
+    Сохраняет ограничение общей скорости загрузок (KiB/s) в секцию [Network].
+    """
+    cp = configparser.ConfigParser()
+    if os.path.exists(CONFIG_FILE):
+        try:
+            cp.read(CONFIG_FILE, encoding="utf-8")
+        except (configparser.DuplicateSectionError, configparser.DuplicateOptionError) as e:
+            logger.error("Ошибка в конфигурационном файле: %s", e)
+    if "Network" not in cp:
+        cp["Network"] = {}
+    cp["Network"]["bandwidth_limit"] = str(int(limit))
+    with open(CONFIG_FILE, "w", encoding="utf-8") as configfile:
+        cp.write(configfile)
+
+def read_pixmap_cache_limit():
+    """
+    Читает размер кэша обложек в памяти из секции [Cache] (MiB, по умолчанию 128).
+    """
+    cp = configparser.ConfigParser()
+    if os.path.exists(CONFIG_FILE):
+        try:
+            cp.read(CONFIG_FILE, encoding="utf-8")
+        except (configparser.DuplicateSectionError, configparser.DuplicateOptionError) as e:
+            logger.error("Ошибка в конфигурационном файле: %s", e)
+            return 128
+        if not cp.has_section("Cache") or not cp.has_option("Cache", "pixmap_cache_mb"):
+            save_pixmap_cache_limit(128)
+            return 128
+        try:
+            return max(0, cp.getint("Cache", "pixmap_cache_mb"))
+        except ValueError:
+            logger.error("Некорректное значение pixmap_cache_mb в конфигурационном файле")
+            return 128
+    return 128
+
+def save_pixmap_cache_limit(limit):
+    """
+    Сохраняет размер кэша обложек в памяти (MiB) в секцию [Cache].
+    """
+    cp = configparser.ConfigParser()
+    if os.path.exists(CONFIG_FILE):
+        try:
+            cp.read(CONFIG_FILE, encoding="utf-8")
+        except (configparser.DuplicateSectionError, configparser.DuplicateOptionError) as e:
+            logger.error("Ошибка в конфигурационном файле: %s", e)
+    if "Cache" not in cp:
+        cp["Cache"] = {}
+    cp["Cache"]["pixmap_cache_mb"] = str(int(limit))
+    with open(CONFIG_FILE, "w", encoding="utf-8") as configfile:
+        cp.write(configfile)
+
+def read_image_cache_config():
+    """
+    Читает ограничения кэша изображений на диске из секции [Cache]:
+    image_cache_mb — размер (MiB, по умолчанию 1024), image_cache_max_age_days —
+    сколько дней хранить неиспользуемые изображения (по умолчанию 90, 0 — без ограничения).
+    """
+    defaults = {"size_mb": 1024, "max_age_days": 90}
+    cp = configparser.ConfigParser()
+    if os.path.exists(CONFIG_FILE):
+        try:
+            cp.read(CONFIG_FILE, encoding="utf-8")
+        except (configparser.DuplicateSectionError, configparser.DuplicateOptionError) as e:
+            logger.error("Ошибка в конфигурационном файле: %s", e)
+            return defaults
+        if not cp.has_section("Cache") or not cp.has_option("Cache", "image_cache_mb") \
+                or not cp.has_option("Cache", "image_cache_max_age_days"):
+            save_image_cache_config(cp.get("Cache", "image_cache_mb", fallback=defaults["size_mb"]),
+                                    cp.get("Cache", "image_cache_max_age_days", fallback=defaults["max_age_days"]))
+        try:
+            return {
+                "size_mb": max(0, cp.getint("Cache", "image_cache_mb", fallback=defaults["size_mb"])),
+                "max_age_days": max(0, cp.getint("Cache", "image_cache_max_age_days", fallback=defaults["max_age_days"])),
+            }
+        except ValueError:
+            logger.error("Некорректное значение image_cache_mb или image_cache_max_age_days в конфигурационном файле")
+            return defaults
+    return defaults
+
+def save_image_cache_config(size_mb, max_age_days):
+    """
+    Сохраняет ограничения кэша изображений на диске (MiB и дни) в секцию [Cache].
+    """
+    cp = configparser.ConfigParser()
+    if os.path.exists(CONFIG_FILE):
+        try:
+            cp.read(CONFIG_FILE, encoding="utf-8")
+        except (configparser.DuplicateSectionError, configparser.DuplicateOptionError) as e:
+            logger.error("Ошибка в конфигурационном файле: %s", e)
+    if "Cache" not in cp:
+        cp["Cache"] = {}
+    cp["Cache"]["image_cache_mb"] = str(size_mb)
+    cp["Cache"]["image_cache_max_age_days"] = str(max_age_days)
+    with open(CONFIG_FILE, "w", encoding="utf-8") as configfile:
+        cp.write(configfile)
+
 def ensure_default_proxy_config():
     """
     Проверяет наличие секции [Proxy] в конфигурационном файле.
@@ -0,0 +1,141 @@
+import requests
+import socket
+import threading
+import urllib.request
+from collections.abc import Callable
+from portprotonqt.config_utils import read_proxy_config
+from portprotonqt.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Адреса для проверки связи: одно TCP-соединение к первому ответившему
+PROBE_HOSTS = (("1.1.1.1", 443), ("8.8.8.8", 53), ("store.steampowered.com", 443))
+# При настроенном прокси прямые соединения могут быть закрыты: проверяем HTTP-запросом через него
+PROXY_PROBE_URL = "https://store.steampowered.com/"
+PROBE_TIMEOUT = 3
+# Как часто перепроверять связь при её наличии и отсутствии (секунды)
+ONLINE_RECHECK = 300
+OFFLINE_RECHECK = 15
+
+
+class ConnectivityMonitor:
+    """
+    Фоновый монитор подключения к интернету.
+    is_online() не блокирует: возвращает последнее известное состояние
+    (до первой проверки подключение считается доступным).
+    Проверка выполняется в отдельном потоке — периодически, по сообщениям о сетевых ошибках
+    от загрузчиков (report_failure) и по событиям QNetworkInformation, если они доступны.
+    Слушатели add_listener вызываются при каждой смене состояния с новым значением.
+    """
+
+    def __init__(self):
+        self._online = True
+        self._checked = False
+        self._listeners: list[Callable[[bool], None]] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="connectivity-monitor", daemon=True)
+            self._thread.start()
+
+    def is_online(self) -> bool:
+        self.start()
+        return self._online
+
+    def add_listener(self, listener: Callable[[bool], None]):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def check_now(self):
+        """Просит перепроверить подключение, не дожидаясь очередного интервала."""
+        self.start()
+        self._wakeup.set()
+
+    def report_failure(self):
+        """Сетевой запрос не удался из-за соединения — подключение стоит перепроверить."""
+        self.check_now()
+
+    def report_success(self):
+        """Сетевой запрос прошёл — подключение точно есть."""
+        self._set_online(True)
+
+    def _run(self):
+        while True:
+            self._set_online(self._probe())
+            self._wakeup.wait(ONLINE_RECHECK if self._online else OFFLINE_RECHECK)
+            self._wakeup.clear()
+
+    def _probe(self) -> bool:
+        if read_proxy_config() or urllib.request.getproxies():
+            return self._probe_proxy()
+        errors = []
+        for host, port in PROBE_HOSTS:
+            try:
+                socket.create_connection((host, port), timeout=PROBE_TIMEOUT).close()
+                return True
+            except OSError as e:
+                errors.append(f"{host}: {e}")
+        logger.debug("Connectivity probe failed: %s", "; ".join(errors))
+        return False
+
+    def _probe_proxy(self) -> bool:
+        # Импорт здесь: downloader сам использует монитор
+        from portprotonqt.downloader import get_requests_session
+        try:
+            get_requests_session().head(PROXY_PROBE_URL, timeout=PROBE_TIMEOUT).close()
+            return True
+        except requests.RequestException as e:
+            logger.debug("Connectivity probe through proxy failed: %s", e)
+            return False
+
+    def _set_online(self, online: bool):
+        with self._lock:
+            changed = online != self._online or not self._checked
+            self._online = online
+            self._checked = True
+            listeners = list(self._listeners) if changed else []
+        if not changed:
+            return
+        if online:
+            logger.info("Подключение к интернету доступно")
+        else:
+            logger.warning("Интернет недоступен, загрузки отложены до появления подключения")
+        for listener in listeners:
+            try:
+                listener(online)
+            except Exception as e:
+                logger.error("Connectivity listener failed: %s", e)
+
+
+_MONITOR = ConnectivityMonitor()
+
+
+def get_connectivity_monitor() -> ConnectivityMonitor:
+    return _MONITOR
+
+
+def watch_network_information():
+    """
+    Подписывает монитор на изменения сети от Qt (NetworkManager и т.п.), чтобы подключение
+    перепроверялось сразу после его появления или пропадания. Вызывать из GUI-потока.
+    Без модуля QtNetwork или подходящего бэкенда остаются периодические проверки.
+    """
+    try:
+        from PySide6.QtNetwork import QNetworkInformation
+    except ImportError:
+        return False
+    if not QNetworkInformation.loadDefaultBackend():
+        return False
+    info = QNetworkInformation.instance()
+    if info is None:
+        return False
+    info.reachabilityChanged.connect(lambda _reachability: _MONITOR.check_now())
+    logger.debug("Watching network changes via QNetworkInformation (%s)", info.backendName())
+    _MONITOR.start()
+    return True
+
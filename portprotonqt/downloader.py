@@ -1,81 +1,315 @@
-from PySide6.QtCore import QObject, Signal, QThread
+from PySide6.QtCore import QObject, Qt, Signal, QRunnable, QThreadPool
+import hashlib
+import itertools
 import threading
+import time
+import weakref
 import os
 import requests
-import socket
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 from tqdm import tqdm
+from collections import OrderedDict
 from collections.abc import Callable
-from portprotonqt.config_utils import read_proxy_config
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from urllib.parse import urlsplit
+from portprotonqt.config_utils import read_bandwidth_limit, read_download_backend, read_proxy_config
+from portprotonqt.connectivity import get_connectivity_monitor
 from portprotonqt.logger import get_logger
+from portprotonqt.metadata_store import DOWNLOAD_SOURCE, get_negative_cache
 
 logger = get_logger(__name__)
 
+# Приоритеты загрузок и запросов метаданных: меньше — раньше
+PRIORITY_FOCUSED = 0
+PRIORITY_VISIBLE = 1
+PRIORITY_NORMAL = 2
+# Фоновое обновление устаревших данных, которые уже показаны
+PRIORITY_BACKGROUND = 3
+
+# Сколько хостов держат открытые соединения и сколько соединений на один хост.
+# При исчерпании лимита поток ждёт свободное соединение, а не открывает новое.
+POOL_HOSTS = 16
+POOL_CONNECTIONS_PER_HOST = 6
+
+# Сколько асинхронных загрузок с одного хоста выполняется одновременно
+HOST_CONCURRENCY = {
+    "steamcdn-a.akamaihd.net": POOL_CONNECTIONS_PER_HOST,
+    "cdn.cloudflare.steamstatic.com": POOL_CONNECTIONS_PER_HOST,
+}
+DEFAULT_HOST_CONCURRENCY = 4
+# Сколько асинхронных загрузок общего загрузчика (get_downloader) выполняется одновременно
+DOWNLOAD_WORKERS = 8
+
+# Недокачанные файлы от этого размера докачиваются запросом Range, меньшие скачиваются заново
+RESUME_MIN_SIZE = 256 * 1024
+
+_SESSION: requests.Session | None = None
+# Загрузчики с backend "qt": им тоже нужно применить новые настройки прокси
+_QT_DOWNLOADERS: "weakref.WeakSet[Downloader]" = weakref.WeakSet()
+_SESSION_LOCK = threading.Lock()
+
+
+class BandwidthLimiter:
+    """
+    Общее для всех загрузок ограничение скорости: token bucket на rate байт в секунду
+    с запасом в одну секунду. rate = 0 — без ограничения.
+    """
+
+    def __init__(self, rate: int = 0):
+        self.rate = rate
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, size: int) -> float:
+        """Списывает size байт и возвращает, сколько секунд нужно подождать перед чтением следующих."""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= size
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+_BANDWIDTH_LIMITER: BandwidthLimiter | None = None
+
+def get_bandwidth_limiter() -> BandwidthLimiter:
+    """Ограничитель скорости из настройки [Network] bandwidth_limit (KiB/s), читается один раз."""
+    global _BANDWIDTH_LIMITER
+    with _SESSION_LOCK:
+        if _BANDWIDTH_LIMITER is None:
+            _BANDWIDTH_LIMITER = BandwidthLimiter(read_bandwidth_limit() * 1024)
+            if _BANDWIDTH_LIMITER.rate:
+                logger.info(f"Скорость загрузок ограничена {_BANDWIDTH_LIMITER.rate // 1024} KiB/s")
+        return _BANDWIDTH_LIMITER
+
 def get_requests_session():
-    session = requests.Session()
-    proxy = read_proxy_config() or {}
-    if proxy:
-        session.proxies.update(proxy)
-    session.verify = True
-    return session
-
-def download_with_cache(url, local_path, timeout=5, downloader_instance=None):
-    if os.path.exists(local_path):
+    """
+    Возвращает общую для всего приложения сессию requests.
+    Соединения с хостами (steamcdn, магазин Steam, ProtonDB) переиспользуются (keep-alive),
+    на один хост открывается не больше POOL_CONNECTIONS_PER_HOST соединений.
+    Настройки прокси читаются один раз, после их изменения нужно вызвать reload_proxy_config.
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_CONNECTIONS_PER_HOST,
+                                  pool_block=True)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.proxies.update(read_proxy_config() or {})
+            session.verify = True
+            _SESSION = session
+        return _SESSION
+
+def reload_proxy_config():
+    """Перечитывает настройки прокси и закрывает соединения, открытые со старыми настройками."""
+    with _SESSION_LOCK:
+        if _SESSION is not None:
+            _SESSION.proxies.clear()
+            _SESSION.proxies.update(read_proxy_config() or {})
+            for adapter in _SESSION.adapters.values():
+                adapter.close()
+    logger.info("Настройки прокси перечитаны")
+    for downloader in list(_QT_DOWNLOADERS):
+        downloader._qt_backend.apply_proxy()
+
+def _record_download_failure(url, error):
+    """Заносит неудачную загрузку в отрицательный кэш: 404 и 410 — файла нет, остальное — временная ошибка."""
+    if isinstance(error, requests.ConnectionError):
+        # Скорее всего, пропало подключение, а не сам файл: вместо отрицательного кэша
+        # просим монитор перепроверить связь
+        get_connectivity_monitor().report_failure()
+        return
+    response = getattr(error, "response", None)
+    missing = response is not None and response.status_code in (404, 410)
+    get_negative_cache().record_failure(DOWNLOAD_SOURCE, url, missing=missing)
+
+def is_complete_image(path, name=None) -> bool:
+    """
+    Проверяет по концу файла, что JPEG или PNG не обрезан (маркер EOI / чанк IEND).
+    Формат определяется по расширению name (по умолчанию — самого path),
+    файлы других форматов считаются целыми.
+    """
+    lower = (name or path).lower()
+    if not lower.endswith((".jpg", ".jpeg", ".png")):
+        return True
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 64))
+            tail = f.read()
+    except OSError:
+        return False
+    if lower.endswith(".png"):
+        return tail.endswith(b"IEND\xaeB`\x82")
+    return tail.rstrip(b"\x00\r\n ").endswith(b"\xff\xd9")
+
+def check_download(path, local_path, url, sha256=None):
+    """
+    Проверяет файл path, скачанный из url для local_path (обычно {local_path}.part):
+    хэш sha256, если он задан, и целостность изображения. При ошибке бросает OSError.
+    Используется обоими backend загрузок перед атомарным переименованием в local_path.
+    """
+    if sha256:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        if digest.hexdigest() != sha256:
+            raise OSError(f"Checksum mismatch for {url}")
+    if not is_complete_image(path, local_path):
+        raise OSError(f"Truncated image from {url}")
+
+def _stream_to_file(session, url, local_path, timeout, sha256=None):
+    """
+    Скачивает url во временный файл {local_path}.part и атомарно переименовывает его в local_path.
+    Недокачанный файл от RESUME_MIN_SIZE байт докачивается запросом Range (If-Range с ETag
+    или Last-Modified прошлого ответа, чтобы не склеить разные версии файла).
+    Размер сверяется с Content-Length, содержимое — с sha256 и проверкой изображения.
+    """
+    part_path = local_path + ".part"
+    validator_path = part_path + ".validator"
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {}
+    if offset >= RESUME_MIN_SIZE and os.path.exists(validator_path):
+        with open(validator_path, encoding="utf-8") as f:
+            headers = {"Range": f"bytes={offset}-", "If-Range": f.read().strip()}
+    os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+    with session.get(url, stream=True, timeout=timeout, headers=headers) as response:
+        if response.status_code == 416:
+            # Временный файл не соответствует серверному — начинаем заново
+            response.close()
+            os.remove(part_path)
+            return _stream_to_file(session, url, local_path, timeout, sha256)
+        response.raise_for_status()
+        resumed = response.status_code == 206
+        if not resumed:
+            offset = 0
+            validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+            if validator:
+                with open(validator_path, "w", encoding="utf-8") as f:
+                    f.write(validator)
+            elif os.path.exists(validator_path):
+                os.remove(validator_path)
+        else:
+            logger.info(f"Докачка {url} с {offset} байт")
+        length = response.headers.get("Content-Length")
+        # При сжатии на лету (Content-Encoding) размер тела не совпадает с Content-Length
+        expected = offset + int(length) if length and not response.headers.get("Content-Encoding") else None
+        desc = Path(local_path).name
+        limiter = get_bandwidth_limiter()
+        with tqdm(total=expected, initial=offset,
+                  unit='B', unit_scale=True, unit_divisor=1024,
+                  desc=f"Downloading {desc}", ascii=True) as pbar:
+            with open(part_path, "ab" if resumed else "wb") as f:
+                for chunk in response.iter_content(chunk_size=65536):
+                    if chunk:
+                        f.write(chunk)
+                        pbar.update(len(chunk))
+                        delay = limiter.reserve(len(chunk))
+                        if delay:
+                            time.sleep(delay)
+    size = os.path.getsize(part_path)
+    if expected is not None and size != expected:
+        raise OSError(f"Incomplete download of {url}: {size} of {expected} bytes")
+    try:
+        check_download(part_path, local_path, url, sha256)
+    except OSError:
+        os.remove(part_path)
+        raise
+    os.replace(part_path, local_path)
+    if os.path.exists(validator_path):
+        os.remove(validator_path)
+    return local_path
+
+def discard_partial(local_path):
+    """
+    Удаляет временный файл {local_path}.part после неудачной загрузки, если его не стоит докачивать:
+    он меньше RESUME_MIN_SIZE или для него нет .validator (ETag/Last-Modified для If-Range).
+    """
+    part_path = local_path + ".part"
+    if not os.path.exists(part_path):
+        return
+    if os.path.getsize(part_path) >= RESUME_MIN_SIZE and os.path.exists(part_path + ".validator"):
+        return
+    os.remove(part_path)
+    if os.path.exists(part_path + ".validator"):
+        os.remove(part_path + ".validator")
+
+def is_downloaded(local_path):
+    """
+    Возвращает True, если local_path уже скачан и цел, и загрузку можно не начинать.
+    Обрезанные изображения прошлых версий удаляются, чтобы их скачали заново.
+    """
+    if not os.path.exists(local_path):
+        return False
+    if is_complete_image(local_path):
+        return True
+    logger.warning(f"Файл {local_path} повреждён, скачиваем заново")
+    os.remove(local_path)
+    return False
+
+def download_with_cache(url, local_path, timeout=5, sha256=None):
+    if is_downloaded(local_path):
         return local_path
     session = get_requests_session()
     try:
-        with session.get(url, stream=True, timeout=timeout) as response:
-            response.raise_for_status()
-            total_size = int(response.headers.get('Content-Length', 0))
-            os.makedirs(os.path.dirname(local_path), exist_ok=True)
-            desc = Path(local_path).name
-            with tqdm(total=total_size if total_size > 0 else None,
-                      unit='B', unit_scale=True, unit_divisor=1024,
-                      desc=f"Downloading {desc}", ascii=True) as pbar:
-                with open(local_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            pbar.update(len(chunk))
+        _stream_to_file(session, url, local_path, timeout, sha256)
+        get_negative_cache().record_success(DOWNLOAD_SOURCE, url)
+        get_connectivity_monitor().report_success()
         return local_path
     except Exception as e:
         logger.error(f"Ошибка загрузки {url}: {e}")
-        if downloader_instance and hasattr(downloader_instance, '_last_error'):
-            downloader_instance._last_error[url] = True
-        if os.path.exists(local_path):
-            os.remove(local_path)
+        _record_download_failure(url, e)
+        discard_partial(local_path)
         return None
 
-def download_with_parallel(urls, local_paths, max_workers=4, timeout=5, downloader_instance=None):
+def fetch_if_modified(url, etag=None, last_modified=None, timeout=5):
+    """
+    Условный GET-запрос с If-None-Match/If-Modified-Since.
+    Возвращает (content, validators): content равен None, если ресурс не изменился (304),
+    validators — словарь {"etag", "last_modified"} из ответа (или переданные, при 304).
+    Исключения requests пробрасываются вызывающему.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    session = get_requests_session()
+    response = session.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        return None, {"etag": etag, "last_modified": last_modified}
+    response.raise_for_status()
+    validators = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+    return response.content, validators
+
+def download_with_parallel(urls, local_paths, max_workers=4, timeout=5):
     from concurrent.futures import ThreadPoolExecutor, as_completed
 
     results = {}
     session = get_requests_session()
 
     def _download_one(url, local_path):
-        if os.path.exists(local_path):
+        if is_downloaded(local_path):
             return local_path
         try:
-            with session.get(url, stream=True, timeout=timeout) as response:
-                response.raise_for_status()
-                total_size = int(response.headers.get('Content-Length', 0))
-                os.makedirs(os.path.dirname(local_path), exist_ok=True)
-                desc = Path(local_path).name
-                with tqdm(total=total_size if total_size > 0 else None,
-                          unit='B', unit_scale=True, unit_divisor=1024,
-                          desc=f"Downloading {desc}", ascii=True) as pbar:
-                    with open(local_path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                                pbar.update(len(chunk))
+            _stream_to_file(session, url, local_path, timeout)
+            get_negative_cache().record_success(DOWNLOAD_SOURCE, url)
+            get_connectivity_monitor().report_success()
             return local_path
         except Exception as e:
             logger.error(f"Ошибка загрузки {url}: {e}")
-            if downloader_instance and hasattr(downloader_instance, '_last_error'):
-                downloader_instance._last_error[url] = True
-            if os.path.exists(local_path):
-                os.remove(local_path)
+            _record_download_failure(url, e)
+            discard_partial(local_path)
             return None
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
@@ -90,76 +324,295 @@ def download_with_parallel(urls, local_paths, max_workers=4, timeout=5, download
                 results[url] = None
     return results
 
+class DownloadHandle:
+    """Асинхронная загрузка, поставленная в очередь Downloader.download_async; позволяет её отменить."""
+
+    def __init__(self, downloader: 'Downloader', url: str, local_path: str,
+                 callback: Callable[[str | None], None] | None, priority: int):
+        self.url = url
+        self.local_path = local_path
+        self.priority = priority
+        self.cancelled = False
+        self.done = False
+        self._downloader = downloader
+        self._callback = callback
+
+    def cancel(self):
+        """
+        Отменяет загрузку для этого вызывающего: колбэк не будет вызван.
+        Если загрузку больше никто не ждёт, она убирается из очереди или прерывается (backend "qt").
+        """
+        if self.done or self.cancelled:
+            return
+        self.cancelled = True
+        self._downloader._cancel(self)
+
+
+class _InFlight:
+    """
+    Загрузка одного URL, которая уже выполняется или ждёт в очереди.
+    Все, кто запросил тот же URL, подписываются на future и не занимают поток.
+    """
+
+    def __init__(self, url: str, local_path: str):
+        self.url = url
+        self.host = urlsplit(url).hostname or ""
+        self.local_path = local_path
+        self.future: Future = Future()
+        self.handles: list[DownloadHandle] = []
+        self.task: _DownloadTask | None = None
+        self.priority = PRIORITY_BACKGROUND
+        self.seq = 0
+        # Занимает ли загрузка слот планировщика (выполняется сейчас)
+        self.running = False
+        self.timeout = 5
+        self.sha256 = None
+        # Сколько синхронных вызовов download ждут результат
+        self.sync_waiters = 0
+        # QNetworkReply загрузки через backend "qt"
+        self.reply = None
+
+
+class _DownloadTask(QRunnable):
+    def __init__(self, downloader: 'Downloader', inflight: _InFlight, timeout: int, parallel: bool):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.downloader = downloader
+        self.inflight = inflight
+        self.timeout = timeout
+        self.parallel = parallel
+
+    def run(self):
+        url = self.inflight.url
+        local_path = self.inflight.local_path
+        if not get_connectivity_monitor().is_online() and self.downloader._park(self.inflight):
+            return
+        result = None
+        try:
+            if self.parallel:
+                results = self.downloader._download_many([url], [local_path], self.timeout)
+                result = results.get(url, None)
+            else:
+                result = self.downloader._download_one(url, local_path, self.timeout)
+            logger.debug(f"Async download completed {url}: success={result is not None}, path={result or ''}")
+        except Exception as e:
+            logger.error(f"Ошибка при асинхронной загрузке {url}: {e}")
+        self.downloader._resolve(self.inflight, result)
+
+
 class Downloader(QObject):
+    """
+    Загрузчик с кэшем результатов.
+    Одновременные запросы одного URL объединяются: файл скачивается один раз,
+    остальные вызовы получают тот же результат. Пути к скачанным файлам хранятся
+    в LRU-кэше на CACHE_SIZE адресов.
+    Асинхронные загрузки ждут в очереди и запускаются по приоритету: одновременно выполняется
+    не больше max_workers загрузок и не больше HOST_CONCURRENCY с одного хоста, поэтому
+    медленный хост не занимает все слоты. Без подключения очередь ждёт его появления.
+    Колбэки вызываются в потоке, где создан Downloader (в приложении — GUI-поток).
+    backend ("requests" или "qt", по умолчанию — из конфигурации, секция [Network])
+    выбирает, чем выполняются асинхронные загрузки: пулом потоков с requests или
+    QNetworkAccessManager в цикле событий Qt. Синхронные download и download_parallel
+    всегда используют requests.
+    """
     download_completed = Signal(str, str, bool)  # url, local_path, success
+    _task_finished = Signal(object, object)  # DownloadHandle, local_path | None
+    _start_transfer = Signal(object)  # _InFlight для backend "qt"
+    _abort_transfer = Signal(object)  # _InFlight для backend "qt"
+
+    CACHE_SIZE = 1024
 
-    def __init__(self, max_workers=4):
+    def __init__(self, max_workers=4, backend=None):
         super().__init__()
         self.max_workers = max_workers
-        self._cache = {}
-        self._last_error = {}
-        self._locks = {}
-        self._active_threads: list[QThread] = []
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._inflight: dict[str, _InFlight] = {}
         self._global_lock = threading.Lock()
-        self._has_internet = None
-
-    def has_internet(self, timeout=3):
-        if self._has_internet is None:
-            errors = []
-            try:
-                socket.create_connection(("8.8.8.8", 53), timeout=timeout)
-            except Exception as e:
-                errors.append(f"8.8.8.8: {e}")
-            try:
-                socket.create_connection(("8.8.4.4", 53), timeout=timeout)
-            except Exception as e:
-                errors.append(f"8.8.4.4: {e}")
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_workers)
+        # Асинхронные загрузки, ожидающие свободного слота или подключения
+        self._queue: list[_InFlight] = []
+        self._seq = itertools.count()
+        self._running = 0
+        self._host_running: dict[str, int] = {}
+        get_connectivity_monitor().add_listener(self._on_connectivity_changed)
+        # Всегда через очередь событий: и для уже скачанного файла колбэк вызывается
+        # после возврата из download_async, в потоке, которому принадлежит Downloader
+        self._task_finished.connect(self._on_task_finished, Qt.ConnectionType.QueuedConnection)
+        self._qt_backend = None
+        self.backend = backend or read_download_backend()
+        if self.backend == "qt":
             try:
-                requests.get("https://www.google.com", timeout=timeout)
-            except Exception as e:
-                errors.append(f"google.com: {e}")
-            if errors:
-                logger.warning("Интернет недоступен:\n" + "\n".join(errors))
-                self._has_internet = False
+                from portprotonqt.qt_network import QtDownloadBackend
+            except ImportError as e:
+                logger.warning(f"QtNetwork недоступен ({e}), загрузки выполняются через requests")
+                self.backend = "requests"
             else:
-                self._has_internet = True
-        return self._has_internet
+                self._qt_backend = QtDownloadBackend(self)
+                # Через очередь событий, чтобы загрузки, завершающиеся сразу (файл уже скачан),
+                # не запускали следующие рекурсивно
+                self._start_transfer.connect(self._qt_backend.start, Qt.ConnectionType.QueuedConnection)
+                self._abort_transfer.connect(self._qt_backend.abort)
+                _QT_DOWNLOADERS.add(self)
+
+    def has_internet(self, timeout=3):
+        """Последнее известное состояние подключения; не блокирует (см. ConnectivityMonitor)."""
+        return get_connectivity_monitor().is_online()
 
     def reset_internet_check(self):
-        self._has_internet = None
+        get_connectivity_monitor().check_now()
 
-    def _get_url_lock(self, url):
+    def _on_connectivity_changed(self, online: bool):
+        if not online:
+            return
         with self._global_lock:
-            if url not in self._locks:
-                self._locks[url] = threading.Lock()
-            return self._locks[url]
+            queued = len(self._queue)
+        if queued:
+            logger.info(f"Подключение восстановлено, возобновляем {queued} отложенных загрузок")
+        self._dispatch()
 
-    def download(self, url, local_path, timeout=5):
+    def _park(self, inflight: _InFlight) -> bool:
+        """Возвращает начатую загрузку в очередь до появления подключения. Возвращает False, если оно уже есть."""
+        with self._global_lock:
+            if get_connectivity_monitor().is_online():
+                return False
+            self._release(inflight)
+            self._queue.append(inflight)
+        logger.debug(f"Нет интернета, загрузка {inflight.url} отложена")
+        return True
+
+    def _host_limit(self, host: str) -> int:
+        return HOST_CONCURRENCY.get(host, DEFAULT_HOST_CONCURRENCY)
+
+    def _release(self, inflight: _InFlight):
+        """Освобождает слот планировщика; вызывать под self._global_lock."""
+        if not inflight.running:
+            return
+        inflight.running = False
+        self._running -= 1
+        self._host_running[inflight.host] -= 1
+
+    def _dispatch(self):
+        """Запускает загрузки из очереди по приоритету, пока есть свободные слоты."""
+        started = []
+        with self._global_lock:
+            if not get_connectivity_monitor().is_online():
+                return
+            while self._running < self.max_workers:
+                best = None
+                for inflight in self._queue:
+                    if self._host_running.get(inflight.host, 0) >= self._host_limit(inflight.host):
+                        continue
+                    if best is None or (inflight.priority, inflight.seq) < (best.priority, best.seq):
+                        best = inflight
+                if best is None:
+                    break
+                self._queue.remove(best)
+                best.running = True
+                self._running += 1
+                self._host_running[best.host] = self._host_running.get(best.host, 0) + 1
+                started.append(best)
+        for inflight in started:
+            if inflight.task is not None:
+                self._pool.start(inflight.task, -inflight.priority)
+            else:
+                self._start_transfer.emit(inflight)
+
+    def _cached(self, url):
+        """Путь из кэша или None; вызывать под self._global_lock."""
+        path = self._cache.get(url)
+        if path is None:
+            return None
+        if not os.path.exists(path):
+            # Файл удалён очисткой кэша изображений — скачиваем заново
+            del self._cache[url]
+            return None
+        self._cache.move_to_end(url)
+        return path
+
+    def _remember(self, url, path):
+        """Запоминает путь в кэше; вызывать под self._global_lock."""
+        self._cache[url] = path
+        self._cache.move_to_end(url)
+        while len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def _claim(self, url, local_path) -> tuple[_InFlight, bool]:
+        """Возвращает загрузку URL и True, если её нужно выполнить вызывающему. Вызывать под self._global_lock."""
+        inflight = self._inflight.get(url)
+        if inflight is not None:
+            return inflight, False
+        inflight = self._inflight[url] = _InFlight(url, local_path)
+        return inflight, True
+
+    def _resolve(self, inflight: _InFlight, result):
+        with self._global_lock:
+            if result:
+                self._remember(inflight.url, result)
+            if self._inflight.get(inflight.url) is inflight:
+                del self._inflight[inflight.url]
+            released = inflight.running
+            self._release(inflight)
+        inflight.future.set_result(result)
+        if released:
+            self._dispatch()
+
+    def _download_one(self, url, local_path, timeout, sha256=None):
         if not self.has_internet():
             logger.warning(f"Нет интернета, пропускаем загрузку {url}")
             return None
+        if not os.path.exists(local_path) and get_negative_cache().is_blocked(DOWNLOAD_SOURCE, url):
+            logger.warning(f"Предыдущая ошибка загрузки для {url}, пропускаем до истечения задержки")
+            return None
+        return download_with_cache(url, local_path, timeout, sha256)
+
+    def download(self, url, local_path, timeout=5, sha256=None):
+        """
+        Скачивает файл (или берёт уже скачанный); sha256 — ожидаемый хэш содержимого.
+        Если тот же URL ждёт в очереди асинхронных загрузок, он скачивается в этом потоке
+        и результат получают все ожидающие. Уже начатую загрузку ждёт не дольше timeout секунд.
+        """
         with self._global_lock:
-            if url in self._last_error:
-                logger.warning(f"Предыдущая ошибка загрузки для {url}, пропускаем")
+            cached = self._cached(url)
+            if cached is not None:
+                return cached
+            inflight, owner = self._claim(url, local_path)
+            stolen = not owner and self._steal(inflight)
+            if not owner and not stolen:
+                inflight.sync_waiters += 1
+        if stolen:
+            # Слот пула мог освободиться
+            self._dispatch()
+        elif not owner:
+            try:
+                return inflight.future.result(timeout)
+            except FutureTimeoutError:
+                with self._global_lock:
+                    inflight.sync_waiters -= 1
+                logger.warning(f"Загрузка {url} не завершилась за {timeout} с")
                 return None
-            if url in self._cache:
-                return self._cache[url]
-        url_lock = self._get_url_lock(url)
-        with url_lock:
-            with self._global_lock:
-                if url in self._last_error:
-                    return None
-                if url in self._cache:
-                    return self._cache[url]
-            result = download_with_cache(url, local_path, timeout, self)
-            with self._global_lock:
-                if result:
-                    self._cache[url] = result
-                if url in self._locks:
-                    del self._locks[url]
-            return result
+        result = None
+        try:
+            result = self._download_one(url, inflight.local_path, timeout, sha256)
+        finally:
+            self._resolve(inflight, result)
+        return result
 
-    def download_parallel(self, urls, local_paths, timeout=5):
+    def _steal(self, inflight: _InFlight) -> bool:
+        """
+        Забирает ещё не начатую загрузку (в очереди, отложенную или не взятую пулом),
+        чтобы её выполнил вызывающий поток. Вызывать под self._global_lock.
+        """
+        if inflight in self._queue:
+            self._queue.remove(inflight)
+        elif inflight.task is not None and inflight.running and self._pool.tryTake(inflight.task):
+            self._release(inflight)
+        else:
+            return False
+        logger.debug(f"Загрузка {inflight.url} выполняется синхронно вне очереди")
+        return True
+
+    def _download_many(self, urls, local_paths, timeout):
         if not self.has_internet():
             logger.warning("Нет интернета, пропускаем параллельную загрузку")
             return dict.fromkeys(urls)
@@ -167,73 +620,96 @@ class Downloader(QObject):
         filtered_urls = []
         filtered_paths = []
         with self._global_lock:
-            for url, path in zip(urls, local_paths, strict=False):
-                if url in self._last_error:
-                    logger.warning(f"Предыдущая ошибка загрузки для {url}, пропускаем")
-                    continue
-                if url in self._cache:
-                    continue
-                filtered_urls.append(url)
-                filtered_paths.append(path)
+            pending = [(url, path) for url, path in zip(urls, local_paths, strict=False) if self._cached(url) is None]
+        blocked = get_negative_cache().blocked_keys(DOWNLOAD_SOURCE, [url for url, path in pending if not os.path.exists(path)])
+        for url, path in pending:
+            if url in blocked:
+                logger.warning(f"Предыдущая ошибка загрузки для {url}, пропускаем до истечения задержки")
+                continue
+            filtered_urls.append(url)
+            filtered_paths.append(path)
 
-        results = download_with_parallel(filtered_urls, filtered_paths, max_workers=self.max_workers, timeout=timeout, downloader_instance=self)
+        results = download_with_parallel(filtered_urls, filtered_paths, max_workers=self.max_workers, timeout=timeout)
 
-        with self._global_lock:
-            for url, path in results.items():
-                if path:
-                    self._cache[url] = path
         # Для URL которые были пропущены, добавляем их из кэша или None
         final_results = {}
         with self._global_lock:
+            for url, path in results.items():
+                if path:
+                    self._remember(url, path)
             for url in urls:
-                if url in self._cache:
-                    final_results[url] = self._cache[url]
-                else:
-                    final_results[url] = None
+                final_results[url] = self._cached(url)
         return final_results
 
+    def download_parallel(self, urls, local_paths, timeout=5):
+        return self._download_many(urls, local_paths, timeout)
 
-    def download_async(self, url: str, local_path: str, timeout: int = 5, callback: Callable[[str | None], None] | None = None, parallel: bool = False) -> QThread:
-        class DownloadThread(QThread):
-            def __init__(self, downloader: 'Downloader', url: str, local_path: str, timeout: int, parallel: bool):
-                super().__init__()
-                self.downloader = downloader
-                self.url = url
-                self.local_path = local_path
-                self.timeout = timeout
-                self.parallel = parallel
-
-            def run(self):
-                try:
-                    if self.parallel:
-                        results = self.downloader.download_parallel([self.url], [self.local_path], timeout=self.timeout)
-                        result = results.get(self.url, None)
-                    else:
-                        result = self.downloader.download(self.url, self.local_path, self.timeout)
-                    success = result is not None
-                    logger.debug(f"Async download completed {self.url}: success={success}, path={result or ''}")
-                    self.downloader.download_completed.emit(self.url, result or "", success)
-                    if callback:
-                        callback(result)
-                except Exception as e:
-                    logger.error(f"Ошибка при асинхронной загрузке {self.url}: {e}")
-                    self.downloader.download_completed.emit(self.url, "", False)
-                    if callback:
-                        callback(None)
-
-        thread = DownloadThread(self, url, local_path, timeout, parallel)
-        thread.finished.connect(thread.deleteLater)
-
-        # Удалить из списка после завершения
-        def cleanup():
-            self._active_threads.remove(thread)
-
-        thread.finished.connect(cleanup)
-
-        self._active_threads.append(thread)  # Сохраняем поток, чтобы не уничтожился досрочно
-        logger.debug(f"Запуск потока для асинхронной загрузки {url}")
-        thread.start()
-        return thread
+    def download_async(self, url: str, local_path: str, timeout: int = 5, callback: Callable[[str | None], None] | None = None,
+                       parallel: bool = False, priority: int = PRIORITY_NORMAL) -> DownloadHandle:
+        """
+        Ставит загрузку в очередь. Загрузки с меньшим priority начинаются раньше.
+        Если этот URL уже скачивается или ждёт в очереди, вызов присоединяется к этой загрузке.
+        callback получает путь к файлу или None и не вызывается, если загрузка отменена.
+        Он всегда вызывается асинхронно, из цикла событий потока Downloader, даже если файл уже скачан.
+        """
+        handle = DownloadHandle(self, url, local_path, callback, priority)
+        with self._global_lock:
+            cached = self._cached(url)
+            if cached is None:
+                inflight, owner = self._claim(url, local_path)
+                inflight.handles.append(handle)
+                if owner:
+                    if self._qt_backend is None or parallel:
+                        inflight.task = _DownloadTask(self, inflight, timeout, parallel)
+                    inflight.priority = priority
+                    inflight.timeout = timeout
+                    inflight.seq = next(self._seq)
+                    logger.debug(f"Постановка в очередь асинхронной загрузки {url} (приоритет {priority})")
+                    self._queue.append(inflight)
+                elif priority < inflight.priority:
+                    # Если загрузка ещё в очереди, она начнётся раньше
+                    inflight.priority = priority
+        if cached is None and owner:
+            self._dispatch()
+        if cached is not None:
+            # Соединение с очередью: колбэк выполнится после возврата handle, как и после настоящей загрузки
+            self._task_finished.emit(handle, cached)
+        else:
+            inflight.future.add_done_callback(lambda future: self._task_finished.emit(handle, future.result()))
+        return handle
+
+    def _cancel(self, handle: DownloadHandle):
+        with self._global_lock:
+            inflight = self._inflight.get(handle.url)
+            if inflight is None or handle not in inflight.handles:
+                return
+            inflight.handles.remove(handle)
+            if inflight.handles or inflight.sync_waiters:
+                return
+            if inflight in self._queue:
+                self._queue.remove(inflight)
+            elif inflight.task is not None and self._pool.tryTake(inflight.task):
+                self._release(inflight)
+            else:
+                if inflight.task is None and inflight.reply is not None:
+                    self._abort_transfer.emit(inflight)
+                return
+            del self._inflight[handle.url]
+        logger.debug(f"Загрузка {handle.url} отменена до начала")
+        inflight.future.set_result(None)
+        self._dispatch()
+
+    def _on_task_finished(self, handle: DownloadHandle, result: str | None):
+        handle.done = True
+        if handle.cancelled:
+            return
+        self.download_completed.emit(handle.url, result or "", result is not None)
+        if handle._callback is None:
+            return
+        try:
+            handle._callback(result)
+        except Exception as e:
+            logger.error(f"Ошибка в обработчике загрузки {handle.url}: {e}")
 
     def clear_cache(self):
         with self._global_lock:
@@ -242,3 +718,17 @@ class Downloader(QObject):
     def is_cached(self, url):
         with self._global_lock:
             return url in self._cache
+
+
+_DOWNLOADER: Downloader | None = None
+
+def get_downloader() -> Downloader:
+    """
+    Общий для приложения загрузчик: обложки библиотеки и обложки Steam для add_to_steam стоят
+    в одной очереди, поэтому приоритеты и ограничения по хостам действуют на все загрузки.
+    Создавать в GUI-потоке.
+    """
+    global _DOWNLOADER
+    if _DOWNLOADER is None:
+        _DOWNLOADER = Downloader(max_workers=DOWNLOAD_WORKERS)
+    return _DOWNLOADER
@@ -3,13 +3,14 @@ from PySide6.QtCore import QEasingCurve, Signal, Property, Qt, QPropertyAnimatio
 from PySide6.QtWidgets import QFrame, QGraphicsDropShadowEffect, QVBoxLayout, QWidget, QStackedLayout, QLabel, QMenu
 from collections.abc import Callable
 import portprotonqt.themes.standart.styles as default_styles
-from portprotonqt.image_utils import load_pixmap_async, round_corners
+from portprotonqt.image_utils import load_pixmap_async
 from portprotonqt.localization import _
 from portprotonqt.config_utils import read_favorites, save_favorites
 from portprotonqt.theme_manager import ThemeManager
 from portprotonqt.config_utils import read_theme_from_config
 from portprotonqt.custom_widgets import ClickableLabel
-from portprotonqt.steam_api import is_game_in_steam
+from portprotonqt.downloader import PRIORITY_FOCUSED
+from portprotonqt.steam_api import is_game_in_steam, prioritize_app_metadata
 import weakref
 import os
 import subprocess
@@ -27,6 +28,7 @@ class GameCard(QFrame):
     addToSteamRequested = Signal(str, str, str)   # name, exec_line, cover_path
     removeFromSteamRequested = Signal(str, str)   # name, exec_line
     openGameFolderRequested = Signal(str, str)    # name, exec_line
+    rematchRequested = Signal(str, str)           # name, exec_line
 
     def __init__(self, name, description, cover_path, appid, controller_support, exec_line,
                  last_launch, formatted_playtime, protondb_tier, last_launch_ts, playtime_seconds, steam_game,
@@ -107,10 +109,13 @@ class GameCard(QFrame):
             if label is None:
                 # QLabel уже удалён — ничего не делаем
                 return
-            label.setPixmap(round_corners(pixmap, 15))
+            label.setPixmap(pixmap)
 
         # асинхронная загрузка обложки (пустая строка даст placeholder внутри load_pixmap_async)
-        load_pixmap_async(cover_path or "", card_width, int(card_width * 1.2), on_cover_loaded)
+        cover_request = load_pixmap_async(cover_path or "", card_width, int(card_width * 1.2), on_cover_loaded, radius=15)
+        if cover_request is not None:
+            # Карточки пересоздаются при изменении размера окна — незагруженная обложка больше не нужна
+            self.destroyed.connect(cover_request.cancel)
 
         # Значок избранного (звёздочка) в левом верхнем углу обложки
         self.favoriteLabel = ClickableLabel(coverWidget)
@@ -122,23 +127,8 @@ class GameCard(QFrame):
         self.favoriteLabel.raise_()
 
         # ProtonDB бейдж
-        tier_text = self.getProtonDBText(protondb_tier)
-        if tier_text:
-            icon_filename = self.getProtonDBIconFilename(protondb_tier)
-            icon = self.theme_manager.get_icon(icon_filename, self.current_theme_name)
-            self.protondbLabel = ClickableLabel(
-                tier_text,
-                icon=icon,
-                parent=coverWidget,
-                icon_size=16,
-                icon_space=3,
-            )
-            self.protondbLabel.setStyleSheet(self.theme.get_protondb_badge_style(protondb_tier))
-            protondb_visible = True
-        else:
-            self.protondbLabel = ClickableLabel("", parent=coverWidget, icon_size=16, icon_space=3)
-            self.protondbLabel.setVisible(False)
-            protondb_visible = False
+        self.protondbLabel = ClickableLabel("", parent=coverWidget, icon_size=16, icon_space=3)
+        self.protondbLabel.setVisible(False)
 
         # Steam бейдж
         steam_icon = self.theme_manager.get_icon("steam")
@@ -150,10 +140,38 @@ class GameCard(QFrame):
             icon_space=5,
         )
         self.steamLabel.setStyleSheet(self.theme.STEAM_BADGE_STYLE)
-        steam_visible = (str(steam_game).lower() == "true")
-        self.steamLabel.setVisible(steam_visible)
+        self.steamLabel.setVisible(str(steam_game).lower() == "true")
+
+        self.cover_width = card_width
+        self.updateProtonDBBadge(protondb_tier)
+
+        self.protondbLabel.raise_()
+        self.steamLabel.raise_()
+        self.protondbLabel.clicked.connect(self.open_protondb_report)
+        self.steamLabel.clicked.connect(self.open_steam_page)
+
+        layout.addWidget(coverWidget)
+
+        # Название игры
+        nameLabel = QLabel(name)
+        nameLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        nameLabel.setStyleSheet(self.theme.GAME_CARD_NAME_LABEL_STYLE)
+        layout.addWidget(nameLabel)
+
+    def updateProtonDBBadge(self, tier):
+        """Обновляет бейдж ProtonDB и расставляет бейджи в правом верхнем углу обложки."""
+        tier_text = self.getProtonDBText(tier)
+        if tier_text:
+            icon_filename = self.getProtonDBIconFilename(tier)
+            self.protondbLabel.setText(tier_text)
+            self.protondbLabel.setIcon(self.theme_manager.get_icon(icon_filename, self.current_theme_name))
+            self.protondbLabel.setStyleSheet(self.theme.get_protondb_badge_style(tier))
+        self.protondbLabel.setVisible(bool(tier_text))
+        protondb_visible = bool(tier_text)
+        steam_visible = not self.steamLabel.isHidden()
 
         # Расположение бейджей
+        card_width = self.cover_width
         right_margin = 8
         badge_spacing = 5
         top_y = 10
@@ -174,18 +192,15 @@ class GameCard(QFrame):
             protondb_x = card_width - protondb_width - right_margin
             self.protondbLabel.move(protondb_x, top_y)
 
-        self.protondbLabel.raise_()
-        self.steamLabel.raise_()
-        self.protondbLabel.clicked.connect(self.open_protondb_report)
-        self.steamLabel.clicked.connect(self.open_steam_page)
-
-        layout.addWidget(coverWidget)
-
-        # Название игры
-        nameLabel = QLabel(name)
-        nameLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        nameLabel.setStyleSheet(self.theme.GAME_CARD_NAME_LABEL_STYLE)
-        layout.addWidget(nameLabel)
+    def updateMetadata(self, changes: dict):
+        """
+        Применяет обновлённые метаданные игры {поле: (старое значение, новое)}.
+        Поля, заданные пользователем (например, своё описание), главное окно сюда не передаёт.
+        """
+        for field, (_old, new) in changes.items():
+            setattr(self, field, new)
+            if field == "protondb_tier":
+                self.updateProtonDBBadge(new)
 
     def getProtonDBText(self, tier):
         if not tier:
@@ -342,6 +357,9 @@ class GameCard(QFrame):
 
     def focusInEvent(self, event):
         self._focused = True
+        # Метаданные выбранной карточки запрашиваются раньше остальных
+        if self.appid:
+            prioritize_app_metadata([self.appid], PRIORITY_FOCUSED)
         self.thickness_anim.stop()
         if self._isPulseAnimationConnected:
             self.thickness_anim.finished.disconnect(self.startPulseAnimation)
@@ -456,6 +474,9 @@ class GameCard(QFrame):
                 add_steam_action = menu.addAction(_("Add to Steam"))
                 add_steam_action.triggered.connect(self.add_to_steam)
 
+            rematch_action = menu.addAction(_("Re-match Steam Data"))
+            rematch_action.triggered.connect(self.rematch)
+
         menu.exec(self.mapToGlobal(pos))
 
     def edit_shortcut(self):
@@ -479,6 +500,9 @@ class GameCard(QFrame):
     def add_to_steam(self):
         self.addToSteamRequested.emit(self.name, self.exec_line, self.cover_path)
 
+    def rematch(self):
+        self.rematchRequested.emit(self.name, self.exec_line)
+
     def remove_from_steam(self):
         self.removeFromSteamRequested.emit(self.name, self.exec_line)
 
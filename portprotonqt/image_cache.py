@@ -0,0 +1,277 @@
+import argparse
+import atexit
+import os
+import sys
+import threading
+import time
+from portprotonqt.config_utils import get_cache_dir, read_image_cache_config
+from portprotonqt.localization import _
+from portprotonqt.logger import get_logger
+from portprotonqt.metadata_store import IMAGE_CACHE_SOURCE, get_metadata_store
+
+logger = get_logger(__name__)
+
+# Время доступа записывается явно (os.utime), так как при relatime/noatime чтение его не обновляет,
+# но не чаще раза в сутки на файл. Время изменения не трогаем: оно входит в ключи миниатюр и палитр.
+TOUCH_INTERVAL = 24 * 60 * 60
+# Временные файлы прерванных загрузок и сохранений старше суток считаются брошенными
+PARTIAL_MAX_AGE = 24 * 60 * 60
+STATS_KEY = "stats"
+STATS_TTL = 10 * 365 * 24 * 60 * 60
+
+
+def get_cover_dir() -> str:
+    """Каталог скачанных обложек Steam ({appid}.jpg)."""
+    return os.path.join(get_cache_dir(), "images")
+
+
+def get_thumbnail_dir() -> str:
+    """Каталог готовых миниатюр обложек."""
+    return os.path.join(get_cache_dir(), "thumbnails")
+
+
+def _is_partial(name: str) -> bool:
+    return ".part" in name
+
+
+class _Entry:
+    """Файл кэша: каталог (images/thumbnails), путь, размер и время последнего доступа."""
+
+    def __init__(self, name: str, path: str, size: int, accessed: float, partial: bool):
+        self.name = name
+        self.path = path
+        self.size = size
+        self.accessed = accessed
+        self.partial = partial
+
+
+class ImageCache:
+    """
+    Кэш изображений на диске: скачанные обложки и миниатюры с общим ограничением по размеру.
+      - Доступ к файлам отмечается через touch() (время доступа файла), по нему prune()
+        удаляет давно не использовавшиеся файлы (max_age) и затем самые старые, пока кэш
+        не уложится в size_limit.
+      - Попадания и промахи считаются по каталогам и при выходе добавляются к общей статистике
+        в хранилище метаданных.
+    Методы безопасны в рабочих потоках.
+    """
+
+    def __init__(self, directories: dict[str, str], size_limit: int, max_age: float):
+        self.directories = directories
+        self.size_limit = size_limit
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        # Когда в этом сеансе отмечался доступ к файлу
+        self._touched: dict[str, float] = {}
+        self._counters = {name: {"hits": 0, "misses": 0} for name in directories}
+
+    def touch(self, path: str):
+        """Отмечает, что файл path только что использовался."""
+        now = time.time()
+        with self._lock:
+            if now - self._touched.get(path, 0) < TOUCH_INTERVAL:
+                return
+            self._touched[path] = now
+        try:
+            stat = os.stat(path)
+            if now - stat.st_atime >= TOUCH_INTERVAL:
+                os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+        except OSError:
+            pass
+
+    def record(self, name: str, hit: bool):
+        """Учитывает попадание или промах кэша в каталоге name."""
+        with self._lock:
+            self._counters[name]["hits" if hit else "misses"] += 1
+
+    def entries(self) -> list[_Entry]:
+        """Все файлы кэша."""
+        result = []
+        for name, directory in self.directories.items():
+            for root, _dirs, files in os.walk(directory):
+                for filename in files:
+                    path = os.path.join(root, filename)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    partial = _is_partial(filename)
+                    # Для временных файлов важно, когда они последний раз дописывались
+                    accessed = stat.st_mtime if partial else max(stat.st_atime, stat.st_mtime)
+                    result.append(_Entry(name, path, stat.st_size, accessed, partial))
+        return result
+
+    def usage(self) -> dict[str, dict]:
+        """Число файлов, временных файлов и байт в каждом каталоге."""
+        result = {name: {"files": 0, "partial": 0, "bytes": 0} for name in self.directories}
+        for entry in self.entries():
+            item = result[entry.name]
+            item["partial" if entry.partial else "files"] += 1
+            item["bytes"] += entry.size
+        return result
+
+    def _stored_stats(self) -> dict:
+        stats = get_metadata_store().get(IMAGE_CACHE_SOURCE, STATS_KEY) or {}
+        for name in self.directories:
+            stats.setdefault(name, {"hits": 0, "misses": 0})
+        return stats
+
+    def stats(self) -> dict:
+        """
+        Использование каталогов (usage()), попадания и промахи за всё время,
+        включая текущий сеанс, и итоги последних очисток.
+        """
+        stats = self._stored_stats()
+        with self._lock:
+            for name, counters in self._counters.items():
+                for counter, value in counters.items():
+                    stats[name][counter] += value
+        return {"usage": self.usage(), "counters": {name: stats[name] for name in self.directories},
+                "pruned_files": stats.get("pruned_files", 0), "pruned_bytes": stats.get("pruned_bytes", 0),
+                "last_prune": stats.get("last_prune"), "size_limit": self.size_limit, "max_age": self.max_age}
+
+    def save_stats(self, pruned_files: int = 0, pruned_bytes: int = 0):
+        """Добавляет счётчики сеанса (и итог очистки) к сохранённой статистике."""
+        with self._lock:
+            counters = self._counters
+            self._counters = {name: {"hits": 0, "misses": 0} for name in self.directories}
+        if not pruned_files and not any(value for item in counters.values() for value in item.values()):
+            return
+        store = get_metadata_store()
+        stats = self._stored_stats()
+        for name, item in counters.items():
+            for counter, value in item.items():
+                stats[name][counter] += value
+        if pruned_files:
+            stats["pruned_files"] = stats.get("pruned_files", 0) + pruned_files
+            stats["pruned_bytes"] = stats.get("pruned_bytes", 0) + pruned_bytes
+            stats["last_prune"] = time.time()
+        store.put(IMAGE_CACHE_SOURCE, STATS_KEY, stats, STATS_TTL)
+        store.flush()
+
+    def prune(self, size_limit: int | None = None, max_age: float | None = None,
+              dry_run: bool = False) -> tuple[int, int]:
+        """
+        Удаляет брошенные временные файлы, файлы без доступа дольше max_age секунд (0 — не удалять
+        по возрасту) и самые давно использованные, пока кэш больше size_limit байт.
+        По умолчанию ограничения берутся из настроек. Возвращает (удалено файлов, освобождено байт).
+        """
+        size_limit = self.size_limit if size_limit is None else size_limit
+        max_age = self.max_age if max_age is None else max_age
+        now = time.time()
+        entries = sorted(self.entries(), key=lambda entry: entry.accessed)
+        total = sum(entry.size for entry in entries)
+        victims = []
+        for entry in entries:
+            if entry.partial:
+                expired = now - entry.accessed > PARTIAL_MAX_AGE
+            else:
+                expired = (max_age > 0 and now - entry.accessed > max_age) or total > size_limit
+            if expired:
+                victims.append(entry)
+                total -= entry.size
+        removed = freed = 0
+        for entry in victims:
+            if not dry_run:
+                try:
+                    os.remove(entry.path)
+                except OSError as e:
+                    logger.warning(f"Не удалось удалить {entry.path} из кэша изображений: {e}")
+                    continue
+                with self._lock:
+                    self._touched.pop(entry.path, None)
+            removed += 1
+            freed += entry.size
+        if removed and not dry_run:
+            self._remove_empty_dirs()
+            self.save_stats(removed, freed)
+            logger.info(f"Кэш изображений очищен: удалено {removed} файлов, {freed / 2 ** 20:.1f} MiB")
+        return removed, freed
+
+    def _remove_empty_dirs(self):
+        for directory in self.directories.values():
+            for root, _dirs, _files in os.walk(directory, topdown=False):
+                if root != directory:
+                    try:
+                        os.rmdir(root)
+                    except OSError:
+                        pass
+
+    def prune_async(self):
+        """Запускает prune() в фоновом потоке."""
+        def run():
+            try:
+                self.prune()
+            except Exception as e:
+                logger.error(f"Ошибка очистки кэша изображений: {e}")
+        threading.Thread(target=run, name="image-cache-prune", daemon=True).start()
+
+
+_IMAGE_CACHE: ImageCache | None = None
+_IMAGE_CACHE_LOCK = threading.Lock()
+
+
+def get_image_cache() -> ImageCache:
+    """Общий кэш изображений с ограничениями из секции [Cache] настроек."""
+    global _IMAGE_CACHE
+    with _IMAGE_CACHE_LOCK:
+        if _IMAGE_CACHE is None:
+            config = read_image_cache_config()
+            _IMAGE_CACHE = ImageCache({"images": get_cover_dir(), "thumbnails": get_thumbnail_dir()},
+                                      config["size_mb"] * 1024 * 1024, config["max_age_days"] * 24 * 60 * 60)
+            atexit.register(_IMAGE_CACHE.save_stats)
+        return _IMAGE_CACHE
+
+
+def _format_size(size: int) -> str:
+    return f"{size / 2 ** 20:.1f} MiB"
+
+
+def print_stats(cache: ImageCache):
+    stats = cache.stats()
+    total_files = total_bytes = 0
+    print(_("Image cache: {path}").format(path=get_cache_dir()))
+    for name, usage in stats["usage"].items():
+        counters = stats["counters"][name]
+        requests = counters["hits"] + counters["misses"]
+        hit_rate = f"{counters['hits'] / requests:.1%}" if requests else "-"
+        print(_("  {name}: {files} files, {size}, {partial} partial; hit rate {rate} ({hits} of {requests})").format(
+            name=name, files=usage["files"], size=_format_size(usage["bytes"]), partial=usage["partial"],
+            rate=hit_rate, hits=counters["hits"], requests=requests))
+        total_files += usage["files"] + usage["partial"]
+        total_bytes += usage["bytes"]
+    max_age = stats["max_age"] // (24 * 60 * 60)
+    print(_("Total: {files} files, {size} of {limit}; unused files are kept for {days} days").format(
+        files=total_files, size=_format_size(total_bytes), limit=_format_size(stats["size_limit"]),
+        days=max_age if max_age else "∞"))
+    if stats["last_prune"]:
+        print(_("Pruned so far: {files} files, {size}; last prune {date}").format(
+            files=stats["pruned_files"], size=_format_size(stats["pruned_bytes"]),
+            date=time.strftime("%Y-%m-%d %H:%M", time.localtime(stats["last_prune"]))))
+
+
+def main(argv=None):
+    """portprotonqt-cache stats|prune — состояние и очистка кэша изображений."""
+    parser = argparse.ArgumentParser(prog="portprotonqt-cache", description=_("PortProtonQt image cache"))
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("stats", help=_("show cache size, entry counts and hit rate"))
+    prune_parser = commands.add_parser("prune", help=_("remove least recently used images"))
+    prune_parser.add_argument("--size-mb", type=int, help=_("size limit in MiB (default: from settings)"))
+    prune_parser.add_argument("--max-age-days", type=int, help=_("remove images unused for this many days, 0 to keep"))
+    prune_parser.add_argument("--dry-run", action="store_true", help=_("only report what would be removed"))
+    args = parser.parse_args(argv)
+
+    cache = get_image_cache()
+    if args.command == "prune":
+        size_limit = args.size_mb * 1024 * 1024 if args.size_mb is not None else None
+        max_age = args.max_age_days * 24 * 60 * 60 if args.max_age_days is not None else None
+        removed, freed = cache.prune(size_limit, max_age, dry_run=args.dry_run)
+        message = _("Would remove {files} files, {size}") if args.dry_run else _("Removed {files} files, {size}")
+        print(message.format(files=removed, size=_format_size(freed)))
+    else:
+        print_stats(cache)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,105 +1,133 @@
 import os
-from PySide6.QtGui import QPen, QColor, QPixmap, QPainter, QPainterPath
+from PySide6.QtGui import QPen, QColor, QImage, QPixmap, QPainter
 from PySide6.QtCore import Qt, QFile, QEvent, QByteArray, QEasingCurve, QPropertyAnimation
 from PySide6.QtWidgets import QGraphicsItem, QToolButton, QFrame, QLabel, QGraphicsScene, QHBoxLayout, QWidget, QGraphicsView, QVBoxLayout, QSizePolicy
 from PySide6.QtWidgets import QSpacerItem, QGraphicsPixmapItem, QDialog, QApplication
 import portprotonqt.themes.standart.styles as default_styles
 from portprotonqt.config_utils import read_theme_from_config
 from portprotonqt.theme_manager import ThemeManager
-from portprotonqt.downloader import Downloader
+from portprotonqt.downloader import PRIORITY_NORMAL, DownloadHandle, get_downloader, is_complete_image
+from portprotonqt.image_cache import get_cover_dir, get_image_cache
 from portprotonqt.logger import get_logger
+from portprotonqt.thumbnail_cache import device_pixel_ratio, get_thumbnail_loader, make_thumbnail
 from collections.abc import Callable
 
-downloader = Downloader()
+downloader = get_downloader()
+thumbnail_loader = get_thumbnail_loader()
 logger = get_logger(__name__)
 
-def load_pixmap_async(cover: str, width: int, height: int, callback: Callable[[QPixmap], None]):
+def steam_cover_path(cover: str) -> str | None:
+    """Путь, по которому кэшируется обложка с CDN Steam, или None для других обложек."""
+    if not cover or not cover.startswith("https://steamcdn-a.akamaihd.net/steam/apps/"):
+        return None
+    parts = cover.split("/")
+    appid = None
+    if "apps" in parts:
+        idx = parts.index("apps")
+        if idx + 1 < len(parts):
+            appid = parts[idx + 1]
+    if not appid:
+        return None
+    image_folder = get_cover_dir()
+    os.makedirs(image_folder, exist_ok=True)
+    return os.path.join(image_folder, f"{appid}.jpg")
+
+def cover_file(cover: str) -> str | None:
     """
-    Асинхронно загружает обложку и вызывает callback с готовым QPixmap.
+    Файл, из которого load_pixmap_async показывает обложку: скачанная обложка Steam,
+    локальный файл или placeholder темы. None, если такого файла нет (обложка ещё не скачана).
+    """
+    local_path = steam_cover_path(cover)
+    if local_path is not None:
+        return local_path if os.path.exists(local_path) and is_complete_image(local_path) else None
+    if cover and QFile.exists(cover):
+        return cover
+    placeholder_path = ThemeManager().get_theme_image("placeholder", read_theme_from_config())
+    return placeholder_path if placeholder_path and QFile.exists(placeholder_path) else None
+
+def load_pixmap_async(cover: str, width: int, height: int, callback: Callable[[QPixmap], None],
+                      priority: int = PRIORITY_NORMAL, radius: int = 0) -> DownloadHandle | None:
+    """
+    Асинхронно загружает обложку и вызывает callback с готовой миниатюрой width x height:
+    обрезанной по центру, с закруглёнными углами radius, для devicePixelRatio экрана.
+    Миниатюры кэшируются на диске, поэтому при пересоздании карточек читается маленький
+    готовый файл без повторного масштабирования, а показанные в этом сеансе — берутся из памяти.
+    Чтение и декодирование выполняются в пуле thumbnail_loader, callback вызывается в GUI-потоке
+    (сразу, если миниатюра уже в памяти).
+    Если обложку нужно скачать, возвращает DownloadHandle, через который загрузку можно отменить.
     """
     theme_manager = ThemeManager()
     current_theme_name = read_theme_from_config()
 
-    def finish_with(pixmap: QPixmap):
-        # Обрезаем и масштабируем
-        scaled = pixmap.scaled(width, height, Qt.AspectRatioMode.KeepAspectRatioByExpanding, Qt.TransformationMode.SmoothTransformation)
-        x = (scaled.width() - width) // 2
-        y = (scaled.height() - height) // 2
-        cropped = scaled.copy(x, y, width, height)
-        callback(cropped)
+    def finish_with_file(path: str, fallback: Callable[[], None]):
+        def on_thumbnail(pixmap: QPixmap):
+            if pixmap.isNull():
+                fallback()
+            else:
+                callback(pixmap)
+        thumbnail_loader.load(path, width, height, on_thumbnail, radius, priority)
+
+    def finish_with_no_image():
+        image = QImage(width, height, QImage.Format.Format_RGB32)
+        image.fill(QColor("#333333"))
+        painter = QPainter(image)
+        painter.setPen(QPen(QColor("white")))
+        painter.drawText(image.rect(), Qt.AlignmentFlag.AlignCenter, "No Image")
+        painter.end()
+        dpr = device_pixel_ratio()
+        pixmap = QPixmap.fromImage(make_thumbnail(image, width, height, radius, dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        callback(pixmap)
+
+    def finish_with_placeholder():
+        placeholder_path = theme_manager.get_theme_image("placeholder", current_theme_name)
+        if placeholder_path and QFile.exists(placeholder_path):
+            finish_with_file(placeholder_path, finish_with_no_image)
+        else:
+            finish_with_no_image()
 
     # Проверяем CDN Steam
-    if cover and cover.startswith("https://steamcdn-a.akamaihd.net/steam/apps/"):
-        try:
-            parts = cover.split("/")
-            appid = None
-            if "apps" in parts:
-                idx = parts.index("apps")
-                if idx + 1 < len(parts):
-                    appid = parts[idx + 1]
-            if appid:
-                xdg_cache_home = os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
-                image_folder = os.path.join(xdg_cache_home, "PortProtonQT", "images")
-                os.makedirs(image_folder, exist_ok=True)
-                local_path = os.path.join(image_folder, f"{appid}.jpg")
-
-                if os.path.exists(local_path):
-                    pixmap = QPixmap(local_path)
-                    return finish_with(pixmap)
-
-                def on_downloaded(result: str | None):
-                    pixmap = QPixmap()
-                    if result and os.path.exists(result):
-                        pixmap.load(result)
-                    if pixmap.isNull():
-                        placeholder = QPixmap(theme_manager.get_theme_image("placeholder", current_theme_name))
-                        finish_with(placeholder)
-                    else:
-                        finish_with(pixmap)
-
-                downloader.download_async(cover, local_path, timeout=5, callback=on_downloaded)
-                return  # из функции выходим — обработка продолжится в callback
-        except Exception as e:
-            logger.error(f"Ошибка обработки URL {cover}: {e}")
+    try:
+        local_path = steam_cover_path(cover)
+        if local_path is not None:
+            # Повторный показ обложки берётся из памяти без обращения к файлу
+            cached = thumbnail_loader.cached(local_path, width, height, radius)
+            image_cache = get_image_cache()
+            if cached is not None:
+                image_cache.touch(local_path)
+                image_cache.record("images", True)
+                callback(cached)
+                return None
+
+            # Обрезанная обложка (прерванная загрузка старых версий) скачивается заново
+            if os.path.exists(local_path) and is_complete_image(local_path):
+                image_cache.touch(local_path)
+                image_cache.record("images", True)
+                finish_with_file(local_path, finish_with_placeholder)
+                return None
+            image_cache.record("images", False)
+
+            def on_downloaded(result: str | None):
+                if result and os.path.exists(result):
+                    finish_with_file(result, finish_with_placeholder)
+                else:
+                    finish_with_placeholder()
+
+            # из функции выходим — обработка продолжится в callback
+            return downloader.download_async(cover, local_path, timeout=5, callback=on_downloaded, priority=priority)
+    except Exception as e:
+        logger.error(f"Ошибка обработки URL {cover}: {e}")
 
     # Локальный файл
     if cover and QFile.exists(cover):
-        pixmap = QPixmap(cover)
-        return finish_with(pixmap)
+        finish_with_file(cover, finish_with_placeholder)
+        return None
 
     # Placeholder
-    placeholder_path = theme_manager.get_theme_image("placeholder", current_theme_name)
-    pixmap = QPixmap()
-    if placeholder_path and QFile.exists(placeholder_path):
-        pixmap.load(placeholder_path)
-    if pixmap.isNull():
-        pixmap = QPixmap(width, height)
-        pixmap.fill(QColor("#333333"))
-        painter = QPainter(pixmap)
-        painter.setPen(QPen(QColor("white")))
-        painter.drawText(pixmap.rect(), Qt.AlignmentFlag.AlignCenter, "No Image")
-        painter.end()
-    finish_with(pixmap)
+    finish_with_placeholder()
+    return None
 
 
-def round_corners(pixmap, radius):
-    """
-    Возвращает QPixmap с закруглёнными углами.
-    """
-    if pixmap.isNull():
-        return pixmap
-    size = pixmap.size()
-    rounded = QPixmap(size)
-    rounded.fill(QColor(0, 0, 0, 0))
-    painter = QPainter(rounded)
-    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-    path = QPainterPath()
-    path.addRoundedRect(0, 0, size.width(), size.height(), radius, radius)
-    painter.setClipPath(path)
-    painter.drawPixmap(0, 0, pixmap)
-    painter.end()
-    return rounded
-
 class FullscreenDialog(QDialog):
     """
     Диалог для просмотра изображений без стандартных элементов управления.
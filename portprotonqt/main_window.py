@@ -14,8 +14,15 @@ from portprotonqt.game_card import GameCard
 from portprotonqt.custom_widgets import FlowLayout, ClickableLabel, AutoSizeButton, NavLabel
 from portprotonqt.input_manager import InputManager
 
-from portprotonqt.image_utils import load_pixmap_async, round_corners, ImageCarousel
-from portprotonqt.steam_api import get_steam_game_info_async, get_full_steam_game_info_async, get_steam_installed_games, add_to_steam, remove_from_steam
+from portprotonqt.image_cache import get_image_cache
+from portprotonqt.image_utils import cover_file, load_pixmap_async, ImageCarousel
+from portprotonqt.palette import get_palette_loader
+from portprotonqt.connectivity import watch_network_information
+from portprotonqt.downloader import PRIORITY_FOCUSED, PRIORITY_NORMAL, PRIORITY_VISIBLE, reload_proxy_config
+from portprotonqt.steam_api import (
+    get_steam_games_info_async, get_steam_apps_info_async, get_steam_installed_games, add_to_steam, remove_from_steam, rematch_game,
+    add_metadata_listener, prioritize_app_metadata, revalidate_stale_metadata
+)
 from portprotonqt.theme_manager import ThemeManager, load_theme_screenshots, load_logo
 from portprotonqt.time_utils import save_last_launch, get_last_launch, parse_playtime_file, format_playtime, get_last_launch_timestamp, format_last_launch
 from portprotonqt.config_utils import (
@@ -32,7 +39,6 @@ from PySide6.QtGui import QIcon, QPixmap, QColor, QDesktopServices
 from PySide6.QtCore import Qt, QAbstractAnimation, QPropertyAnimation, QByteArray, QUrl, Signal, QTimer, Slot
 from typing import cast
 from collections.abc import Callable
-from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 logger = get_logger(__name__)
@@ -43,6 +49,7 @@ class MainWindow(QMainWindow):
     games_loaded = Signal(list)
     update_progress = Signal(int)  # Signal to update progress bar
     update_status_message = Signal(str, int)  # Signal to update status message
+    metadata_updated = Signal(int, dict)  # appid, {field: (old, new)} after background revalidation
 
     def __init__(self):
         super().__init__()
@@ -51,11 +58,21 @@ class MainWindow(QMainWindow):
         self.currentDetailPage = None
         self.current_play_button = None
         self.pending_games = []
+        # {appid: изменения метаданных}, полученные, пока загружается библиотека (None — не загружается)
+        self.early_metadata_updates: dict[str, dict] | None = None
+        # {exec_line: поля}, заданные пользователем или встроенными данными игры; обновления из Steam их не меняют
+        self.overridden_fields: dict[str, set[str]] = {}
         self.total_games = 0
         self.games_load_timer = QTimer(self)
         self.games_load_timer.setSingleShot(True)
         self.games_load_timer.timeout.connect(self.finalize_game_loading)
         self.games_loaded.connect(self.on_games_loaded)
+        self.metadata_updated.connect(self.on_metadata_updated)
+        # Подключение перепроверяется сразу при изменении сети, а не только по таймеру
+        watch_network_information()
+        # Кэш изображений на диске приводится к заданному в настройках размеру
+        get_image_cache().prune_async()
+        add_metadata_listener(self.metadata_updated.emit)
 
         read_time_config()
 
@@ -165,7 +182,11 @@ class MainWindow(QMainWindow):
 
     @Slot(list)
     def on_games_loaded(self, games: list[tuple]):
-        self.games = games
+        # Метаданные, пришедшие раньше самой библиотеки, применяются до построения сетки
+        early_updates, self.early_metadata_updates = self.early_metadata_updates, None
+        self.games = [self._apply_metadata_changes(game, self._applicable_metadata_changes(
+                          game[4], early_updates.get(str(game[3]), {})))
+                      for game in games] if early_updates else games
         favorites = read_favorites()
         sort_method = read_sort_method()
 
@@ -191,16 +212,53 @@ class MainWindow(QMainWindow):
 
         self.updateGameGrid()
         self.progress_bar.setVisible(False)
+        # Устаревшие данные магазина и ProtonDB обновляются в фоне, когда библиотека уже показана
+        QTimer.singleShot(3000, revalidate_stale_metadata)
+
+    @Slot(int, dict)
+    def on_metadata_updated(self, appid: int, changes: dict):
+        """
+        Переносит полученные в фоне описание, поддержку контроллера и рейтинг ProtonDB в игры и карточки.
+        Пока библиотека загружается, изменения запоминаются и применяются в on_games_loaded.
+        """
+        if self.early_metadata_updates is not None:
+            self.early_metadata_updates.setdefault(str(appid), {}).update(changes)
+        for i, game in enumerate(self.games):
+            if str(game[3]) == str(appid):
+                self.games[i] = self._apply_metadata_changes(game, self._applicable_metadata_changes(game[4], changes))
+        for i in range(self.gamesListLayout.count()):
+            item = self.gamesListLayout.itemAt(i)
+            card = item.widget() if item is not None else None
+            if isinstance(card, GameCard) and str(card.appid) == str(appid):
+                card.updateMetadata(self._applicable_metadata_changes(card.exec_line, changes))
+
+    def _applicable_metadata_changes(self, exec_line: str, changes: dict) -> dict:
+        """Изменения без полей, которые для этой игры заданы пользователем или встроенными данными."""
+        overridden = self.overridden_fields.get(exec_line, ())
+        return {field: change for field, change in changes.items() if field not in overridden}
+
+    @staticmethod
+    def _apply_metadata_changes(game: tuple, changes: dict) -> tuple:
+        """Кортеж игры с изменениями {поле: (старое значение, новое)}."""
+        fields = {"description": 1, "controller_support": 5, "protondb_tier": 8}
+        game = list(game)
+        for field, (_old, new) in changes.items():
+            game[fields[field]] = new
+        return tuple(game)
 
     def loadGames(self):
         display_filter = read_display_filter()
         favorites = read_favorites()
+        # Геометрию окна можно читать только в GUI-потоке, а Steam-игры загружаются и из рабочего
+        first_screen_count = self._first_screen_card_count()
+        self.early_metadata_updates = {}
+        self.overridden_fields = {}
         self.pending_games = []
         self.games = []
         self.progress_bar.setValue(0)
         self.progress_bar.setVisible(True)
         if display_filter == "steam":
-            self._load_steam_games_async(lambda games: self.games_loaded.emit(games))
+            self._load_steam_games_async(lambda games: self.games_loaded.emit(games), first_screen_count)
         elif display_filter == "portproton":
             self._load_portproton_games_async(lambda games: self.games_loaded.emit(games))
         elif display_filter == "favorites":
@@ -209,7 +267,7 @@ class MainWindow(QMainWindow):
                 self.games_loaded.emit(games)
             self._load_portproton_games_async(
                 lambda pg: self._load_steam_games_async(
-                    lambda sg: on_all_games(pg, sg)
+                    lambda sg: on_all_games(pg, sg), first_screen_count
                 )
             )
         else:
@@ -224,12 +282,12 @@ class MainWindow(QMainWindow):
                 self.games_loaded.emit(games)
             self._load_portproton_games_async(
                 lambda pg: self._load_steam_games_async(
-                    lambda sg: on_all_games(pg, sg)
+                    lambda sg: on_all_games(pg, sg), first_screen_count
                 )
             )
         return []
 
-    def _load_steam_games_async(self, callback: Callable[[list[tuple]], None]):
+    def _load_steam_games_async(self, callback: Callable[[list[tuple]], None], first_screen_count: int):
         steam_games = []
         installed_games = get_steam_installed_games()
         logger.info("Found %d installed Steam games: %s", len(installed_games), [g[0] for g in installed_games])
@@ -239,45 +297,59 @@ class MainWindow(QMainWindow):
         self.total_games = len(installed_games)
         self.update_progress.emit(0)  # Initialize progress bar
         self.update_status_message.emit(_("Loading Steam games..."), 3000)
-        processed_count = 0
-
-        def on_game_info(info: dict, name, appid, last_played, playtime_seconds):
-            nonlocal processed_count
-            if not info:
-                logger.warning("No info retrieved for game %s (appid %s)", name, appid)
-                info = {
-                    'description': '',
-                    'cover': '',
-                    'controller_support': '',
-                    'protondb_tier': '',
-                    'name': name,
-                    'steam_game': 'true'
-                }
-            last_launch = format_last_launch(datetime.fromtimestamp(last_played)) if last_played else _("Never")
-            steam_games.append((
-                name,
-                info.get('description', ''),
-                info.get('cover', ''),
-                appid,
-                f"steam://rungameid/{appid}",
-                info.get('controller_support', ''),
-                last_launch,
-                format_playtime(playtime_seconds),
-                info.get('protondb_tier', ''),
-                last_played,
-                playtime_seconds,
-                "true"
-            ))
-            processed_count += 1
-            self.pending_games.append(None)
+
+        def on_steam_infos(infos: dict[int, dict]):
+            for name, appid, last_played, playtime_seconds in installed_games:
+                info = infos.get(appid)
+                if not info:
+                    logger.warning("No info retrieved for game %s (appid %s)", name, appid)
+                    info = {
+                        'description': '',
+                        'cover': '',
+                        'controller_support': '',
+                        'protondb_tier': '',
+                        'name': name,
+                        'steam_game': 'true'
+                    }
+                last_launch = format_last_launch(datetime.fromtimestamp(last_played)) if last_played else _("Never")
+                steam_games.append((
+                    name,
+                    info.get('description', ''),
+                    info.get('cover', ''),
+                    appid,
+                    f"steam://rungameid/{appid}",
+                    info.get('controller_support', ''),
+                    last_launch,
+                    format_playtime(playtime_seconds),
+                    info.get('protondb_tier', ''),
+                    last_played,
+                    playtime_seconds,
+                    "true"
+                ))
+                self.pending_games.append(None)
             self.update_progress.emit(len(self.pending_games))  # Update progress bar
-            logger.info("Game %s processed, processed_count: %d/%d", name, processed_count, len(installed_games))
-            if processed_count == len(installed_games):
-                callback(steam_games)
+            callback(steam_games)
 
-        for name, appid, last_played, playtime_seconds in installed_games:
-            logger.debug("Requesting info for game %s (appid %s)", name, appid)
-            get_full_steam_game_info_async(appid, lambda info, n=name, a=appid, lp=last_played, pt=playtime_seconds: on_game_info(info, n, a, lp, pt))
+        # Избранные и недавно запущенные игры стоят в начале сетки, их данные запрашиваются первыми
+        favorites = read_favorites()
+        first_screen = sorted(installed_games, key=lambda g: (g[0] not in favorites, -g[2]))[:first_screen_count]
+        visible_appids = {appid for _name, appid, _last_played, _playtime in first_screen}
+        get_steam_apps_info_async(
+            [appid for _name, appid, _last_played, _playtime in installed_games],
+            on_steam_infos,
+            [PRIORITY_VISIBLE if appid in visible_appids else PRIORITY_NORMAL
+             for _name, appid, _last_played, _playtime in installed_games]
+        )
+
+    def _first_screen_card_count(self) -> int:
+        """Примерное число карточек, помещающихся на первом экране библиотеки."""
+        viewport = self.gamesScrollArea.viewport()
+        width = max(viewport.width(), self.width())
+        height = max(viewport.height(), self.height())
+        spacing = max(0, self.gamesListLayout.spacing())
+        columns = max(1, (width - 40) // (self.card_width + spacing))
+        rows = height // int(self.card_width * 1.6) + 1
+        return columns * rows
 
     def _load_portproton_games_async(self, callback: Callable[[list[tuple]], None]):
         games = []
@@ -294,26 +366,53 @@ class MainWindow(QMainWindow):
         self.total_games = len(desktop_files)
         self.update_progress.emit(0)  # Initialize progress bar
         self.update_status_message.emit(_("Loading PortProton games..."), 3000)
-        def on_desktop_processed(result: tuple | None, games=games):
-            if result:
-                games.append(result)
-            self.pending_games.append(None)
+
+        playtime_data = {}
+        statistics_file = os.path.join(portproton_location, "data", "tmp", "statistics")
+        try:
+            playtime_data = parse_playtime_file(statistics_file)
+        except Exception as e:
+            logger.error("Failed to parse playtime data: %s", e)
+
+        desktop_games = []
+        for file_path in desktop_files:
+            desktop_game = self._read_desktop_file(file_path, playtime_data)
+            if desktop_game is not None:
+                desktop_games.append(desktop_game)
+            else:
+                self.pending_games.append(None)
+        self.update_progress.emit(len(self.pending_games))
+        if not desktop_games:
+            callback(games)
+            return
+
+        def on_steam_infos(steam_infos: list[dict]):
+            for desktop_game, steam_info in zip(desktop_games, steam_infos, strict=True):
+                games.append(self._build_portproton_game(desktop_game, steam_info))
+                self.pending_games.append(None)
             self.update_progress.emit(len(self.pending_games))  # Update progress bar
-            if len(self.pending_games) == len(desktop_files):
-                callback(games)
-        with ThreadPoolExecutor() as executor:
-            for file_path in desktop_files:
-                executor.submit(self._process_desktop_file_async, file_path, on_desktop_processed)
+            callback(games)
 
-    def _process_desktop_file_async(self, file_path: str, callback: Callable[[tuple | None], None]):
+        favorites = read_favorites()
+        get_steam_games_info_async(
+            [(desktop_game["desktop_name"], desktop_game["exec_line"]) for desktop_game in desktop_games],
+            on_steam_infos,
+            # Избранные всегда в начале сетки, их данные запрашиваются первыми
+            [PRIORITY_VISIBLE if desktop_game["desktop_name"] in favorites else PRIORITY_NORMAL
+             for desktop_game in desktop_games]
+        )
+
+    def _read_desktop_file(self, file_path: str, playtime_data: dict) -> dict | None:
+        """
+        Читает .desktop файл и пользовательские/встроенные переопределения игры.
+        Возвращает None, если файл не описывает игру.
+        """
         entry = parse_desktop_entry(file_path)
         if not entry:
-            callback(None)
-            return
+            return None
         desktop_name = entry.get("Name", _("Unknown Game"))
         if desktop_name.lower() in ["portproton", "readme"]:
-            callback(None)
-            return
+            return None
         exec_line = entry.get("Exec", "")
         game_exe = ""
         exe_name = ""
@@ -378,45 +477,56 @@ class MainWindow(QMainWindow):
                         elif line.startswith("description="):
                             user_desc = line[len("description="):].strip()
 
-            if self.portproton_location:
-                statistics_file = os.path.join(self.portproton_location, "data", "tmp", "statistics")
-                try:
-                    playtime_data = parse_playtime_file(statistics_file)
-                    matching_key = next(
-                        (key for key in playtime_data if os.path.basename(key).split('.')[0] == exe_name),
-                        None
-                    )
-                    if matching_key:
-                        playtime_seconds = playtime_data[matching_key]
-                        formatted_playtime = format_playtime(playtime_seconds)
-                except Exception as e:
-                    print(f"Failed to parse playtime data: {e}")
-
-        def on_steam_info(steam_info: dict):
-            final_name = user_name or builtin_name or desktop_name
-            final_desc = (user_desc if user_desc is not None else
-                        builtin_desc if builtin_desc is not None else
-                        steam_info.get("description", ""))
-            final_cover = (user_cover if user_cover else
-                        builtin_cover if builtin_cover else
-                        steam_info.get("cover", "") or entry.get("Icon", ""))
-            steam_game = "false"
-            callback((
-                final_name,
-                final_desc,
-                final_cover,
-                steam_info.get("appid", ""),
-                exec_line,
-                steam_info.get("controller_support", ""),
-                get_last_launch(exe_name) if exe_name else _("Never"),
-                formatted_playtime,
-                steam_info.get("protondb_tier", ""),
-                get_last_launch_timestamp(exe_name) if exe_name else 0,
-                playtime_seconds,
-                steam_game
-            ))
-
-        get_steam_game_info_async(desktop_name, exec_line, on_steam_info)
+            matching_key = next(
+                (key for key in playtime_data if os.path.basename(key).split('.')[0] == exe_name),
+                None
+            )
+            if matching_key:
+                playtime_seconds = playtime_data[matching_key]
+                formatted_playtime = format_playtime(playtime_seconds)
+
+        return {
+            "desktop_name": desktop_name,
+            "exec_line": exec_line,
+            "exe_name": exe_name,
+            "icon": entry.get("Icon", ""),
+            "builtin_cover": builtin_cover,
+            "builtin_name": builtin_name,
+            "builtin_desc": builtin_desc,
+            "user_cover": user_cover,
+            "user_name": user_name,
+            "user_desc": user_desc,
+            "playtime_seconds": playtime_seconds,
+            "formatted_playtime": formatted_playtime,
+        }
+
+    def _build_portproton_game(self, desktop_game: dict, steam_info: dict) -> tuple:
+        """Собирает кортеж игры из данных .desktop файла и найденной информации Steam."""
+        exe_name = desktop_game["exe_name"]
+        final_name = desktop_game["user_name"] or desktop_game["builtin_name"] or desktop_game["desktop_name"]
+        final_desc = (desktop_game["user_desc"] if desktop_game["user_desc"] is not None else
+                    desktop_game["builtin_desc"] if desktop_game["builtin_desc"] is not None else
+                    steam_info.get("description", ""))
+        final_cover = (desktop_game["user_cover"] if desktop_game["user_cover"] else
+                    desktop_game["builtin_cover"] if desktop_game["builtin_cover"] else
+                    steam_info.get("cover", "") or desktop_game["icon"])
+        if desktop_game["user_desc"] is not None or desktop_game["builtin_desc"] is not None:
+            self.overridden_fields[desktop_game["exec_line"]] = {"description"}
+        steam_game = "false"
+        return (
+            final_name,
+            final_desc,
+            final_cover,
+            steam_info.get("appid", ""),
+            desktop_game["exec_line"],
+            steam_info.get("controller_support", ""),
+            get_last_launch(exe_name) if exe_name else _("Never"),
+            desktop_game["formatted_playtime"],
+            steam_info.get("protondb_tier", ""),
+            get_last_launch_timestamp(exe_name) if exe_name else 0,
+            desktop_game["playtime_seconds"],
+            steam_game
+        )
 
     def finalize_game_loading(self):
         logger.info("Finalizing game loading, pending_games: %d", len(self.pending_games))
@@ -494,6 +604,14 @@ class MainWindow(QMainWindow):
 
         scrollArea.setWidget(self.gamesListWidget)
         layout.addWidget(scrollArea)
+        self.gamesScrollArea = scrollArea
+
+        # Метаданные карточек, оказавшихся на экране после прокрутки, запрашиваются раньше остальных
+        self.visibleCardsTimer = QTimer(self)
+        self.visibleCardsTimer.setSingleShot(True)
+        self.visibleCardsTimer.setInterval(150)
+        self.visibleCardsTimer.timeout.connect(self.prioritizeVisibleCards)
+        scrollArea.verticalScrollBar().valueChanged.connect(self.visibleCardsTimer.start)
 
         # Слайдер для изменения размера карточек:
         sliderLayout = QHBoxLayout()
@@ -565,12 +683,14 @@ class MainWindow(QMainWindow):
             card.addToSteamRequested.connect(self.add_to_steam)
             card.removeFromSteamRequested.connect(self.remove_from_steam_context)
             card.openGameFolderRequested.connect(self.open_game_folder)
+            card.rematchRequested.connect(self.rematch_game)
             self.gamesListLayout.addWidget(card)
 
         # Принудительно обновляем геометрию лейаута
         self.gamesListWidget.updateGeometry()
         self.gamesListLayout.invalidate()
         self.gamesListWidget.update()
+        self.visibleCardsTimer.start()
 
     def populateGamesGrid(self, games_list, columns=4):
         self.clearLayout(self.gamesListLayout)
@@ -586,7 +706,20 @@ class MainWindow(QMainWindow):
             card.addToSteamRequested.connect(self.add_to_steam)
             card.removeFromSteamRequested.connect(self.remove_from_steam_context)
             card.openGameFolderRequested.connect(self.open_game_folder)
+            card.rematchRequested.connect(self.rematch_game)
             self.gamesListLayout.addWidget(card)
+        self.visibleCardsTimer.start()
+
+    def prioritizeVisibleCards(self):
+        """Поднимает в очереди запросы метаданных для карточек, видимых в области прокрутки."""
+        appids = []
+        for i in range(self.gamesListLayout.count()):
+            item = self.gamesListLayout.itemAt(i)
+            card = item.widget() if item is not None else None
+            if isinstance(card, GameCard) and card.appid and not card.visibleRegion().isEmpty():
+                appids.append(card.appid)
+        if appids:
+            prioritize_app_metadata(appids, PRIORITY_VISIBLE)
 
     def clearLayout(self, layout):
         """Удаляет все виджеты из layout."""
@@ -869,6 +1002,7 @@ class MainWindow(QMainWindow):
         proxy_user = self.proxyUserEdit.text().strip()
         proxy_password = self.proxyPasswordEdit.text().strip()
         save_proxy_config(proxy_url, proxy_user, proxy_password)
+        reload_proxy_config()
 
         # Перезагружаем настройки
         read_time_config()
@@ -1000,45 +1134,22 @@ class MainWindow(QMainWindow):
 
     # ЛОГИКА ДЕТАЛЬНОЙ СТРАНИЦЫ ИГРЫ
     def getColorPalette_async(self, cover_path, num_colors=5, sample_step=10, callback=None):
-        def on_pixmap(pixmap):
-            if pixmap.isNull():
-                if callback:
-                    callback([QColor("#1a1a1a")] * num_colors)
-                    return
-
-            image = pixmap.toImage()
-            width, height = image.width(), image.height()
-            histogram = {}
-            for x in range(0, width, sample_step):
-                for y in range(0, height, sample_step):
-                    color = image.pixelColor(x, y)
-                    key = (color.red() // 32, color.green() // 32, color.blue() // 32)
-                    if key in histogram:
-                        histogram[key][0] += color.red()
-                        histogram[key][1] += color.green()
-                        histogram[key][2] += color.blue()
-                        histogram[key][3] += 1
-                    else:
-                        histogram[key] = [color.red(), color.green(), color.blue(), 1]
-            avg_colors = []
-            for _unused, (r_sum, g_sum, b_sum, count) in histogram.items():
-                avg_r = r_sum // count
-                avg_g = g_sum // count
-                avg_b = b_sum // count
-                avg_colors.append((count, QColor(avg_r, avg_g, avg_b)))
-            avg_colors.sort(key=lambda x: x[0], reverse=True)
-            palette = [color for count, color in avg_colors[:num_colors]]
-            if len(palette) < num_colors:
-                palette += [palette[-1]] * (num_colors - len(palette))
+        def on_palette(colors):
             if callback:
-                callback(palette)
+                callback([QColor(color) for color in colors] or [QColor("#1a1a1a")] * num_colors)
 
-        load_pixmap_async(cover_path, 180, 250, on_pixmap)
+        path = cover_file(cover_path)
+        if path is None:
+            on_palette([])
+            return
+        get_palette_loader().load(path, on_palette, num_colors, sample_step)
 
     def darkenColor(self, color, factor=200):
         return color.darker(factor)
 
     def openGameDetailPage(self, name, description, cover_path=None, appid="", exec_line="", controller_support="", last_launch="", formatted_playtime="", protondb_tier="", steam_game=""):
+        if appid:
+            prioritize_app_metadata([appid], PRIORITY_FOCUSED)
         detailPage = QWidget()
         self._animations = {}
         imageLabel = QLabel()
@@ -1046,8 +1157,7 @@ class MainWindow(QMainWindow):
 
         if cover_path:
             def on_pixmap_ready(pixmap):
-                rounded = round_corners(pixmap, 10)
-                imageLabel.setPixmap(rounded)
+                imageLabel.setPixmap(pixmap)
 
                 def on_palette_ready(palette):
                     dark_palette = [self.darkenColor(color, factor=200) for color in palette]
@@ -1058,7 +1168,7 @@ class MainWindow(QMainWindow):
 
                 self.getColorPalette_async(cover_path, num_colors=5, callback=on_palette_ready)
 
-            load_pixmap_async(cover_path, 300, 400, on_pixmap_ready)
+            load_pixmap_async(cover_path, 300, 400, on_pixmap_ready, PRIORITY_FOCUSED, radius=10)
         else:
             detailPage.setStyleSheet(self.theme.DETAIL_PAGE_NO_COVER_STYLE)
 
@@ -1913,6 +2023,19 @@ class MainWindow(QMainWindow):
         else:
             QMessageBox.warning(self, _("Error"), message)
 
+    def rematch_game(self, game_name, exec_line):
+        """Сбрасывает сохранённое сопоставление игры со Steam и перезагружает библиотеку."""
+        if not exec_line or exec_line.strip() in ("full", "partial", "none"):
+            desktop_path = os.path.join(self.portproton_location or "", f"{game_name}.desktop")
+            entry = parse_desktop_entry(desktop_path) if os.path.exists(desktop_path) else None
+            exec_line = entry.get("Exec", "") if entry else ""
+        if not exec_line:
+            QMessageBox.warning(self, _("Error"), _("No executable command found for game: {0}").format(game_name))
+            return
+        rematch_game(exec_line)
+        self.statusBar().showMessage(_("Re-matching '{0}' with Steam...").format(game_name), 3000)
+        self.loadGames()
+
     def open_game_folder(self, game_name, exec_line):
         """Open the folder containing the game's executable, with exec_line validation and .desktop fallback."""
         if self.portproton_location is None:
@@ -0,0 +1,212 @@
+import itertools
+import random
+import threading
+import time
+from collections.abc import Callable
+from urllib.parse import urlsplit
+import requests
+from portprotonqt.connectivity import OFFLINE_RECHECK, ConnectivityMonitor
+from portprotonqt.downloader import PRIORITY_FOCUSED, PRIORITY_NORMAL, get_requests_session
+from portprotonqt.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Ограничения по хостам: (запросов в секунду, размер пачки).
+# Магазин Steam отвечает 429 примерно после 200 запросов appdetails за 5 минут.
+HOST_LIMITS = {
+    "store.steampowered.com": (0.6, 20),
+    "www.protondb.com": (5.0, 10),
+}
+DEFAULT_HOST_LIMIT = (4.0, 8)
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 120.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Ограничитель частоты запросов: rate токенов в секунду, не больше capacity подряд."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float):
+        if now <= self._updated:
+            return
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Сколько секунд осталось до появления токена (0, если токен есть)."""
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._refill(now)
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def take(self, now: float):
+        self._refill(now)
+        self._tokens -= 1
+
+    def pause(self, until: float):
+        """Приостанавливает выдачу токенов (после 429) и обнуляет накопленные."""
+        self._paused_until = max(self._paused_until, until)
+        self._tokens = 0.0
+        self._updated = max(self._updated, until)
+
+
+class _Request:
+    """Запрос в очереди вместе со всеми ожидающими его колбэками."""
+
+    def __init__(self, key: str, url: str, priority: int, seq: int, timeout: float):
+        self.key = key
+        self.url = url
+        self.host = urlsplit(url).hostname or ""
+        self.priority = priority
+        self.seq = seq
+        self.timeout = timeout
+        self.callbacks: list[Callable[[bytes | None, int | None], None]] = []
+        self.attempts = 0
+        self.not_before = 0.0
+
+
+class MetadataFetchScheduler:
+    """
+    Очередь запросов метаданных (appdetails магазина Steam, сводки ProtonDB).
+      - Одновременные запросы с одним ключом объединяются в один.
+      - Для каждого хоста действует свой token bucket (HOST_LIMITS).
+      - Ответы 429/5xx и сетевые ошибки повторяются с экспоненциальной задержкой,
+        429 с Retry-After приостанавливает весь хост.
+      - Запросы выполняются по приоритету: сначала выбранные и видимые игры.
+      - Пока монитор подключения сообщает, что интернета нет, запросы ждут в очереди
+        и продолжаются, как только подключение появится.
+    Колбэк получает тело ответа (или None) и HTTP-статус последней попытки
+    (0 — сетевая ошибка) и вызывается в рабочем потоке.
+    """
+
+    def __init__(self, workers: int = 4, monitor: ConnectivityMonitor | None = None):
+        self._workers = workers
+        self._monitor = monitor
+        if monitor is not None:
+            monitor.add_listener(lambda online: online and self.resume())
+        self._cond = threading.Condition()
+        self._requests: dict[str, _Request] = {}
+        self._queue: list[_Request] = []
+        self._buckets: dict[str, TokenBucket] = {}
+        self._seq = itertools.count()
+        self._threads: list[threading.Thread] = []
+
+    def fetch(self, key: str, url: str, callback: Callable[[bytes | None, int | None], None],
+              priority: int = PRIORITY_NORMAL, timeout: float = 5):
+        """Ставит запрос в очередь; запрос с тем же ключом, уже ожидающий ответа, переиспользуется."""
+        with self._cond:
+            request = self._requests.get(key)
+            if request is None:
+                request = _Request(key, url, priority, next(self._seq), timeout)
+                self._requests[key] = request
+                self._queue.append(request)
+            else:
+                request.priority = min(request.priority, priority)
+            request.callbacks.append(callback)
+            self._start_workers()
+            self._cond.notify()
+
+    def prioritize(self, keys, priority: int = PRIORITY_FOCUSED):
+        """Повышает приоритет уже поставленных в очередь запросов."""
+        with self._cond:
+            for key in keys:
+                request = self._requests.get(key)
+                if request is not None:
+                    request.priority = min(request.priority, priority)
+
+    def resume(self):
+        """Будит очередь (например, после появления подключения)."""
+        with self._cond:
+            self._cond.notify_all()
+
+    def _start_workers(self):
+        while len(self._threads) < self._workers:
+            thread = threading.Thread(target=self._worker, name="metadata-fetch", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(*HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT))
+        return bucket
+
+    def _next_request(self) -> _Request:
+        """Ждёт самый приоритетный запрос, для хоста которого есть токен. Вызывать под self._cond."""
+        while True:
+            if self._monitor is not None and not self._monitor.is_online():
+                # resume() будит очередь при появлении связи, а таймаут страхует от пропущенного события
+                self._cond.wait(OFFLINE_RECHECK)
+                continue
+            now = time.monotonic()
+            best = None
+            wait = None
+            for request in self._queue:
+                delay = max(request.not_before - now, self._bucket(request.host).wait_time(now))
+                if delay > 0:
+                    wait = delay if wait is None else min(wait, delay)
+                elif best is None or (request.priority, request.seq) < (best.priority, best.seq):
+                    best = request
+            if best is not None:
+                self._queue.remove(best)
+                self._bucket(best.host).take(now)
+                return best
+            self._cond.wait(wait)
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                request = self._next_request()
+            content, status, retry_after = self._perform(get_requests_session(), request)
+            if retry_after is not None and request.attempts < MAX_ATTEMPTS:
+                with self._cond:
+                    request.not_before = time.monotonic() + retry_after
+                    self._queue.append(request)
+                    self._cond.notify()
+                continue
+            with self._cond:
+                self._requests.pop(request.key, None)
+                callbacks = request.callbacks
+            for callback in callbacks:
+                try:
+                    callback(content, status)
+                except Exception as e:
+                    logger.error("Metadata callback for %s failed: %s", request.key, e)
+
+    def _perform(self, session, request: _Request) -> tuple[bytes | None, int | None, float | None]:
+        """
+        Выполняет запрос. Возвращает (тело, статус, None) при успехе или окончательной ошибке
+        и (None, статус, задержка) если запрос стоит повторить.
+        """
+        request.attempts += 1
+        backoff = min(BACKOFF_BASE * 2 ** (request.attempts - 1), BACKOFF_MAX)
+        backoff *= random.uniform(0.8, 1.2)
+        try:
+            response = session.get(request.url, timeout=request.timeout)
+        except Exception as e:
+            logger.warning("Request %s failed (attempt %d): %s", request.url, request.attempts, e)
+            if self._monitor is not None and isinstance(e, requests.ConnectionError):
+                self._monitor.report_failure()
+            return None, 0, backoff
+        if response.status_code in RETRY_STATUSES:
+            retry_after = response.headers.get("Retry-After", "")
+            delay = float(retry_after) if retry_after.isdigit() else backoff
+            if response.status_code == 429:
+                with self._cond:
+                    self._bucket(request.host).pause(time.monotonic() + delay)
+            logger.warning("Request %s returned %d, retrying in %.1f s (attempt %d)",
+                           request.url, response.status_code, delay, request.attempts)
+            return None, response.status_code, delay
+        if not response.ok:
+            logger.info("Request %s returned %d", request.url, response.status_code)
+            return None, response.status_code, None
+        return response.content, response.status_code, None
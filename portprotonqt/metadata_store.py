@@ -0,0 +1,315 @@
+import atexit
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+import orjson
+from portprotonqt.config_utils import get_cache_dir
+from portprotonqt.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Источники записей
+STEAM_APP_SOURCE = "steam_app"
+PROTONDB_SOURCE = "protondb"
+DOWNLOAD_SOURCE = "download"
+PALETTE_SOURCE = "palette"
+IMAGE_CACHE_SOURCE = "image_cache"
+
+# Срок жизни данных магазина и ProtonDB
+METADATA_TTL = 30 * 24 * 60 * 60
+
+# Отрицательный кэш: после каждой неудачи повтор откладывается вдвое дольше.
+# "Нет данных" (success: false, 404) — ответ окончательный, повторять его часто незачем,
+# сетевые и серверные ошибки — временные.
+MISSING_BACKOFF = (24 * 60 * 60, 14 * 24 * 60 * 60)
+TRANSIENT_BACKOFF = (60, 6 * 60 * 60)
+# Сколько помнить счётчик неудач после последней из них
+NEGATIVE_MEMORY = 30 * 24 * 60 * 60
+
+# Сколько хранятся устаревшие записи: их отдают сразу, пока в фоне запрашиваются новые
+STALE_RETENTION = 180 * 24 * 60 * 60
+
+# Сколько записей копится в буфере, прежде чем они будут записаны одной транзакцией
+WRITE_BATCH_SIZE = 64
+# Через сколько секунд буфер записывается, даже если он не заполнен
+WRITE_DELAY = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data BLOB NOT NULL,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (source, key)
+) WITHOUT ROWID
+"""
+
+
+class MetadataStore:
+    """
+    Единое хранилище метаданных игр (данные магазина Steam, рейтинги ProtonDB и т.п.)
+    в одном файле SQLite в режиме WAL.
+    Записи адресуются парой (source, key) и хранят JSON со своим сроком жизни.
+    Устаревшие записи не удаляются сразу: get_many_stale отдаёт их вместе с признаком
+    устаревания, prune удаляет их только спустя STALE_RETENTION.
+    Запись буферизуется и сбрасывается одной транзакцией по размеру пачки,
+    по таймеру или при выходе из программы. Соединение открывается при первом обращении.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
+        self._pending: dict[tuple[str, str], tuple[bytes, float, float]] = {}
+        self._flush_timer: threading.Timer | None = None
+        atexit.register(self.close)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Открывает базу при первом обращении. Вызывать под self._lock."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, source: str, key: str | int) -> dict | None:
+        """Возвращает неустаревшую запись или None."""
+        return self.get_many(source, [key]).get(key)
+
+    def get_many(self, source: str, keys: Iterable[str | int]) -> dict:
+        """
+        Возвращает неустаревшие записи для набора ключей одним запросом:
+        словарь {ключ: данные} только для найденных ключей, ключи в исходном виде.
+        """
+        return {key: data for key, (data, _expires_at) in self._read(source, keys, time.time()).items()}
+
+    def get_many_stale(self, source: str, keys: Iterable[str | int]) -> tuple[dict, set]:
+        """
+        Как get_many, но возвращает и устаревшие записи: (словарь {ключ: данные},
+        множество ключей, срок жизни которых истёк).
+        """
+        now = time.time()
+        entries = self._read(source, keys, 0.0)
+        stale = {key for key, (_data, expires_at) in entries.items() if expires_at <= now}
+        return {key: data for key, (data, _expires_at) in entries.items()}, stale
+
+    def _read(self, source: str, keys: Iterable[str | int], expires_after: float) -> dict:
+        """Читает записи, истекающие позже expires_after: {ключ: (данные, expires_at)}."""
+        by_text = {str(key): key for key in keys}
+        if not by_text:
+            return {}
+        result = {}
+        with self._lock:
+            for text, key in by_text.items():
+                pending = self._pending.get((source, text))
+                if pending is not None and pending[2] > expires_after:
+                    result[key] = (orjson.loads(pending[0]), pending[2])
+            missing = [text for text in by_text if by_text[text] not in result]
+            conn = self._connection()
+            # Ограничение SQLite на число параметров в одном запросе
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT key, data, expires_at FROM metadata WHERE source = ? AND expires_at > ? "
+                    f"AND key IN ({','.join('?' * len(chunk))})",
+                    (source, expires_after, *chunk),
+                )
+                for text, data, expires_at in rows:
+                    result[by_text[text]] = (orjson.loads(data), expires_at)
+        return result
+
+    def put(self, source: str, key: str | int, data: dict, ttl: float, jitter: float = 0.0):
+        """Сохраняет запись со сроком жизни ttl секунд (запись на диск откладывается)."""
+        self.put_many(source, {key: data}, ttl, jitter)
+
+    def put_many(self, source: str, items: dict, ttl: float, jitter: float = 0.0):
+        """
+        Сохраняет несколько записей со сроком жизни ttl секунд.
+        jitter — доля, на которую срок каждой записи случайно сокращается, чтобы записи,
+        полученные одновременно, не устаревали все разом.
+        """
+        now = time.time()
+        with self._lock:
+            for key, data in items.items():
+                expires_at = now + ttl * (1 - random.uniform(0, jitter))
+                self._pending[(source, str(key))] = (orjson.dumps(data), now, expires_at)
+            if len(self._pending) >= WRITE_BATCH_SIZE:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(WRITE_DELAY, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def delete(self, source: str, key: str | int):
+        """Удаляет запись."""
+        with self._lock:
+            self._pending.pop((source, str(key)), None)
+            self._connection().execute("DELETE FROM metadata WHERE source = ? AND key = ?", (source, str(key)))
+
+    def flush(self):
+        """Записывает буфер на диск одной транзакцией."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending:
+                return
+            rows = [(source, key, data, fetched_at, expires_at)
+                    for (source, key), (data, fetched_at, expires_at) in self._pending.items()]
+            self._pending.clear()
+            try:
+                conn = self._connection()
+                with conn:
+                    conn.execute("BEGIN")
+                    conn.executemany("INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?)", rows)
+            except sqlite3.Error as e:
+                logger.error("Failed to write %d metadata records to %s: %s", len(rows), self.path, e)
+
+    def prune(self, retention: float = STALE_RETENTION) -> int:
+        """Удаляет записи, устаревшие больше retention секунд назад, возвращает их количество."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN")
+                return conn.execute("DELETE FROM metadata WHERE expires_at <= ?", (time.time() - retention,)).rowcount
+
+    def close(self):
+        """Сбрасывает буфер и закрывает соединение."""
+        with self._lock:
+            self.flush()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def import_json_files(self, directory: str, sources: dict[str, str], ttl: float) -> int:
+        """
+        Переносит кэш прежнего формата ({префикс}{ключ}.json в directory) в хранилище
+        и удаляет эти файлы. sources сопоставляет префикс файла источнику записи,
+        срок жизни отсчитывается от времени изменения файла.
+        Возвращает количество перенесённых записей.
+        """
+        rows = []
+        imported = []
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return 0
+        for entry in entries:
+            if not entry.name.endswith(".json"):
+                continue
+            for prefix, source in sources.items():
+                key = entry.name[len(prefix):-len(".json")]
+                if not entry.name.startswith(prefix) or not key.isdigit():
+                    continue
+                try:
+                    fetched_at = entry.stat().st_mtime
+                    with open(entry.path, "rb") as f:
+                        data = orjson.loads(f.read())
+                    rows.append((source, key, orjson.dumps(data), fetched_at, fetched_at + ttl))
+                except (OSError, orjson.JSONDecodeError) as e:
+                    logger.warning("Skipping unreadable cache file %s: %s", entry.path, e)
+                imported.append(entry.path)
+                break
+        if not imported:
+            return 0
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany("INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?)", rows)
+        for path in imported:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        logger.info("Migrated %d cached metadata files into %s", len(rows), self.path)
+        return len(rows)
+
+
+class NegativeCache:
+    """
+    Отрицательный кэш поверх MetadataStore: помнит неудачные запросы
+    (к магазину Steam, ProtonDB, загрузки обложек) и откладывает их повтор
+    с экспоненциально растущей задержкой. Записи хранятся в источнике "negative:{kind}".
+    """
+
+    def __init__(self, store: MetadataStore):
+        self.store = store
+
+    def retry_at(self, kind: str, key: str | int) -> float | None:
+        """Время, раньше которого запрос повторять не нужно, или None."""
+        entry = self.store.get(f"negative:{kind}", key)
+        if entry is None or entry["retry_at"] <= time.time():
+            return None
+        return entry["retry_at"]
+
+    def is_blocked(self, kind: str, key: str | int) -> bool:
+        return self.retry_at(kind, key) is not None
+
+    def blocked_keys(self, kind: str, keys: Iterable[str | int]) -> set:
+        """Возвращает ключи из набора, повтор запросов для которых ещё рано делать."""
+        now = time.time()
+        entries = self.store.get_many(f"negative:{kind}", keys)
+        return {key for key, entry in entries.items() if entry["retry_at"] > now}
+
+    def record_failure(self, kind: str, key: str | int, missing: bool = False):
+        """
+        Запоминает неудачу. missing=True — сервер ответил, что данных нет,
+        иначе ошибка считается временной.
+        """
+        entry = self.store.get(f"negative:{kind}", key) or {"failures": 0}
+        failures = entry["failures"] + 1
+        base, limit = MISSING_BACKOFF if missing else TRANSIENT_BACKOFF
+        delay = min(base * 2 ** (failures - 1), limit)
+        logger.info("Negative cache %s:%s: failure %d, next attempt in %d s", kind, key, failures, delay)
+        self.store.put(f"negative:{kind}", key,
+                       {"failures": failures, "missing": missing, "retry_at": time.time() + delay},
+                       NEGATIVE_MEMORY)
+
+    def record_success(self, kind: str, key: str | int):
+        """Забывает неудачи после успешного запроса."""
+        if self.store.get(f"negative:{kind}", key) is not None:
+            self.store.delete(f"negative:{kind}", key)
+
+
+_METADATA_STORE: MetadataStore | None = None
+_NEGATIVE_CACHE: NegativeCache | None = None
+_METADATA_STORE_LOCK = threading.Lock()
+
+
+def get_metadata_store() -> MetadataStore:
+    """
+    Возвращает общее хранилище метаданных (metadata.db в каталоге кэша).
+    При первом создании базы в неё переносятся прежние steam_app_*.json и protondb_*.json.
+    """
+    global _METADATA_STORE
+    with _METADATA_STORE_LOCK:
+        if _METADATA_STORE is None:
+            cache_dir = get_cache_dir()
+            path = os.path.join(cache_dir, "metadata.db")
+            created = not os.path.exists(path)
+            _METADATA_STORE = MetadataStore(path)
+            if created:
+                _METADATA_STORE.import_json_files(
+                    cache_dir, {"steam_app_": STEAM_APP_SOURCE, "protondb_": PROTONDB_SOURCE}, METADATA_TTL)
+            else:
+                pruned = _METADATA_STORE.prune()
+                if pruned:
+                    logger.info("Pruned %d expired metadata records", pruned)
+        return _METADATA_STORE
+
+
+def get_negative_cache() -> NegativeCache:
+    """Возвращает общий отрицательный кэш."""
+    global _NEGATIVE_CACHE
+    store = get_metadata_store()
+    with _METADATA_STORE_LOCK:
+        if _NEGATIVE_CACHE is None:
+            _NEGATIVE_CACHE = NegativeCache(store)
+        return _NEGATIVE_CACHE
@@ -0,0 +1,139 @@
+import os
+from collections.abc import Callable
+import numpy as np
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QImage
+from portprotonqt.logger import get_logger
+from portprotonqt.metadata_store import PALETTE_SOURCE, get_metadata_store
+from portprotonqt.thumbnail_cache import get_thumbnail
+
+logger = get_logger(__name__)
+
+# Размер, в котором обложка анализируется (как миниатюра без закругления)
+PALETTE_IMAGE_SIZE = (180, 250)
+# Палитра файла не меняется, пока не изменится сам файл (он входит в ключ)
+PALETTE_TTL = 365 * 24 * 60 * 60
+
+
+def extract_palette(image: QImage, num_colors: int = 5, sample_step: int = 10) -> list[str]:
+    """
+    Основные цвета изображения (#rrggbb, от самого частого): каждый sample_step-й пиксель
+    по обеим осям раскладывается по корзинам 8x8x8, цвет корзины — среднее её пикселей.
+    Считается NumPy прямо по буферу QImage.
+    """
+    if image.isNull():
+        return []
+    image = image.convertToFormat(QImage.Format.Format_RGB32)
+    width, height = image.width(), image.height()
+    # Format_RGB32 — 0xffRRGGBB в каждом uint32, строки выровнены до bytesPerLine
+    rows = np.frombuffer(image.constBits(), dtype=np.uint32, count=image.bytesPerLine() // 4 * height)
+    pixels = rows.reshape(height, -1)[:, :width]
+    # Обход по столбцам: при равной частоте первым идёт цвет, встреченный раньше
+    samples = pixels[::sample_step, ::sample_step].T.ravel().astype(np.int64)
+    red, green, blue = (samples >> 16) & 0xFF, (samples >> 8) & 0xFF, samples & 0xFF
+    keys = (red >> 5) * 64 + (green >> 5) * 8 + (blue >> 5)
+    _unique, first, inverse, counts = np.unique(keys, return_index=True, return_inverse=True, return_counts=True)
+    sums = [np.bincount(inverse, weights=channel).astype(np.int64) for channel in (red, green, blue)]
+    order = np.lexsort((first, -counts))[:num_colors]
+    palette = [f"#{sums[0][i] // counts[i]:02x}{sums[1][i] // counts[i]:02x}{sums[2][i] // counts[i]:02x}"
+               for i in order]
+    if len(palette) < num_colors:
+        palette += [palette[-1]] * (num_colors - len(palette))
+    return palette
+
+
+def palette_key(path: str, num_colors: int, sample_step: int) -> str | None:
+    """Ключ палитры файла в хранилище метаданных или None, если файла нет."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{num_colors}|{sample_step}"
+
+
+def get_palette(path: str, num_colors: int = 5, sample_step: int = 10) -> list[str]:
+    """
+    Палитра файла path: из хранилища метаданных или вычисленная по миниатюре
+    PALETTE_IMAGE_SIZE и сохранённая. Безопасна в рабочих потоках.
+    """
+    key = palette_key(path, num_colors, sample_step)
+    if key is None:
+        return []
+    store = get_metadata_store()
+    cached = store.get(PALETTE_SOURCE, key)
+    if cached is not None:
+        return cached["colors"]
+    width, height = PALETTE_IMAGE_SIZE
+    palette = extract_palette(get_thumbnail(path, width, height, 0, 1.0), num_colors, sample_step)
+    if palette:
+        store.put(PALETTE_SOURCE, key, {"colors": palette}, PALETTE_TTL)
+    return palette
+
+
+class _PaletteTask(QRunnable):
+    def __init__(self, loader: 'PaletteLoader', path: str, num_colors: int, sample_step: int,
+                 callback: Callable[[list[str]], None]):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.loader = loader
+        self.path = path
+        self.num_colors = num_colors
+        self.sample_step = sample_step
+        self.callback = callback
+
+    def run(self):
+        try:
+            palette = get_palette(self.path, self.num_colors, self.sample_step)
+        except Exception as e:
+            logger.error(f"Ошибка вычисления палитры {self.path}: {e}")
+            palette = []
+        try:
+            self.loader._finished.emit(self, palette)
+        except RuntimeError:
+            # Загрузчик удалён при завершении приложения
+            pass
+
+
+class PaletteLoader(QObject):
+    """
+    Вычисляет палитры обложек в отдельном потоке. Сохранённая палитра отдаётся сразу,
+    без ожидания потока; callback вызывается в потоке, где создан загрузчик (GUI-поток).
+    """
+    _finished = Signal(object, object)  # _PaletteTask, list[str]
+
+    def __init__(self):
+        super().__init__()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        # Задачи в очереди и в работе: пул не владеет объектами Python
+        self._tasks: set[_PaletteTask] = set()
+        self._finished.connect(self._on_finished)
+
+    def load(self, path: str, callback: Callable[[list[str]], None], num_colors: int = 5, sample_step: int = 10):
+        """Вызывает callback с палитрой файла path (пустой список, если его не удалось прочитать)."""
+        key = palette_key(path, num_colors, sample_step)
+        cached = get_metadata_store().get(PALETTE_SOURCE, key) if key is not None else None
+        if cached is not None:
+            callback(cached["colors"])
+            return
+        task = _PaletteTask(self, path, num_colors, sample_step, callback)
+        self._tasks.add(task)
+        self._pool.start(task)
+
+    def _on_finished(self, task: _PaletteTask, palette: list[str]):
+        self._tasks.discard(task)
+        try:
+            task.callback(palette)
+        except Exception as e:
+            logger.error(f"Ошибка в обработчике палитры {task.path}: {e}")
+
+
+_LOADER: PaletteLoader | None = None
+
+
+def get_palette_loader() -> PaletteLoader:
+    """Общий загрузчик палитр; создавать в GUI-потоке."""
+    global _LOADER
+    if _LOADER is None:
+        _LOADER = PaletteLoader()
+    return _LOADER
@@ -0,0 +1,107 @@
+import mmap
+import pefile
+from portprotonqt.logger import get_logger
+
+logger = get_logger(__name__)
+
+_RESOURCE_DIRECTORY = pefile.DIRECTORY_ENTRY["IMAGE_DIRECTORY_ENTRY_RESOURCE"]
+_RT_VERSION = pefile.RESOURCE_TYPE["RT_VERSION"]
+# Заголовок IMAGE_RESOURCE_DIRECTORY: 12 байт полей, затем счётчики именованных и числовых записей
+_DIRECTORY_SIZE = 16
+_ENTRY_SIZE = 8
+_SUBDIRECTORY_FLAG = 0x80000000
+# Защита от зацикленных или раздутых каталогов ресурсов в битых файлах
+_MAX_ENTRIES = 4096
+
+
+def _find_entry(pe: pefile.PE, directory_rva: int, resource_id: int | None) -> int | None:
+    """
+    Ищет в каталоге ресурсов запись с числовым идентификатором resource_id
+    (или первую запись, если resource_id равен None).
+    Возвращает значение OffsetToData записи или None.
+    """
+    named = pe.get_word_at_rva(directory_rva + 12)
+    numbered = pe.get_word_at_rva(directory_rva + 14)
+    if named is None or numbered is None or named + numbered > _MAX_ENTRIES:
+        return None
+    entry_rva = directory_rva + _DIRECTORY_SIZE
+    for _ in range(named + numbered):
+        name = pe.get_dword_at_rva(entry_rva)
+        offset = pe.get_dword_at_rva(entry_rva + 4)
+        if name is None or offset is None:
+            return None
+        if resource_id is None or name == resource_id:
+            return offset
+        entry_rva += _ENTRY_SIZE
+    return None
+
+
+def _find_version_resource(pe: pefile.PE) -> pefile.Structure | None:
+    """
+    Спускается по каталогу ресурсов только по ветке RT_VERSION
+    (тип -> первый идентификатор -> первый язык) и возвращает IMAGE_RESOURCE_DATA_ENTRY.
+    Остальные ресурсы (иконки, диалоги и т.п.) не разбираются.
+    """
+    directories = pe.OPTIONAL_HEADER.DATA_DIRECTORY
+    if len(directories) <= _RESOURCE_DIRECTORY or not directories[_RESOURCE_DIRECTORY].VirtualAddress:
+        return None
+    base_rva = directories[_RESOURCE_DIRECTORY].VirtualAddress
+    directory_rva = base_rva
+    for resource_id in (_RT_VERSION, None):
+        entry = _find_entry(pe, directory_rva, resource_id)
+        if entry is None or not entry & _SUBDIRECTORY_FLAG:
+            return None
+        directory_rva = base_rva + (entry & ~_SUBDIRECTORY_FLAG)
+    # Третий уровень (язык) указывает уже не на каталог, а на запись с данными
+    entry = _find_entry(pe, directory_rva, None)
+    if entry is None or entry & _SUBDIRECTORY_FLAG:
+        return None
+    return _unpack_data_entry(pe, base_rva + entry)
+
+
+def _unpack_data_entry(pe: pefile.PE, rva: int) -> pefile.Structure | None:
+    data_entry = pefile.Structure(pe.__IMAGE_RESOURCE_DATA_ENTRY_format__)
+    data = pe.get_data(rva, data_entry.sizeof())
+    if len(data) < data_entry.sizeof():
+        return None
+    data_entry.__unpack__(data)
+    return data_entry
+
+
+def read_version_info(path: str) -> dict[str, str]:
+    """
+    Читает строки ресурса VERSIONINFO (ProductName, FileDescription и т.п.)
+    из PE-файла без запуска внешних программ.
+    Файл отображается в память через mmap, разбираются только
+    заголовки и ветка RT_VERSION каталога ресурсов.
+    Возвращает словарь строк или пустой словарь, если ресурса нет или файл повреждён.
+    """
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to map {path}: {e}")
+        return {}
+    try:
+        # PE.close() запускает полный gc.collect(), поэтому отображение закрывается вручную
+        pe = pefile.PE(data=mm, fast_load=True)
+        data_entry = _find_version_resource(pe)
+        if data_entry is None:
+            return {}
+        pe.parse_version_information(data_entry)
+        strings: dict[str, str] = {}
+        for file_info in getattr(pe, "FileInfo", None) or []:
+            for info in file_info:
+                for table in getattr(info, "StringTable", []):
+                    for key, value in table.entries.items():
+                        # Первая таблица (обычно основной язык) имеет приоритет
+                        strings.setdefault(key.decode("utf-8", "replace"), value.decode("utf-8", "replace").strip())
+        return strings
+    except pefile.PEFormatError as e:
+        logger.error(f"Failed to read PE headers of {path}: {e}")
+        return {}
+    except Exception as e:
+        logger.error(f"Failed to parse version information of {path}: {e}")
+        return {}
+    finally:
+        mm.close()
@@ -0,0 +1,211 @@
+import os
+from PySide6.QtCore import QObject, QTimer, QUrl
+from PySide6.QtNetwork import QNetworkAccessManager, QNetworkProxy, QNetworkReply, QNetworkRequest
+from portprotonqt.config_utils import read_proxy_config
+from portprotonqt.connectivity import get_connectivity_monitor
+from portprotonqt.downloader import (
+    DOWNLOAD_SOURCE, PRIORITY_VISIBLE, PRIORITY_NORMAL, RESUME_MIN_SIZE, check_download, discard_partial, get_bandwidth_limiter,
+    is_downloaded,
+)
+from portprotonqt.logger import get_logger
+from portprotonqt.metadata_store import get_negative_cache
+
+logger = get_logger(__name__)
+
+# Размер буфера ответа при ограничении скорости: пока данные не прочитаны,
+# Qt не читает сокет дальше и сервер притормаживает отправку
+THROTTLED_READ_BUFFER = 64 * 1024
+
+# Ошибки, означающие проблемы с подключением, а не с самим файлом
+_CONNECTION_ERRORS = {
+    QNetworkReply.NetworkError.ConnectionRefusedError,
+    QNetworkReply.NetworkError.RemoteHostClosedError,
+    QNetworkReply.NetworkError.HostNotFoundError,
+    QNetworkReply.NetworkError.TemporaryNetworkFailureError,
+    QNetworkReply.NetworkError.NetworkSessionFailedError,
+    QNetworkReply.NetworkError.UnknownNetworkError,
+    QNetworkReply.NetworkError.ProxyConnectionRefusedError,
+    QNetworkReply.NetworkError.ProxyNotFoundError,
+}
+
+
+class _Transfer:
+    """Одна загрузка QNetworkReply во временный файл {local_path}.part."""
+
+    def __init__(self, inflight, reply: QNetworkReply, offset: int):
+        self.inflight = inflight
+        self.reply = reply
+        self.offset = offset
+        self.file = None
+        self.expected: int | None = None
+        self.status = 0
+        # Чтение приостановлено ограничителем скорости; ответ, завершившийся в это время,
+        # обрабатывается после того, как остаток будет прочитан
+        self.throttled = False
+        self.finish_pending = False
+
+
+class QtDownloadBackend(QObject):
+    """
+    Backend асинхронных загрузок Downloader на QNetworkAccessManager: запросы выполняются
+    в цикле событий Qt без отдельных потоков, с HTTP/2, переиспользованием соединений
+    и переходом по редиректам. Проверки те же, что у backend на requests: временный файл
+    с атомарным переименованием, докачка Range/If-Range, сверка размера, хэша и изображения,
+    отрицательный кэш и монитор подключения.
+    Все методы вызываются в потоке, которому принадлежит объект (GUI).
+    """
+
+    def __init__(self, downloader):
+        super().__init__(downloader)
+        self._downloader = downloader
+        self._manager = QNetworkAccessManager(self)
+        self._manager.setRedirectPolicy(QNetworkRequest.RedirectPolicy.NoLessSafeRedirectPolicy)
+        self.apply_proxy()
+
+    def apply_proxy(self):
+        """Применяет настройки прокси из конфигурации (http/https/socks5 URL)."""
+        proxy_url = (read_proxy_config() or {}).get("https", "")
+        if not proxy_url:
+            self._manager.setProxy(QNetworkProxy(QNetworkProxy.ProxyType.DefaultProxy))
+            return
+        url = QUrl(proxy_url)
+        proxy_type = (QNetworkProxy.ProxyType.Socks5Proxy if url.scheme().startswith("socks")
+                      else QNetworkProxy.ProxyType.HttpProxy)
+        self._manager.setProxy(QNetworkProxy(proxy_type, url.host(), url.port(8080), url.userName(), url.password()))
+
+    def start(self, inflight):
+        url, local_path = inflight.url, inflight.local_path
+        if is_downloaded(local_path):
+            self._downloader._resolve(inflight, local_path)
+            return
+        if not get_connectivity_monitor().is_online() and self._downloader._park(inflight):
+            return
+        if get_negative_cache().is_blocked(DOWNLOAD_SOURCE, url):
+            logger.warning(f"Предыдущая ошибка загрузки для {url}, пропускаем до истечения задержки")
+            self._downloader._resolve(inflight, None)
+            return
+        os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+        part_path = local_path + ".part"
+        validator_path = part_path + ".validator"
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        request = QNetworkRequest(QUrl(url))
+        request.setTransferTimeout(int(inflight.timeout * 1000))
+        if inflight.priority <= PRIORITY_VISIBLE:
+            request.setPriority(QNetworkRequest.Priority.HighPriority)
+        elif inflight.priority > PRIORITY_NORMAL:
+            request.setPriority(QNetworkRequest.Priority.LowPriority)
+        if offset >= RESUME_MIN_SIZE and os.path.exists(validator_path):
+            with open(validator_path, encoding="utf-8") as f:
+                request.setRawHeader(b"Range", f"bytes={offset}-".encode())
+                request.setRawHeader(b"If-Range", f.read().strip().encode())
+        else:
+            offset = 0
+        reply = self._manager.get(request)
+        if get_bandwidth_limiter().rate:
+            reply.setReadBufferSize(THROTTLED_READ_BUFFER)
+        transfer = _Transfer(inflight, reply, offset)
+        inflight.reply = reply
+        reply.readyRead.connect(lambda: self._on_ready_read(transfer))
+        reply.finished.connect(lambda: self._on_finished(transfer))
+
+    def abort(self, inflight):
+        reply = getattr(inflight, "reply", None)
+        if reply is not None and reply.isRunning():
+            reply.abort()
+
+    def _open(self, transfer: _Transfer):
+        """Открывает временный файл при первом ответе сервера."""
+        reply = transfer.reply
+        transfer.status = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute) or 0
+        if transfer.status >= 400:
+            return
+        part_path = transfer.inflight.local_path + ".part"
+        validator_path = part_path + ".validator"
+        resumed = transfer.status == 206
+        headers = {bytes(name).decode().lower(): bytes(value).decode() for name, value in reply.rawHeaderPairs()}
+        if not resumed:
+            transfer.offset = 0
+            validator = headers.get("etag") or headers.get("last-modified", "")
+            if validator:
+                with open(validator_path, "w", encoding="utf-8") as f:
+                    f.write(validator)
+            elif os.path.exists(validator_path):
+                os.remove(validator_path)
+        else:
+            logger.info(f"Докачка {transfer.inflight.url} с {transfer.offset} байт")
+        length = reply.header(QNetworkRequest.KnownHeaders.ContentLengthHeader)
+        if length is not None and "content-encoding" not in headers:
+            transfer.expected = transfer.offset + int(length)
+        transfer.file = open(part_path, "ab" if resumed else "wb")
+
+    def _on_ready_read(self, transfer: _Transfer):
+        if transfer.throttled:
+            return
+        if transfer.file is None and not transfer.status:
+            self._open(transfer)
+        data = bytes(transfer.reply.readAll())
+        if transfer.file is not None:
+            transfer.file.write(data)
+        delay = get_bandwidth_limiter().reserve(len(data))
+        if delay:
+            transfer.throttled = True
+            QTimer.singleShot(int(delay * 1000), lambda: self._resume_reading(transfer))
+
+    def _resume_reading(self, transfer: _Transfer):
+        transfer.throttled = False
+        if transfer.reply.bytesAvailable():
+            self._on_ready_read(transfer)
+        if transfer.finish_pending and not transfer.throttled:
+            self._on_finished(transfer)
+
+    def _on_finished(self, transfer: _Transfer):
+        if transfer.throttled:
+            transfer.finish_pending = True
+            return
+        inflight, reply = transfer.inflight, transfer.reply
+        url, local_path = inflight.url, inflight.local_path
+        if transfer.file is None and not transfer.status:
+            self._open(transfer)
+        if transfer.file is not None:
+            transfer.file.write(bytes(reply.readAll()))
+            transfer.file.close()
+        error = reply.error()
+        reply.deleteLater()
+        inflight.reply = None
+        result = None
+        try:
+            if transfer.status == 416:
+                # Временный файл не соответствует серверному — начинаем заново
+                os.remove(local_path + ".part")
+                self.start(inflight)
+                return
+            if error == QNetworkReply.NetworkError.OperationCanceledError:
+                logger.debug(f"Загрузка {url} прервана")
+            elif error != QNetworkReply.NetworkError.NoError:
+                logger.error(f"Ошибка загрузки {url}: {reply.errorString()}")
+                if error in _CONNECTION_ERRORS:
+                    get_connectivity_monitor().report_failure()
+                else:
+                    get_negative_cache().record_failure(DOWNLOAD_SOURCE, url, missing=transfer.status in (404, 410))
+            else:
+                part_path = local_path + ".part"
+                size = os.path.getsize(part_path)
+                if transfer.expected is not None and size != transfer.expected:
+                    raise OSError(f"Incomplete download of {url}: {size} of {transfer.expected} bytes")
+                try:
+                    check_download(part_path, local_path, url, inflight.sha256)
+                except OSError:
+                    os.remove(part_path)
+                    raise
+                os.replace(part_path, local_path)
+                if os.path.exists(part_path + ".validator"):
+                    os.remove(part_path + ".validator")
+                get_negative_cache().record_success(DOWNLOAD_SOURCE, url)
+                get_connectivity_monitor().report_success()
+                result = local_path
+        except OSError as e:
+            logger.error(f"Ошибка загрузки {url}: {e}")
+            get_negative_cache().record_failure(DOWNLOAD_SOURCE, url)
+        if result is None:
+            discard_partial(local_path)
+        self._downloader._resolve(inflight, result)
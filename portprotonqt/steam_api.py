@@ -1,27 +1,37 @@
 import functools
+import hashlib
+import lzma
 import os
 import shlex
-import subprocess
 import time
 import html
 import orjson
 import vdf
-import tarfile
 import threading
 from pathlib import Path
 from portprotonqt.logger import get_logger
 from portprotonqt.localization import get_steam_language
-from portprotonqt.downloader import Downloader
+from portprotonqt.connectivity import get_connectivity_monitor
+from portprotonqt.downloader import PRIORITY_BACKGROUND, PRIORITY_FOCUSED, PRIORITY_NORMAL, fetch_if_modified, get_downloader
 from portprotonqt.dialogs import generate_thumbnail
-from portprotonqt.config_utils import get_portproton_location
+from portprotonqt.pe_version import read_version_info
+from portprotonqt.metadata_store import PROTONDB_SOURCE, STEAM_APP_SOURCE, get_metadata_store, get_negative_cache
+from portprotonqt.metadata_scheduler import MetadataFetchScheduler
+from portprotonqt.config_utils import get_cache_dir, get_portproton_location
+from portprotonqt.steam_app_index import SteamAppIndex, apply_deltas, open_index, unpack_app_list, write_index_columns
+from portprotonqt.steam_matcher import DEFAULT_MIN_SCORE, rank_apps
 from collections.abc import Callable
 import re
 import shutil
 import zlib
 
-downloader = Downloader()
+downloader = get_downloader()
+metadata_scheduler = MetadataFetchScheduler(monitor=get_connectivity_monitor())
 logger = get_logger(__name__)
 CACHE_DURATION = 30 * 24 * 60 * 60
+# Срок жизни записей магазина и ProtonDB случайно сокращается до 20%,
+# чтобы они устаревали и обновлялись постепенно, а не все в один день
+CACHE_JITTER = 0.2
 
 def safe_vdf_load(path: str | Path) -> dict:
     path = str(path)  # Convert Path to str
@@ -46,13 +56,6 @@ def decode_text(text: str) -> str:
     """
     return html.unescape(text)
 
-def get_cache_dir():
-    """Возвращает путь к каталогу кэша, создаёт его при необходимости."""
-    xdg_cache_home = os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
-    cache_dir = os.path.join(xdg_cache_home, "PortProtonQT")
-    os.makedirs(cache_dir, exist_ok=True)
-    return cache_dir
-
 STEAM_DATA_DIRS = (
     "~/.local/share/Steam",
     "~/snap/steam/common/.local/share/Steam",
@@ -243,153 +246,250 @@ def remove_duplicates(candidates):
     return list(dict.fromkeys(candidates))
 
 @functools.lru_cache(maxsize=256)
-def get_exiftool_data(game_exe):
-    """Получает метаданные через exiftool"""
+def get_exe_version_info(game_exe):
+    """Получает строки VERSIONINFO (ProductName, FileDescription) из ресурсов exe"""
+    return read_version_info(game_exe)
+
+APP_LIST_BASE_URL = "https://raw.githubusercontent.com/Boria138/PortProtonQt/refs/heads/main/data/"
+
+def _app_list_state_path() -> str:
+    return os.path.join(get_cache_dir(), "steam_apps_state.json")
+
+def _load_app_list_state() -> dict:
+    """Читает ревизию локального индекса и валидаторы манифеста (ETag/Last-Modified)."""
+    path = _app_list_state_path()
+    if os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                return orjson.loads(f.read())
+        except Exception as e:
+            logger.error("Failed to read Steam apps state %s: %s", path, e)
+    return {}
+
+def _save_app_list_state(state: dict):
+    path = _app_list_state_path()
+    tmp_path = f"{path}.tmp"
     try:
-        proc = subprocess.run(
-            ["exiftool", "-j", game_exe],
-            capture_output=True,
-            text=True,
-            check=False
-        )
-        if proc.returncode != 0:
-            logger.error(f"exiftool error for {game_exe}: {proc.stderr.strip()}")
-            return {}
-        meta_data_list = orjson.loads(proc.stdout.encode("utf-8"))
-        return meta_data_list[0] if meta_data_list else {}
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(state))
+        os.replace(tmp_path, path)
     except Exception as e:
-        logger.error(f"An unexpected error occurred in get_exiftool_data for {game_exe}: {e}")
-        return {}
+        logger.error("Failed to save Steam apps state %s: %s", path, e)
 
-def load_steam_apps_async(callback: Callable[[list], None]):
+def _fetch_app_list_manifest(state: dict) -> tuple[dict | None, dict]:
     """
-    Asynchronously loads the list of Steam applications, using cache if available.
-    Calls the callback with the list of apps.
+    Запрашивает манифест каталога условным GET-запросом.
+    Возвращает (manifest, validators); manifest равен None, если он не изменился
+    или недоступен (в этом случае validators пустой).
+    """
+    try:
+        content, validators = fetch_if_modified(APP_LIST_BASE_URL + "games_appid_manifest.json",
+                                                state.get("etag"), state.get("last_modified"))
+    except Exception as e:
+        logger.warning("Failed to fetch Steam apps manifest: %s", e)
+        return None, {}
+    if content is None:
+        return None, validators
+    try:
+        return orjson.loads(content), validators
+    except orjson.JSONDecodeError as e:
+        logger.error("Invalid Steam apps manifest: %s", e)
+        return None, {}
+
+def _fetch_app_list_delta(entry: dict) -> dict:
+    """Скачивает дельту каталога, проверяет её sha256 и распаковывает xz."""
+    content, _validators = fetch_if_modified(APP_LIST_BASE_URL + entry["file"])
+    if content is None or hashlib.sha256(content).hexdigest() != entry["sha256"]:
+        raise ValueError(f"Checksum mismatch for {entry['file']}")
+    return orjson.loads(lzma.decompress(content))
+
+def _delta_chain(manifest: dict, revision: int | None) -> list[dict] | None:
+    """Возвращает непрерывную цепочку дельт от revision до ревизии манифеста или None."""
+    if revision is None:
+        return None
+    by_source = {entry["from_revision"]: entry for entry in manifest.get("deltas", [])}
+    chain = []
+    while revision != manifest["revision"]:
+        entry = by_source.get(revision)
+        if entry is None:
+            return None
+        chain.append(entry)
+        revision = entry["revision"]
+    return chain
+
+def load_steam_apps_async(callback: Callable[[SteamAppIndex | None], None]):
+    """
+    Asynchronously loads the Steam applications index, using cache if available.
+    The catalog is converted once into a compact binary index (steam_apps.idx)
+    that is opened with mmap, so a cold start does not parse the whole catalog.
+    When the cached index expires, the catalog manifest is requested with
+    If-None-Match/If-Modified-Since: an unchanged manifest only renews the index,
+    otherwise the missing deltas are downloaded and applied in place. The full
+    columnar archive (games_appid.bin.xz) is downloaded only when the local
+    revision is unknown or too old. If the refresh fails, the expired index is used.
+    Calls the callback with the index or None if it could not be loaded.
     """
     cache_dir = get_cache_dir()
-    cache_tar = os.path.join(cache_dir, "games_appid.tar.xz")
-    cache_json = os.path.join(cache_dir, "steam_apps.json")
+    cache_archive = os.path.join(cache_dir, "games_appid.bin.xz")
+    cache_index = os.path.join(cache_dir, "steam_apps.idx")
+    legacy_files = [os.path.join(cache_dir, name) for name in ("steam_apps.json", "games_appid.tar.xz")]
 
-    def process_tar(result: str | None):
+    def process_archive(result: str | None) -> SteamAppIndex | None:
         if not result or not os.path.exists(result):
             logger.error("Failed to download Steam apps archive")
-            callback([])
-            return
+            return None
         try:
-            with tarfile.open(result, mode='r:xz') as tar:
-                member = next((m for m in tar.getmembers() if m.name.endswith('.json')), None)
-                if member is None:
-                    raise RuntimeError("JSON file not found in archive")
-                fobj = tar.extractfile(member)
-                if fobj is None:
-                    raise RuntimeError(f"Failed to extract file {member.name} from archive")
-                raw = fobj.read()
-                fobj.close()
-                data = orjson.loads(raw)
-            with open(cache_json, "wb") as f:
-                f.write(orjson.dumps(data))
-            if os.path.exists(cache_tar):
-                os.remove(cache_tar)
-                logger.info("Archive %s deleted after extraction", cache_tar)
-            steam_apps = data.get("applist", {}).get("apps", []) if isinstance(data, dict) else data or []
-            logger.info("Loaded %d apps from archive", len(steam_apps))
-            callback(steam_apps)
+            with open(result, "rb") as f:
+                appids, names = unpack_app_list(lzma.decompress(f.read()))
+            count = write_index_columns(cache_index, appids, names)
+            del appids, names
+            os.remove(cache_archive)
+            logger.info("Archive %s deleted after extraction", cache_archive)
+            for legacy in legacy_files:
+                if os.path.exists(legacy):
+                    os.remove(legacy)
+            logger.info("Built Steam apps index with %d names", count)
+            return open_index(cache_index)
         except Exception as e:
             logger.error("Error extracting Steam apps archive: %s", e)
-            callback([])
-
-    if os.path.exists(cache_json) and (time.time() - os.path.getmtime(cache_json) < CACHE_DURATION):
-        logger.info("Using cached Steam apps JSON: %s", cache_json)
+            # Повреждённый архив не должен считаться скачанным при следующем запуске
+            if os.path.exists(cache_archive):
+                os.remove(cache_archive)
+            return None
+
+    def update_from_deltas(state: dict, manifest: dict | None, validators: dict) -> SteamAppIndex | None:
+        if not validators:
+            return None
+        index = open_index(cache_index)
+        if index is None:
+            return None
+        if manifest is None:
+            logger.info("Steam apps manifest not modified, keeping revision %s", state.get("revision"))
+            os.utime(cache_index)
+            return index
+        chain = _delta_chain(manifest, state.get("revision"))
+        if chain is None:
+            index.close()
+            return None
         try:
-            with open(cache_json, "rb") as f:
-                data = orjson.loads(f.read())
-            steam_apps = data.get("applist", {}).get("apps", []) if isinstance(data, dict) else data or []
-            logger.info("Loaded %d apps from cache", len(steam_apps))
-            callback(steam_apps)
+            if chain:
+                deltas = [_fetch_app_list_delta(entry) for entry in chain]
+                count = apply_deltas(index, deltas, cache_index)
+                logger.info("Applied %d Steam apps deltas up to revision %s (%d names)",
+                            len(deltas), manifest["revision"], count)
+            else:
+                os.utime(cache_index)
         except Exception as e:
-            logger.error("Error reading cached JSON: %s", e)
-            callback([])
-    else:
-        app_list_url = (
-            "https://raw.githubusercontent.com/Boria138/PortProtonQt/"
-            "refs/heads/main/data/games_appid.tar.xz"
-        )
-        downloader.download_async(app_list_url, cache_tar, timeout=5, callback=process_tar)
-
-def build_index(steam_apps):
-    """
-    Строит индекс приложений по полю normalized_name.
-    """
-    steam_apps_index = {}
-    if not steam_apps:
-        return steam_apps_index
-    logger.info("Построение индекса Steam приложений:")
-    for app in steam_apps:
-        normalized = app["normalized_name"]
-        steam_apps_index[normalized] = app
-    return steam_apps_index
-
-def search_app(candidate, steam_apps_index):
-    """
-    Ищет приложение по кандидату: сначала пытается точное совпадение, затем ищет подстроку.
-    """
-    candidate_norm = normalize_name(candidate)
-    logger.info("Поиск приложения для кандидата: '%s' -> '%s'", candidate, candidate_norm)
-    if candidate_norm in steam_apps_index:
-        logger.info("    Найдено точное совпадение: '%s'", candidate_norm)
-        return steam_apps_index[candidate_norm]
-    for name_norm, app in steam_apps_index.items():
-        if candidate_norm in name_norm:
-            ratio = len(candidate_norm) / len(name_norm)
-            if ratio > 0.8:
-                logger.info("    Найдено частичное совпадение: кандидат '%s' в '%s' (ratio: %.2f)",
-                            candidate_norm, name_norm, ratio)
-                return app
-    logger.info("    Приложение для кандидата '%s' не найдено", candidate_norm)
-    return None
+            logger.error("Failed to apply Steam apps deltas, falling back to full archive: %s", e)
+            return None
+        finally:
+            index.close()
+        _save_app_list_state({"revision": manifest["revision"], **validators})
+        return open_index(cache_index)
+
+    def worker():
+        state = _load_app_list_state()
+        manifest, validators = (None, {})
+        if downloader.has_internet():
+            manifest, validators = _fetch_app_list_manifest(state)
+        index = update_from_deltas(state, manifest, validators)
+        if index is None:
+            full_sha256 = manifest.get("full_sha256") if manifest else None
+            index = process_archive(downloader.download(APP_LIST_BASE_URL + "games_appid.bin.xz", cache_archive,
+                                                        timeout=5, sha256=full_sha256))
+            if index is not None and manifest is not None:
+                _save_app_list_state({"revision": manifest["revision"], **validators})
+            elif index is not None and not validators and os.path.exists(_app_list_state_path()):
+                # Манифест недоступен, ревизия скачанного архива неизвестна:
+                # при следующем обновлении понадобится полный архив
+                os.remove(_app_list_state_path())
+        if index is None and os.path.exists(cache_index):
+            # Обновить каталог не удалось: устаревший индекс лучше, чем никакого
+            index = open_index(cache_index)
+            if index is not None:
+                logger.warning("Failed to refresh Steam apps index, using expired %s (%d names)",
+                               cache_index, len(index))
+        callback(index)
+
+    if os.path.exists(cache_index) and (time.time() - os.path.getmtime(cache_index) < CACHE_DURATION):
+        index = open_index(cache_index)
+        if index is not None:
+            logger.info("Using cached Steam apps index: %s (%d names)", cache_index, len(index))
+            callback(index)
+            return
+
+    threading.Thread(target=worker, daemon=True).start()
+
+def search_app_ranked(candidates, steam_apps_index: SteamAppIndex, limit: int = 5,
+                      min_score: float = DEFAULT_MIN_SCORE) -> list[dict]:
+    """
+    Ищет приложение сразу по всем кандидатам одной игры одним ранжированным запросом.
+    Кандидаты должны идти в порядке приоритета: при равной оценке выигрывает более ранний.
+    Возвращает до limit совпадений с оценкой выше min_score, лучшие первыми.
+    """
+    normalized = remove_duplicates([n for n in map(normalize_name, candidates) if n])
+    logger.info("Ранжированный поиск приложения для кандидатов: %s", normalized)
+    matches = rank_apps(steam_apps_index, normalized, limit=limit, min_score=min_score)
+    for match in matches:
+        logger.info("    Кандидат '%s' -> '%s' (appid %s, score: %.2f)",
+                    match["candidate"], match["normalized_name"], match["appid"], match["score"])
+    if not matches:
+        logger.info("    Приложение для кандидатов %s не найдено", normalized)
+    return matches
 
 def load_app_details(app_id):
-    """Загружает кэшированные данные для игры по appid, если они не устарели."""
-    cache_dir = get_cache_dir()
-    cache_file = os.path.join(cache_dir, f"steam_app_{app_id}.json")
-    if os.path.exists(cache_file):
-        if time.time() - os.path.getmtime(cache_file) < CACHE_DURATION:
-            with open(cache_file, "rb") as f:
-                return orjson.loads(f.read())
-    return None
+    """
+    Загружает кэшированные данные для игры по appid. Устаревшие данные тоже возвращаются,
+    а appid ставится в очередь на фоновое обновление (см. revalidate_stale_metadata).
+    """
+    data, stale = get_metadata_store().get_many_stale(STEAM_APP_SOURCE, [app_id])
+    if stale:
+        _mark_stale(STEAM_APP_SOURCE, stale)
+    return data.get(app_id)
 
 def save_app_details(app_id, data):
-    """Сохраняет данные по appid в файл кэша."""
-    cache_dir = get_cache_dir()
-    cache_file = os.path.join(cache_dir, f"steam_app_{app_id}.json")
-    with open(cache_file, "wb") as f:
-        f.write(orjson.dumps(data))
+    """Сохраняет данные по appid в хранилище метаданных."""
+    get_metadata_store().put(STEAM_APP_SOURCE, app_id, data, CACHE_DURATION, CACHE_JITTER)
 
-def fetch_app_info_async(app_id: int, callback: Callable[[dict | None], None]):
+def fetch_app_info_async(app_id: int, callback: Callable[[dict | None], None], priority: int = PRIORITY_NORMAL):
     """
     Asynchronously fetches detailed app info from Steam API.
+    Requests go through the shared metadata scheduler, so concurrent lookups of
+    one appid share a request and the store is not hit faster than its rate limit.
+    Stale cached data is returned immediately and refreshed in the background.
+    Failed lookups are remembered in the negative cache and not repeated until
+    their backoff expires.
     Calls the callback with the app data or None if failed.
     """
     cached = load_app_details(app_id)
     if cached is not None:
         callback(cached)
         return
+    if get_negative_cache().is_blocked(STEAM_APP_SOURCE, app_id):
+        logger.debug("Steam app info for appid %s is in the negative cache, skipping", app_id)
+        callback(None)
+        return
+    _request_app_details(app_id, callback, priority)
 
+def _request_app_details(app_id: int, callback: Callable[[dict | None], None], priority: int):
+    """Запрашивает appdetails в магазине Steam и сохраняет результат (без проверки кэша)."""
+    negative_cache = get_negative_cache()
     lang = get_steam_language()
     url = f"https://store.steampowered.com/api/appdetails?appids={app_id}&l={lang}"
-    cache_dir = get_cache_dir()
-    cache_file = os.path.join(cache_dir, f"steam_app_{app_id}.json")
 
-    def process_response(result: str | None):
-        if not result or not os.path.exists(result):
+    def process_response(content: bytes | None, status: int | None):
+        if content is None:
             logger.error("Failed to download Steam app info for appid %s", app_id)
+            # Сетевые ошибки (status 0) не кэшируются: запрос повторится, когда появится подключение
+            if status:
+                negative_cache.record_failure(STEAM_APP_SOURCE, app_id, missing=status == 404)
             callback(None)
             return
         try:
-            with open(result, "rb") as f:
-                data = orjson.loads(f.read())
+            data = orjson.loads(content)
             details = data.get(str(app_id), {})
             if not details.get("success"):
+                negative_cache.record_failure(STEAM_APP_SOURCE, app_id, missing=True)
                 callback(None)
                 return
             app_data_full = details.get("data", {})
@@ -400,68 +500,156 @@ def fetch_app_info_async(app_id: int, callback: Callable[[dict | None], None]):
                 "controller_support": app_data_full.get("controller_support", "")
             }
             save_app_details(app_id, app_data)
+            negative_cache.record_success(STEAM_APP_SOURCE, app_id)
             callback(app_data)
         except Exception as e:
             logger.error("Error processing Steam app info for appid %s: %s", app_id, e)
+            negative_cache.record_failure(STEAM_APP_SOURCE, app_id)
             callback(None)
 
-    downloader.download_async(url, cache_file, timeout=5, callback=process_response)
+    metadata_scheduler.fetch(f"{STEAM_APP_SOURCE}:{app_id}", url, process_response, priority)
 
 def load_protondb_status(appid):
-    """Загружает закешированные данные ProtonDB для игры по appid, если они не устарели."""
-    cache_dir = get_cache_dir()
-    cache_file = os.path.join(cache_dir, f"protondb_{appid}.json")
-    if os.path.exists(cache_file):
-        if time.time() - os.path.getmtime(cache_file) < CACHE_DURATION:
-            try:
-                with open(cache_file, "rb") as f:
-                    return orjson.loads(f.read())
-            except Exception as e:
-                logger.error("Ошибка загрузки кеша ProtonDB для appid %s: %s", appid, e)
-    return None
+    """
+    Загружает закешированные данные ProtonDB для игры по appid. Устаревшие данные тоже
+    возвращаются и ставятся в очередь на фоновое обновление.
+    """
+    data, stale = get_metadata_store().get_many_stale(PROTONDB_SOURCE, [appid])
+    if stale:
+        _mark_stale(PROTONDB_SOURCE, stale)
+    return data.get(appid)
 
 def save_protondb_status(appid, data):
-    """Сохраняет данные ProtonDB для игры по appid в файл кэша."""
-    cache_dir = get_cache_dir()
-    cache_file = os.path.join(cache_dir, f"protondb_{appid}.json")
-    try:
-        with open(cache_file, "wb") as f:
-            f.write(orjson.dumps(data))
-    except Exception as e:
-        logger.error("Ошибка сохранения кеша ProtonDB для appid %s: %s", appid, e)
+    """Сохраняет данные ProtonDB для игры по appid в хранилище метаданных."""
+    get_metadata_store().put(PROTONDB_SOURCE, appid, data, CACHE_DURATION, CACHE_JITTER)
 
-def get_protondb_tier_async(appid: int, callback: Callable[[str], None]):
+def get_protondb_tier_async(appid: int, callback: Callable[[str], None], priority: int = PRIORITY_NORMAL):
     """
-    Asynchronously fetches ProtonDB tier for an app.
+    Asynchronously fetches ProtonDB tier for an app through the metadata scheduler.
+    Stale cached tiers are returned immediately and refreshed in the background.
+    Games without a ProtonDB summary (404) and failed lookups go to the negative cache.
     Calls the callback with the tier string or empty string if failed.
     """
     cached = load_protondb_status(appid)
     if cached is not None:
         callback(cached.get("tier", ""))
         return
+    if get_negative_cache().is_blocked(PROTONDB_SOURCE, appid):
+        logger.debug("ProtonDB data for appid %s is in the negative cache, skipping", appid)
+        callback("")
+        return
+    _request_protondb_tier(appid, lambda data: callback(data["tier"] if data else ""), priority)
 
+def _request_protondb_tier(appid: int, callback: Callable[[dict | None], None], priority: int):
+    """Запрашивает сводку ProtonDB и сохраняет результат (без проверки кэша)."""
+    negative_cache = get_negative_cache()
     url = f"https://www.protondb.com/api/v1/reports/summaries/{appid}.json"
-    cache_dir = get_cache_dir()
-    cache_file = os.path.join(cache_dir, f"protondb_{appid}.json")
 
-    def process_response(result: str | None):
-        if not result or not os.path.exists(result):
+    def process_response(content: bytes | None, status: int | None):
+        if content is None:
             logger.info("Failed to download ProtonDB data for appid %s", appid)
-            callback("")
+            if status:
+                negative_cache.record_failure(PROTONDB_SOURCE, appid, missing=status == 404)
+            callback(None)
             return
         try:
-            with open(result, "rb") as f:
-                data = orjson.loads(f.read())
+            data = orjson.loads(content)
             filtered_data = {"tier": data.get("tier", "")}
             save_protondb_status(appid, filtered_data)
-            callback(filtered_data["tier"])
+            negative_cache.record_success(PROTONDB_SOURCE, appid)
+            callback(filtered_data)
         except Exception as e:
             logger.info("Failed to process ProtonDB data for appid %s: %s", appid, e)
-            callback("")
+            negative_cache.record_failure(PROTONDB_SOURCE, appid)
+            callback(None)
 
-    downloader.download_async(url, cache_file, timeout=5, callback=process_response)
+    metadata_scheduler.fetch(f"{PROTONDB_SOURCE}:{appid}", url, process_response, priority)
 
-def get_full_steam_game_info_async(appid: int, callback: Callable[[dict], None]):
+def prioritize_app_metadata(appids, priority: int = PRIORITY_FOCUSED):
+    """Поднимает в очереди запросы метаданных для выбранных или видимых игр."""
+    keys = [f"{source}:{appid}" for appid in appids for source in (STEAM_APP_SOURCE, PROTONDB_SOURCE)]
+    metadata_scheduler.prioritize(keys, priority)
+
+# Устаревшие записи, ожидающие фонового обновления: {источник: {appid}}
+_STALE_METADATA: dict[str, set[int]] = {STEAM_APP_SOURCE: set(), PROTONDB_SOURCE: set()}
+_REVALIDATION_STARTED = False
+_METADATA_LISTENERS: list[Callable[[int, dict], None]] = []
+_STALE_LOCK = threading.Lock()
+
+def add_metadata_listener(listener: Callable[[int, dict], None]):
+    """
+    Подписывает на обновление метаданных после фоновой перепроверки.
+    Слушатель вызывается в рабочем потоке с appid и словарём изменённых полей
+    карточки {поле: (старое значение, новое)} — "description", "controller_support", "protondb_tier".
+    """
+    with _STALE_LOCK:
+        _METADATA_LISTENERS.append(listener)
+
+def _mark_stale(source: str, appids):
+    """Ставит устаревшие записи в очередь; после revalidate_stale_metadata они обновляются сразу."""
+    with _STALE_LOCK:
+        if not _REVALIDATION_STARTED:
+            _STALE_METADATA[source].update(appids)
+            return
+    for appid in appids:
+        _revalidate(source, appid)
+
+def revalidate_stale_metadata():
+    """
+    Запускает фоновое обновление устаревших данных магазина и ProtonDB.
+    Вызывается после того, как библиотека показана, чтобы обновление не задерживало её загрузку.
+    Запросы идут с наименьшим приоритетом, а обновлённые значения рассылаются слушателям.
+    """
+    global _REVALIDATION_STARTED
+    with _STALE_LOCK:
+        _REVALIDATION_STARTED = True
+        pending = {source: appids.copy() for source, appids in _STALE_METADATA.items()}
+        for appids in _STALE_METADATA.values():
+            appids.clear()
+    total = sum(len(appids) for appids in pending.values())
+    if total:
+        logger.info("Revalidating %d stale metadata records in the background", total)
+    for source, appids in pending.items():
+        for appid in appids:
+            _revalidate(source, appid)
+
+def _revalidate(source: str, appid: int):
+    if get_negative_cache().is_blocked(source, appid):
+        return
+    store = get_metadata_store()
+    previous = store.get_many_stale(source, [appid])[0].get(appid)
+    if previous is None:
+        return
+    if source == STEAM_APP_SOURCE:
+        def on_app_details(app_data: dict | None):
+            if app_data is None:
+                return
+            _notify_metadata_changes(appid, {
+                "description": (decode_text(previous.get("short_description", "")),
+                                decode_text(app_data.get("short_description", ""))),
+                "controller_support": (previous.get("controller_support", ""), app_data.get("controller_support", "")),
+            })
+        _request_app_details(appid, on_app_details, PRIORITY_BACKGROUND)
+    else:
+        def on_protondb(data: dict | None):
+            if data is not None:
+                _notify_metadata_changes(appid, {"protondb_tier": (previous.get("tier", ""), data["tier"])})
+        _request_protondb_tier(appid, on_protondb, PRIORITY_BACKGROUND)
+
+def _notify_metadata_changes(appid: int, fields: dict):
+    changes = {field: values for field, values in fields.items() if values[0] != values[1]}
+    if not changes:
+        return
+    logger.info("Metadata for appid %s changed: %s", appid, ", ".join(changes))
+    with _STALE_LOCK:
+        listeners = list(_METADATA_LISTENERS)
+    for listener in listeners:
+        try:
+            listener(appid, changes)
+        except Exception as e:
+            logger.error("Metadata listener failed for appid %s: %s", appid, e)
+
+def get_full_steam_game_info_async(appid: int, callback: Callable[[dict], None], priority: int = PRIORITY_NORMAL):
     """
     Asynchronously retrieves full Steam game info.
     Calls the callback with the game info dictionary.
@@ -470,28 +658,114 @@ def get_full_steam_game_info_async(appid: int, callback: Callable[[dict], None])
         if not app_info:
             callback({})
             return
-        title = decode_text(app_info.get("name", ""))
-        description = decode_text(app_info.get("short_description", ""))
-        cover = f"https://steamcdn-a.akamaihd.net/steam/apps/{appid}/library_600x900_2x.jpg"
-
-        def on_protondb_tier(tier: str):
-            callback({
-                'description': description,
-                'controller_support': app_info.get('controller_support', ''),
-                'cover': cover,
-                'protondb_tier': tier,
-                'steam_game': "true",
-                'name': title
-            })
+        get_protondb_tier_async(appid, lambda tier: callback(_build_full_game_info(appid, app_info, tier)), priority)
 
-        get_protondb_tier_async(appid, on_protondb_tier)
+    fetch_app_info_async(appid, on_app_info, priority)
 
-    fetch_app_info_async(appid, on_app_info)
+def _build_full_game_info(appid: int, app_info: dict | None, tier: str) -> dict:
+    """Словарь get_full_steam_game_info_async (пустой, если игры нет в магазине)."""
+    if not app_info:
+        return {}
+    return {
+        'description': decode_text(app_info.get("short_description", "")),
+        'controller_support': app_info.get('controller_support', ''),
+        'cover': f"https://steamcdn-a.akamaihd.net/steam/apps/{appid}/library_600x900_2x.jpg",
+        'protondb_tier': tier,
+        'steam_game': "true",
+        'name': decode_text(app_info.get("name", ""))
+    }
+
+def get_steam_apps_info_async(appids: list[int], callback: Callable[[dict[int, dict]], None],
+                              priorities: list[int] | None = None) -> None:
+    """
+    Asynchronously retrieves full Steam game info for a whole list of appids (installed Steam games).
+    Calls the callback with {appid: info as in get_full_steam_game_info_async} as soon as the
+    metadata store has been read; data missing there arrives later via add_metadata_listener,
+    so the request rate limit never delays showing the library.
+    """
+    def worker():
+        by_appid: dict[int, int] = {}
+        for i, appid in enumerate(appids):
+            priority = priorities[i] if priorities else PRIORITY_NORMAL
+            by_appid[appid] = min(priority, by_appid.get(appid, priority))
+        metadata, pending = _load_app_metadata(by_appid)
+        callback({appid: _build_full_game_info(appid, *metadata[appid]) for appid in by_appid})
+        _fetch_pending_metadata(pending)
+
+    threading.Thread(target=worker, daemon=True).start()
+
+# Данные магазина игры, которая ещё ждёт ответа: карточка показывается с обложкой по appid,
+# описание, поддержка контроллера и рейтинг приходят позже через слушателей метаданных
+_PENDING_APP_INFO_FIELDS = {"short_description": "", "controller_support": ""}
+
+def _load_app_metadata(priorities: dict[int, int]) -> tuple[dict[int, tuple[dict | None, str]], dict[int, tuple[bool, bool, int]]]:
+    """
+    Читает данные магазина и рейтинги ProtonDB для appid из priorities ({appid: PRIORITY_*})
+    двумя запросами к хранилищу на всю библиотеку. Возвращает {appid: (данные магазина
+    или None, если игры нет в магазине, рейтинг)} и {appid: (нужны данные магазина,
+    нужен рейтинг, приоритет)} — то, что придётся запросить в сети через _fetch_pending_metadata.
+    Для таких appid вместо недостающих данных возвращаются пустые значения.
+    """
+    store = get_metadata_store()
+    cached_apps, stale_apps = store.get_many_stale(STEAM_APP_SOURCE, priorities)
+    cached_tiers, stale_tiers = store.get_many_stale(PROTONDB_SOURCE, priorities)
+    # Устаревшие данные показываются сразу и обновляются в фоне
+    _mark_stale(STEAM_APP_SOURCE, stale_apps)
+    _mark_stale(PROTONDB_SOURCE, stale_tiers)
+    negative_cache = get_negative_cache()
+    blocked_apps = negative_cache.blocked_keys(STEAM_APP_SOURCE, priorities.keys() - cached_apps.keys())
+    blocked_tiers = negative_cache.blocked_keys(PROTONDB_SOURCE, priorities.keys() - cached_tiers.keys())
+    logger.info("Loaded store data for %d of %d appids from metadata cache (%d stale, %d in negative cache)",
+                len(cached_apps.keys() & cached_tiers.keys()), len(priorities),
+                len(stale_apps | stale_tiers), len(blocked_apps))
+    metadata: dict[int, tuple[dict | None, str]] = {}
+    pending: dict[int, tuple[bool, bool, int]] = {}
+    for appid, priority in priorities.items():
+        if appid in blocked_apps:
+            metadata[appid] = (None, "")
+            continue
+        tier = cached_tiers[appid].get("tier", "") if appid in cached_tiers else ""
+        fetch_app = appid not in cached_apps
+        fetch_tier = appid not in cached_tiers and appid not in blocked_tiers
+        metadata[appid] = ({"steam_appid": appid, **_PENDING_APP_INFO_FIELDS} if fetch_app else cached_apps[appid], tier)
+        if fetch_app or fetch_tier:
+            pending[appid] = (fetch_app, fetch_tier, priority)
+    if pending:
+        logger.info("Requesting store and ProtonDB data for %d appids in the background", len(pending))
+    return metadata, pending
+
+def _fetch_pending_metadata(pending: dict[int, tuple[bool, bool, int]]):
+    """
+    Запрашивает данные, которых не было в хранилище (см. _load_app_metadata), и рассылает
+    их слушателям add_metadata_listener как изменения пустых значений.
+    Рейтинг ProtonDB запрашивается только для игр, найденных в магазине.
+    """
+    def fetch_tier(appid: int, priority: int):
+        get_protondb_tier_async(appid, lambda tier: _notify_metadata_changes(appid, {"protondb_tier": ("", tier)}),
+                                priority)
 
-def get_steam_game_info_async(desktop_name: str, exec_line: str, callback: Callable[[dict], tuple[bool, str] | None]) -> None:
+    def fetch_app(appid: int, with_tier: bool, priority: int):
+        def on_app_info(app_info: dict | None):
+            if not app_info:
+                return
+            _notify_metadata_changes(appid, {
+                "description": ("", decode_text(app_info.get("short_description", ""))),
+                "controller_support": ("", app_info.get("controller_support", "")),
+            })
+            if with_tier:
+                fetch_tier(appid, priority)
+        fetch_app_info_async(appid, on_app_info, priority)
+
+    for appid, (need_app, need_tier, priority) in pending.items():
+        if need_app:
+            fetch_app(appid, need_tier, priority)
+        else:
+            fetch_tier(appid, priority)
+
+def resolve_game_exe(exec_line: str) -> str:
     """
-    Asynchronously retrieves Steam game info based on desktop name and exec line.
-    Calls the callback with the game info dictionary.
+    Возвращает путь к исполняемому файлу игры из строки Exec.
+    Для .bat файлов берётся первый упомянутый в них .exe.
     """
     parts = shlex.split(exec_line)
     game_exe = parts[-1] if parts else exec_line
@@ -515,13 +789,14 @@ def get_steam_game_info_async(desktop_name: str, exec_line: str, callback: Calla
                 logger.error("Error processing bat file %s: %s", game_exe, e)
         else:
             logger.error("Bat file not found: %s", game_exe)
+    return game_exe
 
-    if not game_exe.lower().endswith('.exe'):
-        logger.error("Invalid executable path: %s. Expected .exe", game_exe)
-        meta_data = {}
-    else:
-        meta_data = get_exiftool_data(game_exe)
-
+def get_game_candidates(desktop_name: str, game_exe: str, meta_data: dict) -> list[str]:
+    """
+    Собирает кандидатов для поиска игры в каталоге Steam: ProductName и FileDescription
+    из метаданных, имя из .desktop, имя exe и папки игры.
+    Возвращает отфильтрованный список без дубликатов, более длинные кандидаты первыми.
+    """
     exe_name = os.path.splitext(os.path.basename(game_exe))[0]
     folder_path = os.path.dirname(game_exe)
     folder_name = os.path.basename(folder_path)
@@ -547,85 +822,294 @@ def get_steam_game_info_async(desktop_name: str, exec_line: str, callback: Calla
     candidates = remove_duplicates(candidates)
     candidates_ordered = sorted(candidates, key=lambda s: len(s.split()), reverse=True)
     logger.info("Sorted candidates: %s", candidates_ordered)
+    return candidates_ordered
+
+def _build_game_info(appid: int | None, app_info: dict | None, tier: str, exe_name: str) -> dict:
+    """Формирует словарь с информацией об игре, найденной (или нет) в каталоге Steam."""
+    if appid is None or not app_info:
+        return {
+            "appid": "",
+            "name": decode_text(f"{exe_name.capitalize()}"),
+            "description": "",
+            "cover": "",
+            "controller_support": "",
+            "protondb_tier": "",
+            "steam_game": "false"
+        }
+    return {
+        "appid": appid,
+        "name": decode_text(app_info.get("name", exe_name.capitalize())),
+        "description": decode_text(app_info.get("short_description", "")),
+        "cover": f"https://steamcdn-a.akamaihd.net/steam/apps/{appid}/library_600x900_2x.jpg",
+        "controller_support": app_info.get("controller_support", ""),
+        "protondb_tier": tier,
+        "steam_game": "false"
+    }
+
+def _get_exe_metadata(game_exe: str) -> dict:
+    if not game_exe.lower().endswith('.exe'):
+        logger.error("Invalid executable path: %s. Expected .exe", game_exe)
+        return {}
+    return get_exe_version_info(game_exe)
+
+_MATCH_CACHE: dict[str, dict[str, dict]] | None = None
+_MATCH_CACHE_LOCK = threading.Lock()
+# (st_mtime_ns steam_apps_state.json, ревизия каталога)
+_CATALOG_REVISION: tuple[int, int | None] | None = None
+
+def _match_cache_path() -> str:
+    return os.path.join(get_cache_dir(), "match_cache.json")
+
+def _load_match_cache() -> dict[str, dict[str, dict]]:
+    """Лениво читает кэш сопоставлений exe -> appid. Вызывать под _MATCH_CACHE_LOCK."""
+    global _MATCH_CACHE
+    if _MATCH_CACHE is None:
+        _MATCH_CACHE = {}
+        path = _match_cache_path()
+        if os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    _MATCH_CACHE = orjson.loads(f.read())
+            except Exception as e:
+                logger.error("Failed to read match cache %s: %s", path, e)
+    return _MATCH_CACHE
+
+def _save_match_cache():
+    """Атомарно записывает кэш сопоставлений на диск."""
+    path = _match_cache_path()
+    tmp_path = f"{path}.tmp"
+    with _MATCH_CACHE_LOCK:
+        data = orjson.dumps(_load_match_cache())
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.error("Failed to save match cache %s: %s", path, e)
 
-    def on_steam_apps(steam_apps: list):
-        steam_apps_index = build_index(steam_apps)
-        matching_app = None
-        for candidate in candidates_ordered:
-            if not candidate:
-                continue
-            matching_app = search_app(candidate, steam_apps_index)
-            if matching_app:
-                logger.info("Match found for candidate '%s': %s", candidate, matching_app.get("normalized_name"))
-                break
-        if not matching_app:
-            callback({
-                "appid": "",
-                "name": decode_text(f"{exe_name.capitalize()}"),
-                "description": "",
-                "cover": "",
-                "controller_support": "",
-                "protondb_tier": "",
-                "steam_game": "false"
-            })
-            return
+def _exe_identity(game_exe: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(game_exe)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
 
-        appid = matching_app["appid"]
-        def on_app_info(app_info: dict | None):
-            if not app_info:
-                callback({
-                    "appid": "",
-                    "name": decode_text(f"{exe_name.capitalize()}"),
-                    "description": "",
-                    "cover": "",
-                    "controller_support": "",
-                    "protondb_tier": "",
-                    "steam_game": "false"
-                })
-                return
-            title = decode_text(app_info.get("name", exe_name.capitalize()))
-            description = decode_text(app_info.get("short_description", ""))
-            cover = f"https://steamcdn-a.akamaihd.net/steam/apps/{appid}/library_600x900_2x.jpg"
-            controller_support = app_info.get("controller_support", "")
-
-            def on_protondb_tier(tier: str):
-                callback({
-                    "appid": appid,
-                    "name": title,
-                    "description": description,
-                    "cover": cover,
-                    "controller_support": controller_support,
-                    "protondb_tier": tier,
-                    "steam_game": "false"
-                })
-
-            get_protondb_tier_async(appid, on_protondb_tier)
-
-        fetch_app_info_async(appid, on_app_info)
+def _catalog_revision() -> int | None:
+    """
+    Ревизия локального каталога Steam из steam_apps_state.json или None, если она неизвестна.
+    Время изменения индекса для этого не подходит: оно обновляется и при неизменном манифесте.
+    """
+    global _CATALOG_REVISION
+    try:
+        mtime_ns = os.stat(_app_list_state_path()).st_mtime_ns
+    except OSError:
+        return None
+    with _MATCH_CACHE_LOCK:
+        if _CATALOG_REVISION is None or _CATALOG_REVISION[0] != mtime_ns:
+            _CATALOG_REVISION = (mtime_ns, _load_app_list_state().get("revision"))
+        return _CATALOG_REVISION[1]
 
-    load_steam_apps_async(on_steam_apps)
+def get_cached_match(game_exe: str, desktop_name: str) -> dict | None:
+    """
+    Возвращает сохранённый результат сопоставления {"appid", "candidate"} для exe,
+    если файл (размер и mtime) и имя из .desktop не изменились.
+    Отрицательный результат (appid None) действителен, пока не сменилась ревизия каталога Steam.
+    """
+    identity = _exe_identity(game_exe)
+    if identity is None:
+        return None
+    with _MATCH_CACHE_LOCK:
+        entry = _load_match_cache().get(game_exe, {}).get(desktop_name)
+    if not entry or (entry.get("size"), entry.get("mtime_ns")) != identity:
+        return None
+    if entry.get("appid") is None:
+        revision = _catalog_revision()
+        if revision is None or entry.get("revision") != revision:
+            return None
+    return entry
+
+def store_match(game_exe: str, desktop_name: str, match: dict | None, save: bool = True):
+    """Запоминает результат сопоставления exe с каталогом Steam (match None — не найдено)."""
+    identity = _exe_identity(game_exe)
+    if identity is None:
+        return
+    entry = {
+        "size": identity[0],
+        "mtime_ns": identity[1],
+        "appid": match["appid"] if match else None,
+        "candidate": match["candidate"] if match else "",
+        "revision": _catalog_revision(),
+    }
+    with _MATCH_CACHE_LOCK:
+        _load_match_cache().setdefault(game_exe, {})[desktop_name] = entry
+    if save:
+        _save_match_cache()
+
+def invalidate_match_cache(game_exe: str | None = None):
+    """
+    Сбрасывает сохранённые сопоставления для указанного exe
+    или весь кэш, если exe не указан.
+    """
+    with _MATCH_CACHE_LOCK:
+        cache = _load_match_cache()
+        if game_exe is None:
+            cache.clear()
+        else:
+            cache.pop(game_exe, None)
+    _save_match_cache()
+
+def rematch_game(exec_line: str):
+    """Забывает сопоставление игры, чтобы при следующей загрузке она была найдена заново."""
+    game_exe = resolve_game_exe(exec_line)
+    logger.info("Re-matching %s against the Steam catalog", game_exe)
+    invalidate_match_cache(game_exe)
+
+def get_steam_game_info_async(desktop_name: str, exec_line: str, callback: Callable[[dict], tuple[bool, str] | None]) -> None:
+    """
+    Asynchronously retrieves Steam game info based on desktop name and exec line.
+    Calls the callback with the game info dictionary.
+    """
+    get_steam_games_info_async([(desktop_name, exec_line)], lambda infos: callback(infos[0]))
+
+def get_steam_games_info_async(entries: list[tuple[str, str]], callback: Callable[[list[dict]], None],
+                               priorities: list[int] | None = None) -> None:
+    """
+    Asynchronously resolves a whole library of (desktop_name, exec_line) pairs at once.
+    Entries whose executable is unchanged since the last run are taken from the
+    persistent match cache. For the rest, identical executables are inspected only
+    once (version info is read in-process from the PE resources), identical
+    candidate sets are matched once against the shared index. Store/ProtonDB data
+    is read from the metadata store in one batch; the callback does not wait for
+    appids missing there: they are requested once per distinct appid afterwards and
+    their data arrives via add_metadata_listener. priorities (one per entry, PRIORITY_*)
+    let games that will be on screen first be fetched first.
+    Calls the callback with a list of game info dictionaries in the order of entries.
+    """
+    if not entries:
+        callback([])
+        return
+
+    game_exes = [resolve_game_exe(exec_line) for _desktop_name, exec_line in entries]
+    exe_names = [os.path.splitext(os.path.basename(game_exe))[0] for game_exe in game_exes]
+    appids: list[int | None] = [None] * len(entries)
+
+    def worker():
+        to_match = []
+        for i, (desktop_name, _exec_line) in enumerate(entries):
+            cached = get_cached_match(game_exes[i], desktop_name)
+            if cached is None:
+                to_match.append(i)
+            else:
+                appids[i] = cached["appid"]
+        logger.info("Resolved %d of %d desktop entries from match cache", len(entries) - len(to_match), len(entries))
+        if not to_match:
+            fetch_apps()
+            return
 
-_STEAM_APPS = None
-_STEAM_APPS_INDEX = None
+        distinct_exes = list(dict.fromkeys(game_exes[i] for i in to_match))
+        logger.info("Matching %d desktop entries with %d distinct executables", len(to_match), len(distinct_exes))
+        meta_by_exe = {game_exe: _get_exe_metadata(game_exe) for game_exe in distinct_exes}
+        candidates = {i: tuple(get_game_candidates(entries[i][0], game_exes[i], meta_by_exe[game_exes[i]])) for i in to_match}
+        get_steam_apps_index_async(lambda index: on_index(index, candidates))
+
+    def on_index(index: SteamAppIndex | None, candidates: dict[int, tuple[str, ...]]):
+        match_by_candidates: dict[tuple[str, ...], dict | None] = {}
+        for game_candidates in dict.fromkeys(candidates.values()):
+            matches = search_app_ranked(game_candidates, index, limit=1) if index is not None else []
+            match_by_candidates[game_candidates] = matches[0] if matches else None
+        for i, game_candidates in candidates.items():
+            match = match_by_candidates[game_candidates]
+            appids[i] = match["appid"] if match else None
+            if index is not None:
+                store_match(game_exes[i], entries[i][0], match, save=False)
+        if index is not None:
+            _save_match_cache()
+        fetch_apps()
+
+    def fetch_apps():
+        results: list[dict] = [{} for _ in entries]
+        entries_by_appid: dict[int, list[int]] = {}
+        for i, appid in enumerate(appids):
+            if appid is None:
+                results[i] = _build_game_info(None, None, "", exe_names[i])
+            else:
+                entries_by_appid.setdefault(appid, []).append(i)
+        if not entries_by_appid:
+            callback(results)
+            return
+
+        metadata, pending = _load_app_metadata({
+            appid: min(priorities[i] for i in indexes) if priorities else PRIORITY_NORMAL
+            for appid, indexes in entries_by_appid.items()
+        })
+        for appid, indexes in entries_by_appid.items():
+            for i in indexes:
+                results[i] = _build_game_info(appid, *metadata[appid], exe_names[i])
+        callback(results)
+        _fetch_pending_metadata(pending)
+
+    threading.Thread(target=worker, daemon=True).start()
+
+_STEAM_APPS_INDEX: SteamAppIndex | None = None
+_STEAM_APPS_INDEX_STAT: tuple[int, int, float] | None = None
+_STEAM_APPS_WAITERS: list[Callable[[SteamAppIndex | None], None]] | None = None
 _STEAM_APPS_LOCK = threading.Lock()
 
-def get_steam_apps_and_index_async(callback: Callable[[tuple[list, dict]], None]):
+def _index_file_stat(path: str) -> tuple[int, int, float] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime)
+
+def get_steam_apps_index_async(callback: Callable[[SteamAppIndex | None], None]):
     """
-    Asynchronously loads and caches Steam apps and their index.
-    Calls the callback with (steam_apps, steam_apps_index).
+    Asynchronously returns the process-wide Steam apps index.
+    The index is loaded once per session: concurrent callers are queued and
+    all receive the result of a single load. The index is reopened when the
+    cache file is replaced on disk and reloaded when it expires.
+    Calls the callback with the index or None if it could not be loaded.
     """
-    global _STEAM_APPS, _STEAM_APPS_INDEX
+    global _STEAM_APPS_INDEX, _STEAM_APPS_INDEX_STAT, _STEAM_APPS_WAITERS
+    cache_index = os.path.join(get_cache_dir(), "steam_apps.idx")
+    current_stat = _index_file_stat(cache_index)
     with _STEAM_APPS_LOCK:
-        if _STEAM_APPS is not None and _STEAM_APPS_INDEX is not None:
-            callback((_STEAM_APPS, _STEAM_APPS_INDEX))
+        if _STEAM_APPS_WAITERS is not None:
+            _STEAM_APPS_WAITERS.append(callback)
             return
+        index = None
+        fresh = current_stat is not None and time.time() - current_stat[2] < CACHE_DURATION
+        if _STEAM_APPS_INDEX is not None and fresh:
+            if current_stat != _STEAM_APPS_INDEX_STAT:
+                reopened = open_index(cache_index)
+                if reopened is not None:
+                    logger.info("Steam apps index changed on disk, reopening %s", cache_index)
+                    _STEAM_APPS_INDEX = reopened
+                    _STEAM_APPS_INDEX_STAT = current_stat
+            if current_stat == _STEAM_APPS_INDEX_STAT:
+                index = _STEAM_APPS_INDEX
+        if index is None:
+            _STEAM_APPS_WAITERS = [callback]
+    if index is not None:
+        callback(index)
+        return
 
-    def on_steam_apps(steam_apps: list):
-        global _STEAM_APPS, _STEAM_APPS_INDEX
+    def on_steam_apps(steam_apps_index: SteamAppIndex | None):
+        global _STEAM_APPS_INDEX, _STEAM_APPS_INDEX_STAT, _STEAM_APPS_WAITERS
         with _STEAM_APPS_LOCK:
-            _STEAM_APPS = steam_apps
-            _STEAM_APPS_INDEX = build_index(steam_apps)
-            callback((_STEAM_APPS, _STEAM_APPS_INDEX))
+            if steam_apps_index is not None:
+                _STEAM_APPS_INDEX = steam_apps_index
+                _STEAM_APPS_INDEX_STAT = _index_file_stat(steam_apps_index.path)
+            elif _STEAM_APPS_INDEX is not None:
+                # Обновить не удалось — продолжаем работать со старым индексом
+                steam_apps_index = _STEAM_APPS_INDEX
+            waiters = _STEAM_APPS_WAITERS or []
+            _STEAM_APPS_WAITERS = None
+        for waiter in waiters:
+            try:
+                waiter(steam_apps_index)
+            except Exception as e:
+                logger.error("Error in Steam apps index callback: %s", e)
 
     load_steam_apps_async(on_steam_apps)
 
@@ -848,7 +1332,8 @@ export START_FROM_STEAM=1
                 cover_url,
                 cover_file,
                 timeout=5,
-                callback=lambda result, cfile=cover_file, ctype=cover_type: on_cover_download(cfile, ctype)
+                callback=lambda result, cfile=cover_file, ctype=cover_type: on_cover_download(cfile, ctype),
+                priority=PRIORITY_BACKGROUND
             )
 
     get_steam_game_info_async(game_name, exec_line, on_game_info)
@@ -0,0 +1,339 @@
+import heapq
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterable, Iterator, ItemsView, Mapping
+from portprotonqt.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Формат файла (little-endian):
+#   заголовок:    magic(4s) version(I) count(I) blob_size(I) gram_count(I) posting_count(I)
+#   appids:       uint32[count]
+#   offsets:      uint32[count + 1] — смещения имён внутри blob
+#   grams:        uint32[gram_count] — отсортированные байтовые триграммы имён
+#   gram_offsets: uint32[gram_count + 1] — смещения списков внутри postings
+#   postings:     uint32[posting_count] — номера имён по возрастанию для каждой триграммы
+#   blob:         отсортированные нормализованные имена в UTF-8 без разделителей
+INDEX_MAGIC = b"PPQI"
+INDEX_VERSION = 2
+_HEADER = struct.Struct("<4sIIIII")
+
+
+# Колоночный формат каталога для распространения (little-endian):
+#   заголовок: magic(4s) version(I) count(I)
+#   appids:    uint32[count]
+#   names:     count записей uint16 длина + нормализованное имя в UTF-8
+APP_LIST_MAGIC = b"PPQA"
+APP_LIST_VERSION = 1
+_APP_LIST_HEADER = struct.Struct("<4sII")
+_NAME_LENGTH = struct.Struct("<H")
+
+
+def pack_app_list(apps: Iterable[dict]) -> bytes:
+    """Упаковывает список {"appid", "normalized_name"} в колоночный формат, порядок сохраняется."""
+    appids = array("I")
+    names = bytearray()
+    for app in apps:
+        name = app.get("normalized_name", "").encode("utf-8")
+        if len(name) > 0xFFFF:
+            name = name[:0xFFFF].decode("utf-8", "ignore").encode("utf-8")
+        appids.append(int(app["appid"]))
+        names += _NAME_LENGTH.pack(len(name))
+        names += name
+    if sys.byteorder != "little":
+        appids.byteswap()
+    return _APP_LIST_HEADER.pack(APP_LIST_MAGIC, APP_LIST_VERSION, len(appids)) + appids.tobytes() + bytes(names)
+
+
+def unpack_app_list(data: bytes) -> tuple[array, list[bytes]]:
+    """
+    Распаковывает колоночный каталог в столбцы (appids, names).
+    Имена остаются байтами UTF-8: индексу они нужны именно в таком виде.
+    """
+    magic, version, count = _APP_LIST_HEADER.unpack_from(data, 0)
+    if magic != APP_LIST_MAGIC or version != APP_LIST_VERSION:
+        raise ValueError("Unsupported Steam app list format")
+    start = _APP_LIST_HEADER.size
+    appids = array("I", data[start:start + 4 * count])
+    if len(appids) != count:
+        raise ValueError("Truncated Steam app list")
+    if sys.byteorder != "little":
+        appids.byteswap()
+    pos = start + 4 * count
+    unpack_length = _NAME_LENGTH.unpack_from
+    names = []
+    for _ in range(count):
+        (length,) = unpack_length(data, pos)
+        pos += 2
+        names.append(data[pos:pos + length])
+        pos += length
+    if pos != len(data):
+        raise ValueError("Trailing data in Steam app list")
+    return appids, names
+
+
+def _trigrams(name: bytes) -> set[int]:
+    return {(name[i] << 16) | (name[i + 1] << 8) | name[i + 2] for i in range(len(name) - 2)}
+
+
+def write_index(path: str, apps: Iterable[dict]) -> int:
+    """
+    Записывает бинарный индекс приложений Steam по полю normalized_name.
+    При совпадении имён остаётся последнее приложение, как и в словарном индексе.
+    Файл пишется во временный и атомарно переименовывается.
+    Возвращает количество записанных имён.
+    """
+    by_name: dict[bytes, int] = {}
+    for app in apps:
+        name = app.get("normalized_name")
+        appid = app.get("appid")
+        if not name or appid is None:
+            continue
+        by_name[name.encode("utf-8")] = int(appid)
+    return _write_index(path, by_name)
+
+
+def write_index_columns(path: str, appids: Iterable[int], names: Iterable[bytes]) -> int:
+    """То же, что write_index, но из столбцов unpack_app_list без промежуточных словарей."""
+    by_name = {name: appid for appid, name in zip(appids, names, strict=True) if name}
+    return _write_index(path, by_name)
+
+
+def _write_index(path: str, by_name: dict[bytes, int]) -> int:
+    names = sorted(by_name)
+    appids = array("I", (by_name[name] for name in names))
+    offsets = array("I", [0])
+    postings_by_gram: dict[int, array] = {}
+    total = 0
+    for i, name in enumerate(names):
+        total += len(name)
+        offsets.append(total)
+        for gram in _trigrams(name):
+            posting = postings_by_gram.get(gram)
+            if posting is None:
+                posting = postings_by_gram[gram] = array("I")
+            posting.append(i)
+
+    grams = array("I", sorted(postings_by_gram))
+    gram_offsets = array("I", [0])
+    postings = array("I")
+    for gram in grams:
+        postings.extend(postings_by_gram[gram])
+        gram_offsets.append(len(postings))
+    sections = (appids, offsets, grams, gram_offsets, postings)
+    if sys.byteorder != "little":
+        for section in sections:
+            section.byteswap()
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(names), total, len(grams), len(postings)))
+        for section in sections:
+            f.write(section.tobytes())
+        for name in names:
+            f.write(name)
+    os.replace(tmp_path, path)
+    return len(names)
+
+
+class SteamAppIndex(Mapping):
+    """
+    Индекс приложений Steam, открытый через mmap.
+    Ведёт себя как read-only словарь normalized_name -> {"appid", "normalized_name"},
+    но не материализует записи: поиск идёт бинарным поиском прямо по файлу.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, count, blob_size, gram_count, posting_count = _HEADER.unpack_from(self._mm, 0)
+            if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                raise ValueError(f"Unsupported Steam app index format in {path}")
+            sizes = (count, count + 1, gram_count, gram_count + 1, posting_count)
+            bounds = [_HEADER.size]
+            for size in sizes:
+                bounds.append(bounds[-1] + 4 * size)
+            self._blob_start = bounds[-1]
+            if self._blob_start + blob_size > len(self._mm):
+                raise ValueError(f"Truncated Steam app index {path}")
+            self._view = memoryview(self._mm)
+            self._sections = []
+            for start, end in zip(bounds, bounds[1:], strict=False):
+                if sys.byteorder == "little":
+                    section = self._view[start:end].cast("I")
+                else:
+                    section = array("I", self._view[start:end])
+                    section.byteswap()
+                self._sections.append(section)
+            self._appids, self._offsets, self._grams, self._gram_offsets, self._postings = self._sections
+            self._count = count
+        except Exception:
+            self._mm.close()
+            raise
+
+    def close(self):
+        """Освобождает отображение файла."""
+        for section in self._sections:
+            if isinstance(section, memoryview):
+                section.release()
+        self._view.release()
+        self._mm.close()
+
+    def name_at(self, i: int) -> str:
+        """Возвращает нормализованное имя записи с номером i."""
+        return self._name_bytes(i).decode("utf-8")
+
+    def appid_at(self, i: int) -> int:
+        """Возвращает appid записи с номером i."""
+        return self._appids[i]
+
+    def _name_bytes(self, i: int) -> bytes:
+        start = self._blob_start + self._offsets[i]
+        end = self._blob_start + self._offsets[i + 1]
+        return self._mm[start:end]
+
+    def _find(self, name: str) -> int:
+        key = name.encode("utf-8")
+        i = bisect_left(range(self._count), key, key=self._name_bytes)
+        if i < self._count and self._name_bytes(i) == key:
+            return i
+        return -1
+
+    def get_appid(self, name: str) -> int | None:
+        """Возвращает appid по точному нормализованному имени или None."""
+        i = self._find(name)
+        return self._appids[i] if i >= 0 else None
+
+    def entry(self, i: int) -> dict:
+        """Возвращает запись с номером i в виде {"appid", "normalized_name"}."""
+        return {"appid": self._appids[i], "normalized_name": self.name_at(i)}
+
+    def similar(self, text: str, limit: int = 64) -> list[int]:
+        """
+        Возвращает номера до limit имён, ближайших к text по коэффициенту Дайса
+        на байтовых триграммах. Слишком частые триграммы (есть более чем в четверти
+        имён) пропускаются, если у текста есть более редкие.
+        """
+        key = text.encode("utf-8")
+        grams = _trigrams(key)
+        if not grams:
+            return []
+        postings = [p for p in (self._posting(gram) for gram in grams) if p is not None]
+        rare = [p for p in postings if len(p) <= self._count // 4]
+        shared: Counter[int] = Counter()
+        for posting in rare or postings:
+            shared.update(posting)
+
+        def dice(i: int) -> float:
+            name_grams = max(1, self._offsets[i + 1] - self._offsets[i] - 2)
+            return 2 * shared[i] / (len(grams) + name_grams)
+
+        if not shared:
+            return []
+        # Имена, разделяющие меньше половины лучшего числа триграмм, заведомо хуже
+        floor = shared.most_common(1)[0][1] / 2
+        return heapq.nsmallest(limit, (i for i, n in shared.items() if n >= floor), key=lambda i: (-dice(i), i))
+
+    def _posting(self, gram: int):
+        i = bisect_left(self._grams, gram)
+        if i == len(self._grams) or self._grams[i] != gram:
+            return None
+        return self._postings[self._gram_offsets[i]:self._gram_offsets[i + 1]]
+
+    def find_partial(self, candidate: str, min_ratio: float = 0.8) -> dict | None:
+        """
+        Ищет первое (в порядке сортировки) имя, содержащее кандидата как подстроку,
+        у которого len(candidate) / len(name) > min_ratio.
+        Проверяются только имена из самого короткого списка триграмм кандидата,
+        а не весь каталог.
+        """
+        key = candidate.encode("utf-8")
+        if len(key) < 3:
+            # Такие короткие кандидаты проходят порог ratio только при точном совпадении
+            return self.get(candidate)
+        postings = []
+        for gram in _trigrams(key):
+            posting = self._posting(gram)
+            if posting is None:
+                return None
+            postings.append(posting)
+        shortest = min(postings, key=len)
+        max_bytes = 4 * len(candidate) / min_ratio
+        for i in shortest:
+            size = self._offsets[i + 1] - self._offsets[i]
+            if size < len(key) or size >= max_bytes:
+                continue
+            name_bytes = self._name_bytes(i)
+            if key not in name_bytes:
+                continue
+            name = name_bytes.decode("utf-8")
+            if len(candidate) / len(name) > min_ratio:
+                return {"appid": self._appids[i], "normalized_name": name}
+        return None
+
+    def __getitem__(self, name: str) -> dict:
+        i = self._find(name)
+        if i < 0:
+            raise KeyError(name)
+        return {"appid": self._appids[i], "normalized_name": name}
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._find(name) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            yield self.name_at(i)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def items(self) -> ItemsView[str, dict]:
+        """Лениво перебирает пары (normalized_name, app) в порядке сортировки."""
+        return _IndexItemsView(self)
+
+
+class _IndexItemsView(ItemsView):
+    """Перебор записей индекса по порядку, без бинарного поиска на каждый ключ."""
+
+    _mapping: SteamAppIndex
+
+    def __iter__(self):
+        index = self._mapping
+        for i in range(len(index)):
+            name = index.name_at(i)
+            yield name, {"appid": index.appid_at(i), "normalized_name": name}
+
+
+def apply_deltas(index: SteamAppIndex, deltas: Iterable[dict], path: str) -> int:
+    """
+    Применяет к индексу инкрементальные изменения каталога и записывает результат в path.
+    Каждая дельта содержит "remove" (список нормализованных имён) и "set"
+    (записи {"appid", "normalized_name"}), дельты применяются по порядку.
+    Старый индекс остаётся рабочим: новый файл атомарно заменяет прежний.
+    Возвращает количество имён в новом индексе.
+    """
+    by_name = {index.name_at(i): index.appid_at(i) for i in range(len(index))}
+    for delta in deltas:
+        for name in delta.get("remove", []):
+            by_name.pop(name, None)
+        for app in delta.get("set", []):
+            by_name[app["normalized_name"]] = app["appid"]
+    return write_index(path, ({"appid": appid, "normalized_name": name} for name, appid in by_name.items()))
+
+
+def open_index(path: str) -> SteamAppIndex | None:
+    """Открывает индекс, возвращает None, если файл отсутствует или повреждён."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return SteamAppIndex(path)
+    except Exception as e:
+        logger.error("Failed to open Steam app index %s: %s", path, e)
+        return None
@@ -0,0 +1,117 @@
+from collections.abc import Iterable
+from portprotonqt.steam_app_index import SteamAppIndex
+
+# Минимальная уверенность, при которой совпадение считается найденным.
+# Совпадает с порогом ratio прежнего поиска по подстроке (linear_scan в dev-scripts/bench_search_app.py),
+# чтобы прежние совпадения сохранились.
+DEFAULT_MIN_SCORE = 0.8
+# Вес токена, совпавшего с опечаткой, относительно точного совпадения
+FUZZY_TOKEN_WEIGHT = 0.9
+
+
+def _max_distance(token: str) -> int:
+    """Допустимое число правок для токена: короткие токены сравниваются строго."""
+    if len(token) >= 8:
+        return 2
+    if len(token) >= 4:
+        return 1
+    return 0
+
+
+def within_distance(a: str, b: str, max_distance: int) -> bool:
+    """
+    Проверяет, что расстояние Левенштейна между a и b не больше max_distance.
+    Считается только полоса шириной 2 * max_distance + 1 вокруг диагонали,
+    с досрочным выходом, как только вся полоса превысила порог.
+    """
+    if a == b:
+        return True
+    if max_distance <= 0 or abs(len(a) - len(b)) > max_distance:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    inf = max_distance + 1
+    previous = [j if j <= max_distance else inf for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [inf] * (len(b) + 1)
+        if i <= max_distance:
+            current[0] = i
+        lo = max(1, i - max_distance)
+        hi = min(len(b), i + max_distance)
+        for j in range(lo, hi + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost, inf)
+        if min(current[lo - 1:hi + 1]) > max_distance:
+            return False
+        previous = current
+    return previous[len(b)] <= max_distance
+
+
+def score_name(candidate: str, name: str) -> float:
+    """
+    Оценивает сходство нормализованного кандидата с нормализованным именем от 0 до 1:
+      - 1.0 при точном совпадении,
+      - len(candidate) / len(name), если кандидат входит в имя подстрокой,
+      - коэффициент Дайса по множествам токенов, где токены с опечаткой
+        (в пределах ограниченного расстояния Левенштейна) учитываются с весом 0.9,
+        если у кандидата есть хотя бы один точно совпавший токен.
+    Берётся наибольшая из оценок.
+    """
+    if candidate == name:
+        return 1.0
+    if not candidate or not name:
+        return 0.0
+    containment = len(candidate) / len(name) if candidate in name else 0.0
+
+    candidate_tokens = list(dict.fromkeys(candidate.split()))
+    name_tokens = list(dict.fromkeys(name.split()))
+    unmatched = set(name_tokens)
+    rest = []
+    for token in candidate_tokens:
+        if token in unmatched:
+            unmatched.discard(token)
+        else:
+            rest.append(token)
+    matched = float(len(candidate_tokens) - len(rest))
+    # Опечатки учитываются только рядом с точно совпавшим токеном, иначе имена исполняемых
+    # файлов и папок цепляются за похожие чужие игры (launcher -> launched, witcher3 -> switcher)
+    if matched:
+        for token in rest:
+            limit = _max_distance(token)
+            fuzzy = next((t for t in unmatched if within_distance(token, t, min(limit, _max_distance(t)))), None)
+            if fuzzy is not None:
+                unmatched.discard(fuzzy)
+                matched += FUZZY_TOKEN_WEIGHT
+    token_score = 2 * matched / (len(candidate_tokens) + len(name_tokens))
+    return max(containment, token_score)
+
+
+def rank_apps(index: SteamAppIndex, candidates: Iterable[str], limit: int = 5,
+              min_score: float = DEFAULT_MIN_SCORE) -> list[dict]:
+    """
+    Ранжирует приложения каталога по набору нормализованных кандидатов одной игры.
+    Для каждого кандидата берутся точное совпадение, первое частичное совпадение
+    и ближайшие по триграммам имена, затем все они оцениваются score_name.
+    Возвращает до limit записей {"appid", "normalized_name", "score", "candidate"}
+    с оценкой выше min_score, по убыванию оценки. При равной оценке выигрывает
+    кандидат, стоящий раньше в списке.
+    """
+    best: dict[int, dict] = {}
+    for order, candidate in enumerate(c for c in candidates if c):
+        exact = index.get(candidate)
+        partial = index.find_partial(candidate, min_score)
+        entries = [e for e in (exact, partial) if e is not None]
+        entries.extend(index.entry(i) for i in index.similar(candidate))
+        for entry in entries:
+            score = score_name(candidate, entry["normalized_name"])
+            # Строгий порог, как у ratio прежнего поиска по подстроке
+            if score <= min_score:
+                continue
+            key = (-score, order)
+            current = best.get(entry["appid"])
+            if current is None or key < current["_key"]:
+                best[entry["appid"]] = {**entry, "score": round(score, 4), "candidate": candidate, "_key": key}
+    ranked = sorted(best.values(), key=lambda m: (m["_key"], m["normalized_name"]))[:limit]
+    for match in ranked:
+        del match["_key"]
+    return ranked
@@ -0,0 +1,294 @@
+import hashlib
+import math
+import os
+from collections import OrderedDict
+from collections.abc import Callable
+from PySide6.QtCore import QObject, QRect, QRunnable, QSize, Qt, QThreadPool, Signal
+from PySide6.QtGui import QColor, QGuiApplication, QImage, QImageReader, QPainter, QPainterPath, QPixmap
+from portprotonqt.config_utils import read_pixmap_cache_limit
+from portprotonqt.image_cache import get_image_cache, get_thumbnail_dir
+from portprotonqt.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Потоков декодирования изображений: декодирование JPEG нагружает процессор, а не сеть
+DECODE_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+
+
+def device_pixel_ratio() -> float:
+    """Наибольший devicePixelRatio экранов приложения (1.0 без QGuiApplication)."""
+    app = QGuiApplication.instance()
+    return round(app.devicePixelRatio(), 2) if app is not None else 1.0
+
+
+def thumbnail_path(source: str, width: int, height: int, radius: int, dpr: float) -> str | None:
+    """
+    Путь к миниатюре source для (width, height, radius, dpr) или None, если source нет на диске.
+    В ключ входят размер и время изменения source, поэтому обновлённая обложка получает новую миниатюру.
+    """
+    try:
+        stat = os.stat(source)
+    except OSError:
+        return None
+    key = f"{os.path.abspath(source)}|{stat.st_mtime_ns}|{stat.st_size}|{width}x{height}|r{radius}|@{dpr}"
+    name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(get_thumbnail_dir(), name[:2], f"{name}.png")
+
+
+def round_corners(image: QImage, radius: float) -> QImage:
+    """
+    Возвращает QImage с закруглёнными углами.
+    """
+    if image.isNull():
+        return image
+    rounded = QImage(image.size(), QImage.Format.Format_ARGB32_Premultiplied)
+    rounded.fill(QColor(0, 0, 0, 0))
+    painter = QPainter(rounded)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    path = QPainterPath()
+    path.addRoundedRect(0, 0, image.width(), image.height(), radius, radius)
+    painter.setClipPath(path)
+    painter.drawImage(0, 0, image)
+    painter.end()
+    return rounded
+
+
+def _cover_size(size: QSize, target: QSize) -> QSize:
+    """Размер, до которого нужно масштабировать size, чтобы он покрыл target с сохранением пропорций."""
+    scale = max(target.width() / size.width(), target.height() / size.height())
+    return QSize(max(target.width(), math.ceil(size.width() * scale)),
+                 max(target.height(), math.ceil(size.height() * scale)))
+
+
+def make_thumbnail(image: QImage, width: int, height: int, radius: int, dpr: float) -> QImage:
+    """
+    Масштабирует image с заполнением (KeepAspectRatioByExpanding), обрезает по центру до width x height
+    и закругляет углы радиусом radius. Результат строится в физических пикселях экрана (dpr).
+    """
+    target = QSize(round(width * dpr), round(height * dpr))
+    if image.size() != target:
+        scaled = image.scaled(target, Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+                              Qt.TransformationMode.SmoothTransformation)
+        x = (scaled.width() - target.width()) // 2
+        y = (scaled.height() - target.height()) // 2
+        image = scaled.copy(x, y, target.width(), target.height())
+    if radius > 0:
+        image = round_corners(image, radius * dpr)
+    return image
+
+
+def decode_scaled(source: str, width: int, height: int) -> QImage:
+    """
+    Декодирует source сразу в размере, покрывающем width x height, и обрезает по центру.
+    JPEG при этом масштабируется в самом декодере, полноразмерное изображение не создаётся.
+    """
+    reader = QImageReader(source)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and not size.isEmpty():
+        scaled = _cover_size(size, QSize(width, height))
+        reader.setScaledSize(scaled)
+        reader.setScaledClipRect(QRect((scaled.width() - width) // 2, (scaled.height() - height) // 2, width, height))
+    image = reader.read()
+    if image.isNull():
+        logger.warning(f"Не удалось декодировать {source}: {reader.errorString()}")
+    return image
+
+
+def load_thumbnail(source: str, width: int, height: int, radius: int, dpr: float) -> QImage | None:
+    """Готовая миниатюра из кэша или None."""
+    path = thumbnail_path(source, width, height, radius, dpr)
+    if path is None or not os.path.exists(path):
+        return None
+    image = QImage(path)
+    if image.isNull():
+        logger.warning(f"Миниатюра {path} повреждена, создаём заново")
+        os.remove(path)
+        return None
+    get_image_cache().touch(path)
+    return image
+
+
+def save_thumbnail(source: str, width: int, height: int, radius: int, dpr: float, thumbnail: QImage):
+    """Сохраняет миниатюру в кэш (PNG, чтобы сохранить прозрачные углы)."""
+    path = thumbnail_path(source, width, height, radius, dpr)
+    if path is None or thumbnail.isNull():
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Одну миниатюру могут одновременно сохранять несколько потоков
+    part_path = f"{path}.{os.getpid()}.{id(thumbnail)}.part"
+    if thumbnail.save(part_path, "PNG"):
+        os.replace(part_path, path)
+    else:
+        logger.error(f"Не удалось сохранить миниатюру {path}")
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+
+def get_thumbnail(source: str, width: int, height: int, radius: int, dpr: float) -> QImage:
+    """
+    Миниатюра файла source: из кэша, а при его отсутствии — декодированная сразу в нужном
+    размере и сохранённая в кэш. Работает только с QImage, поэтому безопасна в рабочих потоках.
+    """
+    thumbnail = load_thumbnail(source, width, height, radius, dpr)
+    get_image_cache().record("thumbnails", thumbnail is not None)
+    if thumbnail is not None:
+        return thumbnail
+    image = decode_scaled(source, round(width * dpr), round(height * dpr))
+    if image.isNull():
+        return image
+    thumbnail = make_thumbnail(image, width, height, radius, dpr)
+    save_thumbnail(source, width, height, radius, dpr, thumbnail)
+    return thumbnail
+
+
+class PixmapCache:
+    """
+    LRU-кэш готовых миниатюр в памяти с ограничением по байтам.
+    Ключ — (файл, ширина, высота, радиус, devicePixelRatio). Используется только в GUI-потоке.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict[tuple, QPixmap] = OrderedDict()
+        self._size = 0
+
+    @staticmethod
+    def _cost(pixmap: QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+    def get(self, key: tuple) -> QPixmap | None:
+        """Миниатюра или None; промахи считает вызывающий, когда миниатюру приходится строить."""
+        pixmap = self._items.get(key)
+        if pixmap is None:
+            return None
+        self.hits += 1
+        self._items.move_to_end(key)
+        return pixmap
+
+    def put(self, key: tuple, pixmap: QPixmap):
+        cost = self._cost(pixmap)
+        if cost > self.limit:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._size -= self._cost(old)
+        self._items[key] = pixmap
+        self._size += cost
+        while self._size > self.limit:
+            _key, evicted = self._items.popitem(last=False)
+            self._size -= self._cost(evicted)
+
+    def clear(self):
+        self._items.clear()
+        self._size = 0
+
+    def stats(self) -> dict:
+        """Число записей, занятый объём в байтах, попадания и промахи."""
+        return {"items": len(self._items), "bytes": self._size, "limit": self.limit,
+                "hits": self.hits, "misses": self.misses}
+
+
+class _DecodeTask(QRunnable):
+    def __init__(self, loader: 'ThumbnailLoader', key: tuple):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.loader = loader
+        self.key = key
+        # Все, кто ждёт эту миниатюру
+        self.callbacks: list[Callable[[QPixmap], None]] = []
+
+    def run(self):
+        source, _identity, width, height, radius, dpr = self.key
+        try:
+            image = get_thumbnail(source, width, height, radius, dpr)
+        except Exception as e:
+            logger.error(f"Ошибка создания миниатюры {source}: {e}")
+            image = QImage()
+        try:
+            self.loader._decoded.emit(self, image)
+        except RuntimeError:
+            # Загрузчик удалён при завершении приложения
+            pass
+
+
+class ThumbnailLoader(QObject):
+    """
+    Пул декодирования миниатюр с кэшем готовых QPixmap в памяти (PixmapCache).
+    Чтение кэша на диске, декодирование и обработка выполняются с QImage в рабочих потоках;
+    в QPixmap изображение превращается только в потоке, где создан загрузчик
+    (в приложении — GUI-поток), непосредственно перед колбэком.
+    Одновременные запросы одной миниатюры декодируются один раз.
+    """
+    _decoded = Signal(object, object)  # _DecodeTask, QImage
+
+    def __init__(self, max_workers: int = DECODE_WORKERS, cache_limit: int | None = None):
+        super().__init__()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_workers)
+        if cache_limit is None:
+            cache_limit = read_pixmap_cache_limit() * 1024 * 1024
+        self.cache = PixmapCache(cache_limit)
+        # Задачи в очереди и в работе: пул не владеет объектами Python
+        self._pending: dict[tuple, _DecodeTask] = {}
+        self._decoded.connect(self._on_decoded)
+
+    @staticmethod
+    def _key(source: str, width: int, height: int, radius: int) -> tuple:
+        # Как и в thumbnail_path, размер и время изменения source входят в ключ:
+        # перезаписанная обложка не должна отдаваться из памяти в старом виде
+        try:
+            stat = os.stat(source)
+            identity = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            identity = None
+        return (source, identity, width, height, radius, device_pixel_ratio())
+
+    def cached(self, source: str, width: int, height: int, radius: int = 0) -> QPixmap | None:
+        """Готовая миниатюра из памяти или None; сам файл не читает (только stat)."""
+        return self.cache.get(self._key(source, width, height, radius))
+
+    def load(self, source: str, width: int, height: int, callback: Callable[[QPixmap], None],
+             radius: int = 0, priority: int = 0):
+        """
+        Вызывает callback с миниатюрой source размера width x height: сразу, если она есть в памяти,
+        иначе после декодирования в пуле (пустой QPixmap, если изображение не удалось прочитать).
+        Меньший priority декодируется раньше.
+        """
+        key = self._key(source, width, height, radius)
+        pixmap = self.cache.get(key)
+        if pixmap is not None:
+            callback(pixmap)
+            return
+        self.cache.misses += 1
+        task = self._pending.get(key)
+        if task is None:
+            task = self._pending[key] = _DecodeTask(self, key)
+            # В QThreadPool больший приоритет выполняется раньше
+            self._pool.start(task, -priority)
+        task.callbacks.append(callback)
+
+    def _on_decoded(self, task: _DecodeTask, image: QImage):
+        self._pending.pop(task.key, None)
+        pixmap = QPixmap.fromImage(image)
+        if not pixmap.isNull():
+            pixmap.setDevicePixelRatio(task.key[-1])
+            self.cache.put(task.key, pixmap)
+        for callback in task.callbacks:
+            try:
+                callback(pixmap)
+            except Exception as e:
+                logger.error(f"Ошибка в обработчике миниатюры {task.key[0]}: {e}")
+
+
+_LOADER: ThumbnailLoader | None = None
+
+
+def get_thumbnail_loader() -> ThumbnailLoader:
+    """Общий пул декодирования миниатюр; создавать в GUI-потоке."""
+    global _LOADER
+    if _LOADER is None:
+        _LOADER = ThumbnailLoader()
+    return _LOADER
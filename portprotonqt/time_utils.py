@@ -1,7 +1,7 @@
 import os
 from datetime import datetime, timedelta
 from babel.dates import format_timedelta, format_date
-from portprotonqt.config_utils import read_time_config
+from portprotonqt.config_utils import get_cache_dir, read_time_config
 from portprotonqt.localization import _, get_system_locale
 from portprotonqt.logger import get_logger
 
@@ -9,8 +9,7 @@ logger = get_logger(__name__)
 
 def get_cache_file_path():
     """Возвращает путь к файлу кеша portproton_last_launch."""
-    cache_home = os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
-    return os.path.join(cache_home, "PortProtonQT", "last_launch")
+    return os.path.join(get_cache_dir(), "last_launch")
 
 def save_last_launch(exe_name, launch_time):
     """